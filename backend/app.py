@@ -1,28 +1,51 @@
 import eventlet
 eventlet.monkey_patch()  # MUST be FIRST
 
+import time
+IMPORT_STARTED_AT = time.perf_counter()  # For the startup time reported by /health
+
+import asyncio
 import requests
 import polyline
 import random
 import sqlite3
 import json
 import os
+import copy
+import queue
+import re
+import threading
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
-from math import radians, cos, sin, asin, sqrt
-import traceback
+from math import radians, cos, sin, asin, sqrt, ceil
+from bisect import bisect_left
+
+import geodesy
+import logs
+from db import get_db, pool as db_pool
+from http_client import http
+from async_upstream import upstream
+from providers import providers
+from health import monitor as health_monitor, HEALTH_PROBE_TIMEOUT_S
+import migrations
+import metrics
+from metrics import registry as metrics_registry, LatencyHistogram
+
+logs.configure()
+log = logs.get_logger("app")
 
 # Load environment variables
 try:
     from dotenv import load_dotenv
     load_dotenv()
-    print("✅ Environment variables loaded from .env file")
+    log.info("✅ Environment variables loaded from .env file")
 except ImportError:
-    print("⚠️ python-dotenv not installed. Using system environment variables only.")
+    log.warning("⚠️ python-dotenv not installed. Using system environment variables only.")
 except Exception as e:
-    print(f"⚠️ Could not load .env file: {e}")
+    log.warning(f"⚠️ Could not load .env file: {e}")
 
 # Groq AI imports (primary AI provider)
 try:
@@ -30,7 +53,7 @@ try:
     GROQ_AVAILABLE = True
 except ImportError:
     GROQ_AVAILABLE = False
-    print("⚠️ Groq not available. Install: pip install groq")
+    log.warning("⚠️ Groq not available. Install: pip install groq")
 
 app = Flask(__name__)
 CORS(app, resources={
@@ -42,52 +65,69 @@ CORS(app, resources={
     }
 })
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    # Correlates every log line of this request, including background work it spawns
+    g.request_id = (request.headers.get('X-Request-ID') or '')[:64] or logs.new_request_id()
+    g.request_id_token = logs.set_request_id(g.request_id)
+
 # Additional CORS headers for file:// protocol
 @app.after_request
 def after_request(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.endpoint or "unmatched"
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+        metrics.REQUESTS.inc(endpoint=endpoint, status=response.status_code)
     response.headers.add('Access-Control-Allow-Origin', '*')
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
     response.headers.add('Access-Control-Allow-Credentials', 'true')
+    response.headers.add('Access-Control-Expose-Headers', 'X-Next-Cursor, X-Sync-Cursor, X-Sync-Cursor-Id, X-Request-ID')
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
     return response
 
+@app.teardown_request
+def clear_request_id(exc):
+    # The WSGI green thread is reused for the next request on a keep-alive connection
+    token = g.pop('request_id_token', None)
+    if token is not None:
+        logs.reset_request_id(token)
+
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
 
 # Load API keys from environment variables
 API_KEY = os.getenv('GOOGLE_MAPS_API_KEY')
 if not API_KEY:
-    print("❌ CRITICAL ERROR: GOOGLE_MAPS_API_KEY not found in environment variables!")
-    print("Please set GOOGLE_MAPS_API_KEY in your .env file or environment before running.")
-    print("Get your key from: https://console.cloud.google.com")
+    log.critical("❌ GOOGLE_MAPS_API_KEY not found in environment variables! Set it in your .env file "
+                 "or environment before running (get a key from https://console.cloud.google.com)")
 
-# Groq AI Configuration (Primary AI Provider - Fast & Unlimited)
+# Groq AI Configuration (Backup AI Provider - Fast & Unlimited)
+# The client is built on first use and checked by the background provider
+# probe (see providers.py), so importing the app never waits on Groq.
+# Both Groq clients also honour GROQ_BASE_URL, e.g. for a local stand-in.
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
+GROQ_MODEL = os.getenv('GROQ_MODEL', 'llama-3.1-8b-instant')
+GROQ_PROBE_INTERVAL_S = float(os.getenv('GROQ_PROBE_INTERVAL_S', '300'))
 if not GROQ_API_KEY:
-    print("⚠️ WARNING: GROQ_API_KEY not found in environment variables!")
-    print("Groq AI will be unavailable. Please set GROQ_API_KEY in .env file.")
-    print("Get your key from: https://console.groq.com")
-groq_client = None
-
-if GROQ_AVAILABLE and GROQ_API_KEY:
-    try:
-        groq_client = Groq(api_key=GROQ_API_KEY)
-        print("✅ Groq AI configured successfully")
-        print(f"🔑 Groq API Key: {GROQ_API_KEY[:10]}...{GROQ_API_KEY[-4:]}")
-        
-        # Test Groq connection
-        test_response = groq_client.chat.completions.create(
-            messages=[{"role": "user", "content": "Say 'OK' if you're working"}],
-            model="llama-3.1-8b-instant",  # Updated to current model
-            max_tokens=10
-        )
-        print(f"✅ Groq test successful: {test_response.choices[0].message.content}")
-    except Exception as e:
-        print(f"❌ Groq configuration failed: {e}")
-        print("🔄 Will use Google Places API as primary provider")
-        groq_client = None
+    log.warning("⚠️ GROQ_API_KEY not set - Groq AI backup unavailable (get a key from https://console.groq.com)")
+elif not GROQ_AVAILABLE:
+    log.warning("⚠️ GROQ_API_KEY set but the groq library is missing - Groq AI backup unavailable")
 else:
-    print("⚠️ Groq AI not configured - missing library or API key")
-    print("🔄 Will use Google Places API as primary provider")
+    upstream.configure_groq(GROQ_API_KEY)
+
+providers.register(
+    "groq",
+    configured=GROQ_AVAILABLE and bool(GROQ_API_KEY),
+    factory=lambda: Groq(api_key=GROQ_API_KEY),
+    probe=lambda client: client.models.retrieve(GROQ_MODEL).id  # Metadata call: no tokens spent
+)
+
+def get_groq_client():
+    """The shared Groq client, created on first use; None when Groq is unavailable"""
+    return providers.get("groq")
 
 # Crime Database for Route Analysis
 CRIME_DATABASE = {
@@ -207,19 +247,18 @@ def estimate_street_light_score(route_points, area_type):
     final_score = base_score * time_factor + variation
     return max(40, min(100, round(final_score)))
 
-def calculate_crime_risk_score(incidents, route_points):
-    """Calculate overall crime risk score for the route"""
+def calculate_crime_risk_score(incidents, route_points, geometry=None):
+    """
+    Calculate overall crime risk score for the route.
+    Incidents within 100m of any route segment add an extra proximity penalty.
+    """
     if not incidents or not route_points:
         return 0
     high_risk = sum(1 for i in incidents if i['severity'] == 'high')
     medium_risk = sum(1 for i in incidents if i['severity'] == 'medium')
     low_risk = sum(1 for i in incidents if i['severity'] == 'low')
-    route_length = len(route_points)
-    close_incidents = 0
-    sample_points = route_points[:min(50, route_length)]
-    for incident in incidents:
-        if any(haversine(incident['lat'], incident['lng'], pt[0], pt[1]) < 100 for pt in sample_points):
-            close_incidents += 1
+    geometry = geometry or geodesy.RouteGeometry(route_points)
+    close_incidents = len(geometry.within([(i['lat'], i['lng']) for i in incidents], 100))
     risk_score = (high_risk * 30 + medium_risk * 15 + low_risk * 5 + close_incidents * 10)
     return min(100, risk_score)
 
@@ -233,275 +272,879 @@ def calculate_final_safety_score(hospitals, police, lights, crime_risk, distance
     total = hospital_score + police_score + light_score * 0.3 + crime_penalty + distance_penalty
     return max(0, min(100, round(total)))
 
-def get_places_along_route(route_points, place_type="hospital", max_results=10):
+# Google Places (New) nearbySearch endpoint and route fan-out tuning.
+# The base URLs can point at local stand-ins (see benchmarks/fake_upstreams.py).
+PLACES_API_BASE_URL = os.getenv('PLACES_API_BASE_URL', 'https://places.googleapis.com').rstrip('/')
+PLACES_NEARBY_URL = f"{PLACES_API_BASE_URL}/v1/places:searchNearby"
+http.mount_host(PLACES_API_BASE_URL, int(os.getenv('PLACES_HTTP_POOL_SIZE', '32')))  # Route fan-outs + SOS lookups in flight
+PLACES_FETCH_CONCURRENCY = int(os.getenv('PLACES_FETCH_CONCURRENCY', '8'))  # Max in-flight searches per route
+PLACES_ROUTE_DEADLINE_S = float(os.getenv('PLACES_ROUTE_DEADLINE_S', '6'))  # Budget for one route's fan-out
+ROUTE_SEARCH_RADIUS_M = 3000.0  # 3km radius for better coverage
+
+def places_search_request(lat, lng, place_type, radius, max_count):
+    """Headers and JSON body for one Places (New) nearbySearch"""
+    headers = {
+        'Content-Type': 'application/json',
+        'X-Goog-Api-Key': API_KEY,
+        'X-Goog-FieldMask': 'places.displayName,places.formattedAddress,places.location,places.rating,places.internationalPhoneNumber,places.types'
+    }
+    search_data = {
+        "includedTypes": [place_type],
+        "maxResultCount": max_count,
+        "locationRestriction": {
+            "circle": {
+                "center": {
+                    "latitude": lat,
+                    "longitude": lng
+                },
+                "radius": radius
+            }
+        },
+        "rankPreference": "DISTANCE"
+    }
+    return headers, search_data
+
+def search_places_nearby(lat, lng, place_type, radius, max_count=10, timeout=5):
+    """
+    Run a single Google Places (New) nearbySearch and return the raw 'places' list.
+    Raises requests exceptions (including HTTPError for non-200 responses) so
+    callers can decide how to report them and errors are never cached.
+    """
+    headers, search_data = places_search_request(lat, lng, place_type, radius, max_count)
+    response = http.request("places", "POST", PLACES_NEARBY_URL, json=search_data, headers=headers, timeout=timeout)
+    if response.status_code != 200:
+        log.warning(f"⚠️ Places API HTTP {response.status_code} for {place_type} at ({lat:.4f}, {lng:.4f})")
+        response.raise_for_status()
+    return response.json().get('places', [])
+
+async def search_places_nearby_async(lat, lng, place_type, radius, max_count=10, timeout=5):
+    """search_places_nearby on the async upstream client (OUTBOUND_IO_MODE=async)"""
+    headers, search_data = places_search_request(lat, lng, place_type, radius, max_count)
+    response = await upstream.request("places", "POST", PLACES_NEARBY_URL, json=search_data, headers=headers, timeout=timeout)
+    if response.status_code != 200:
+        log.warning(f"⚠️ Places API HTTP {response.status_code} for {place_type} at ({lat:.4f}, {lng:.4f})")
+        raise requests.HTTPError(f"Places API HTTP {response.status_code}")
+    return response.json().get('places', [])
+
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+def geohash_encode(lat, lng, precision=6):
+    """Encode a coordinate as a geohash string (precision 6 ~ 1.2km x 0.6km tiles)"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash = []
+    bits, bit_count, even = 0, 0, True
+    while len(geohash) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits = bits << 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(geohash)
+
+def geohash_bounds(geohash):
+    """Return (min_lat, min_lng, max_lat, max_lng) of a geohash tile"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        bits = GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (bits >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+def geohash_center(geohash):
+    """Return the (lat, lng) centre of a geohash tile"""
+    min_lat, min_lng, max_lat, max_lng = geohash_bounds(geohash)
+    return (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+
+class TTLCache:
+    """
+    LRU cache with a per-entry TTL and a total size cap in bytes.
+    Entry sizes are estimated from their JSON encoding. Safe to share between
+    green threads (threading is monkey-patched by eventlet).
     """
-    Find real hospitals or police stations along a route path using Google Places API.
-    Samples points along the route and searches for places within 2km radius.
-    Optimized to avoid blocking - limits API calls and uses faster search strategy.
     
-    Args:
-        route_points: List of (lat, lng) tuples representing the route
-        place_type: "hospital" or "police"
-        max_results: Maximum number of places to return
+    def __init__(self, name, ttl_s, max_bytes):
+        self.name = name
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> [value, expires_at, size, hits]
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
     
-    Returns:
-        List of place dictionaries with name, lat, lng, address, phone, distance
-    """
-    if not route_points or len(route_points) == 0:
-        return []
+    def get(self, key):
+        """
+        Return the cached value, or None on a miss or an expired entry.
+        Expired entries stay in place until they are replaced or evicted, so
+        get_stale() can still serve them while the upstream is failing.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] <= time.time():
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            entry[3] += 1
+            self.hits += 1
+            return entry[0]
     
-    try:
-        url = "https://places.googleapis.com/v1/places:searchNearby"
-        headers = {
-            'Content-Type': 'application/json',
-            'X-Goog-Api-Key': API_KEY,
-            'X-Goog-FieldMask': 'places.displayName,places.formattedAddress,places.location,places.internationalPhoneNumber,places.types'
+    def get_stale(self, key):
+        """Return the cached value even if it has expired, or None if there is none"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self.stale_hits += 1
+            return entry[0]
+    
+    def set(self, key, value, ttl_s=None, hits=None):
+        """
+        Store `value` under `key`. Replacing an entry keeps its hit count unless
+        `hits` is given, so a refreshed entry stays as hot as it was.
+        """
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return  # Never let one oversized entry flush the whole cache
+        expires_at = time.time() + (self.ttl_s if ttl_s is None else ttl_s)
+        with self._lock:
+            if key in self._entries:
+                if hits is None:
+                    hits = self._entries[key][3]
+                self._remove(key)
+            self._entries[key] = [value, expires_at, size, hits or 0]
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+    
+    def _remove(self, key):
+        _, _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+    
+    def hit_count(self, key):
+        entry = self._entries.get(key)
+        return entry[3] if entry else 0
+    
+    def hot_entries(self, expiring_within_s, limit):
+        """Most-hit keys that expire within `expiring_within_s`, as (key, hits) pairs"""
+        deadline = time.time() + expiring_within_s
+        with self._lock:
+            candidates = [
+                (key, entry[3]) for key, entry in self._entries.items()
+                if entry[3] > 0 and entry[1] <= deadline
+            ]
+        candidates.sort(key=lambda item: item[1], reverse=True)
+        return candidates[:limit]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "stale_hits": self.stale_hits
         }
-        
-        # Distribute search points evenly across the ENTIRE route based on DISTANCE
-        # This ensures we cover the full route length, not just the beginning
-        total_points = len(route_points)
-        total_distance_km = 0.0  # Initialize for logging
-        
-        if total_points <= 3:
-            sample_points = route_points
-        elif total_points <= 10:
-            # Use all points for very short routes
-            sample_points = route_points
-            # Calculate total distance for logging
-            for i in range(len(route_points) - 1):
-                total_distance_km += calculate_distance(
-                    route_points[i][0], route_points[i][1],
-                    route_points[i+1][0], route_points[i+1][1]
-                )
-        else:
-            # Calculate cumulative distances along the route
-            cumulative_distances = [0.0]  # Distance from start at each point
-            
-            for i in range(len(route_points) - 1):
-                segment_distance = calculate_distance(
-                    route_points[i][0], route_points[i][1],
-                    route_points[i+1][0], route_points[i+1][1]
-                )
-                total_distance_km += segment_distance
-                cumulative_distances.append(total_distance_km)
-            
-            # Determine number of samples based on route length
-            # Sample every 4-5km to ensure full coverage with overlapping search radii (3km)
-            target_sample_interval_km = 4.5  # Sample every 4.5km (with 3km radius = 1.5km overlap)
-            num_samples = max(3, min(8, int(total_distance_km / target_sample_interval_km) + 1))
-            
-            print(f"   📏 Route distance: {total_distance_km:.2f} km, will use {num_samples} evenly distributed search points")
-            
-            # Distribute samples evenly along the route based on cumulative distance
-            sample_points = []
-            sample_distances = []
-            
-            # Always include start point
-            sample_points.append(route_points[0])
-            sample_distances.append(0.0)
+
+class SingleFlight:
+    """
+    Request coalescing: concurrent calls with the same key share ONE in-flight
+    call and all receive its result (or its exception). The first caller runs
+    the function; later callers wait for it and get their own deep copy, so no
+    caller can mutate another's result. If the running call is killed (a
+    deadline or a lost hedged race), a waiting caller takes over and runs it.
+    """
+    
+    _CANCELLED = object()
+    
+    def __init__(self, name):
+        self.name = name
+        self._in_flight = {}  # key -> eventlet.Event
+        self._waiters = {}  # key -> callers waiting on it
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+        self.takeovers = 0
+        self.peak_waiters = 0
+    
+    def do(self, key, func, *args, **kwargs):
+        while True:
+            with self._lock:
+                event = self._in_flight.get(key)
+                if event is None:
+                    event = eventlet.Event()
+                    self._in_flight[key] = event
+                    self._waiters[key] = 0
+                    self.calls += 1
+                    leader = True
+                else:
+                    self._waiters[key] += 1
+                    self.peak_waiters = max(self.peak_waiters, self._waiters[key])
+                    self.coalesced += 1
+                    leader = False
             
-            # Calculate target distances for evenly spaced samples
-            if num_samples > 2:
-                # Distribute middle points evenly
-                for i in range(1, num_samples - 1):
-                    target_distance = (i * total_distance_km) / (num_samples - 1)
-                    sample_distances.append(target_distance)
-                    
-                    # Find the route point closest to this target distance
-                    closest_idx = 0
-                    min_diff = float('inf')
-                    for idx, cum_dist in enumerate(cumulative_distances):
-                        diff = abs(cum_dist - target_distance)
-                        if diff < min_diff:
-                            min_diff = diff
-                            closest_idx = idx
-                    
-                    if route_points[closest_idx] not in sample_points:
-                        sample_points.append(route_points[closest_idx])
+            if leader:
+                return self._lead(key, event, func, args, kwargs)
             
-            # Always include end point
-            if route_points[-1] not in sample_points:
-                sample_points.append(route_points[-1])
-                sample_distances.append(total_distance_km)
-        
-        print(f"🔍 Searching for {place_type}s along route with {len(sample_points)} evenly distributed sample points (from {total_points} total route points)...")
-        if len(sample_points) > 2 and total_distance_km > 0:
-            print(f"   📍 Coverage: Start (0km) → {len(sample_points)-2} middle sections → End ({total_distance_km:.1f}km)")
-        else:
-            print(f"   📍 Coverage: Start → End")
-        
-        all_places = []
-        seen_places = set()  # To deduplicate by coordinates
-        
-        # Search radius in meters (3km for better coverage)
-        search_radius = 3000.0
-        
-        # Use all sample points (they're already limited and evenly distributed)
-        # No need to truncate further
-        
-        for idx, (lat, lng) in enumerate(sample_points):
             try:
-                search_data = {
-                    "includedTypes": [place_type],
-                    "maxResultCount": 10,
-                    "locationRestriction": {
-                        "circle": {
-                            "center": {
-                                "latitude": lat,
-                                "longitude": lng
-                            },
-                            "radius": search_radius
-                        }
-                    },
-                    "rankPreference": "DISTANCE"
-                }
-                
-                response = requests.post(url, json=search_data, headers=headers, timeout=5)  # Reduced timeout
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    places = result.get('places', [])
-                    
-                    for place in places:
-                        try:
-                            place_lat = place.get('location', {}).get('latitude')
-                            place_lng = place.get('location', {}).get('longitude')
-                            
-                            if not place_lat or not place_lng:
-                                continue
-                            
-                            # Improved deduplication: Check if this place is too close to any existing place
-                            # Minimum distance between places: 500m (0.5km) to avoid clustering
-                            min_distance_between_places_m = 500.0
-                            is_too_close = False
-                            
-                            for existing_place in all_places:
-                                distance_between = haversine(
-                                    place_lat, place_lng,
-                                    existing_place['lat'], existing_place['lng']
-                                )
-                                if distance_between < min_distance_between_places_m:
-                                    is_too_close = True
-                                    break
-                            
-                            if is_too_close:
-                                continue  # Skip places that are too close to existing ones
-                            
-                            # Also check against seen_places set for faster lookup
-                            # Use 3 decimal places (~100m precision) for initial deduplication
-                            place_key_coarse = (round(place_lat, 3), round(place_lng, 3))
-                            if place_key_coarse in seen_places:
-                                continue  # Skip if very close to a previously seen place
-                            
-                            seen_places.add(place_key_coarse)
-                            
-                            name = place.get('displayName', {}).get('text', f'Unknown {place_type.title()}')
-                            address = place.get('formattedAddress', 'Address not available')
-                            phone = place.get('internationalPhoneNumber', f'Emergency: {"112" if place_type == "hospital" else "100"}')
-                            
-                            # Calculate distance from route (use nearest route point) - optimized
-                            # Sample route points for distance calculation to avoid performance issues
-                            sample_for_distance = route_points[::max(1, len(route_points)//20)] if len(route_points) > 20 else route_points
-                            min_distance = min([haversine(place_lat, place_lng, rp[0], rp[1]) for rp in sample_for_distance])
-                            distance_km = min_distance / 1000.0
-                            
-                            place_data = {
-                                "name": name,
-                                "address": address,
-                                "phone": phone,
-                                "lat": place_lat,
-                                "lng": place_lng,
-                                "distance_from_route_km": round(distance_km, 2),
-                                "distance_from_route": f"{distance_km:.1f} km"
-                            }
-                            
-                            all_places.append(place_data)
-                            
-                            # Early exit if we have enough results
-                            if len(all_places) >= max_results * 2:  # Get extra for final deduplication
-                                break
-                            
-                        except Exception as e:
-                            print(f"⚠️ Error processing {place_type}: {e}")
-                            continue
-                
-                # No delay - removed to speed up response
-                # If we have enough results, break early
-                if len(all_places) >= max_results:
-                    break
-                    
+                outcome, value = event.wait()
+            finally:
+                # A waiter killed mid-wait must not stay counted against the key
+                with self._lock:
+                    if self._in_flight.get(key) is event:
+                        self._waiters[key] -= 1
+            if outcome is self._CANCELLED:
+                with self._lock:
+                    self.takeovers += 1
+                continue
+            if outcome == "error":
+                raise value
+            return copy.deepcopy(value)
+    
+    def _lead(self, key, event, func, args, kwargs):
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._finish(key, event, ("error", e))
+            raise
+        except BaseException:
+            self._finish(key, event, (self._CANCELLED, None))
+            raise
+        self._finish(key, event, ("ok", result))
+        return result
+    
+    def _finish(self, key, event, outcome):
+        with self._lock:
+            del self._in_flight[key]
+            del self._waiters[key]
+        event.send(outcome)
+    
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "takeovers": self.takeovers,
+            "in_flight": len(self._in_flight),
+            "peak_waiters": self.peak_waiters
+        }
+
+# Places results are cached per (place type, geohash tile, radius bucket).
+# Searches are snapped to the tile centre so every sample point inside a tile
+# shares one upstream call. A tile holds at most PLACES_CACHE_FETCH_COUNT
+# places, so in a dense area it is only complete out to its farthest result;
+# searches reaching past that go to the Places API directly (tile_results).
+PLACES_TILE_PRECISION = int(os.getenv('PLACES_TILE_PRECISION', '6'))
+PLACES_RADIUS_BUCKET_M = 500.0
+PLACES_CACHE_FETCH_COUNT = 20  # Places API maximum; callers slice down to their own limit
+places_cache = TTLCache(
+    "places",
+    ttl_s=float(os.getenv('PLACES_CACHE_TTL_S', str(6 * 3600))),
+    max_bytes=int(os.getenv('PLACES_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+)
+
+def places_cache_key(lat, lng, place_type, radius):
+    """Build the (place_type, tile, radius_bucket) cache key for a search"""
+    tile = geohash_encode(lat, lng, PLACES_TILE_PRECISION)
+    radius_bucket = ceil(radius / PLACES_RADIUS_BUCKET_M) * PLACES_RADIUS_BUCKET_M
+    return (place_type, tile, radius_bucket)
+
+# Persistent tier: tiles are written through to the places_cache table so a
+# restarted dyno starts warm, and a background refresher re-fetches the
+# hottest tiles shortly before they expire.
+PLACES_WARM_START_LIMIT = int(os.getenv('PLACES_WARM_START_LIMIT', '2000'))
+PLACES_REFRESH_INTERVAL_S = float(os.getenv('PLACES_REFRESH_INTERVAL_S', '60'))
+PLACES_REFRESH_AHEAD_S = float(os.getenv('PLACES_REFRESH_AHEAD_S', '600'))
+PLACES_REFRESH_BATCH = int(os.getenv('PLACES_REFRESH_BATCH', '10'))
+places_store_stats = {"loaded": 0, "db_hits": 0, "writes": 0, "refreshed": 0, "errors": 0, "direct_searches": 0}
+
+def store_places_tile(key, places, fetched_at):
+    """Write one cached tile through to the places_cache table"""
+    place_type, tile, radius_bucket = key
+    min_lat, min_lng, max_lat, max_lng = geohash_bounds(tile)
+    try:
+        with get_db() as conn:
+            conn.execute("""INSERT OR REPLACE INTO places_cache
+                            (place_type, tile, radius_bucket, payload, fetched_at, min_lat, min_lng, max_lat, max_lng, hit_count)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                         (place_type, tile, radius_bucket, json.dumps(places), fetched_at,
+                          min_lat, min_lng, max_lat, max_lng, places_cache.hit_count(key)))
+        places_store_stats["writes"] += 1
+    except sqlite3.Error as e:
+        places_store_stats["errors"] += 1
+        log.warning(f"⚠️ Could not persist places tile {tile}: {e}")
+
+def load_places_tile(key, allow_stale=False):
+    """Read a still-fresh (or, with `allow_stale`, any) tile from the places_cache table, or None"""
+    place_type, tile, radius_bucket = key
+    try:
+        with get_db() as conn:
+            row = conn.execute("SELECT payload, fetched_at, hit_count FROM places_cache WHERE place_type = ? AND tile = ? AND radius_bucket = ?",
+                               (place_type, tile, radius_bucket)).fetchone()
+    except sqlite3.Error as e:
+        places_store_stats["errors"] += 1
+        log.warning(f"⚠️ Could not read places tile {tile}: {e}")
+        return None
+    
+    if row is None:
+        return None
+    payload, fetched_at, hit_count = row
+    remaining_s = fetched_at + places_cache.ttl_s - time.time()
+    if remaining_s <= 0 and not allow_stale:
+        return None
+    places = json.loads(payload)
+    places_cache.set(key, places, ttl_s=remaining_s, hits=hit_count)
+    places_store_stats["db_hits"] += 1
+    return places
+
+def warm_places_cache():
+    """Load the hottest non-expired tiles from SQLite into memory at startup"""
+    try:
+        with get_db() as conn:
+            rows = conn.execute("""SELECT place_type, tile, radius_bucket, payload, fetched_at, hit_count FROM places_cache
+                                   WHERE fetched_at > ? ORDER BY hit_count DESC LIMIT ?""",
+                                (time.time() - places_cache.ttl_s, PLACES_WARM_START_LIMIT)).fetchall()
+    except sqlite3.Error as e:
+        log.warning(f"⚠️ Places cache warm start skipped: {e}")
+        return
+    
+    # Insert coldest first so the hottest tiles end up most recently used
+    for place_type, tile, radius_bucket, payload, fetched_at, hit_count in reversed(rows):
+        remaining_s = fetched_at + places_cache.ttl_s - time.time()
+        places_cache.set((place_type, tile, radius_bucket), json.loads(payload), ttl_s=remaining_s, hits=hit_count)
+    places_store_stats["loaded"] = len(rows)
+    log.info(f"🗄️ Places cache warm start: {len(rows)} tiles loaded from {db_pool.path}")
+
+def places_tile_search(key):
+    """
+    The search that fetches a whole tile: centred on the tile, with the radius
+    widened by the tile's half-diagonal so it covers any circle inside the tile.
+    Returns search_places_nearby's (lat, lng, place_type, radius, max_count).
+    """
+    place_type, tile, radius_bucket = key
+    min_lat, min_lng, max_lat, max_lng = geohash_bounds(tile)
+    center_lat, center_lng = (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+    half_diagonal_m = haversine(center_lat, center_lng, max_lat, max_lng)
+    return center_lat, center_lng, place_type, radius_bucket + half_diagonal_m, PLACES_CACHE_FETCH_COUNT
+
+def fetch_places_tile(key, timeout=5):
+    """Fetch a whole tile from the Places API, store it in memory and write it through to SQLite"""
+    places = search_places_nearby(*places_tile_search(key), timeout=timeout)
+    places_cache.set(key, places)
+    store_places_tile(key, places, time.time())
+    return places
+
+def fetch_places_tile_async(key, timeout=5):
+    """fetch_places_tile on the async upstream client (OUTBOUND_IO_MODE=async)"""
+    places = upstream.run(search_places_nearby_async(*places_tile_search(key), timeout=timeout))
+    places_cache.set(key, places)
+    store_places_tile(key, places, time.time())
+    return places
+
+places_tile_flight = SingleFlight("places_tile")
+
+def stale_places_tile(key):
+    """An expired copy of a tile from memory or SQLite, or None"""
+    places = places_cache.get_stale(key)
+    if places is None:
+        places = load_places_tile(key, allow_stale=True)
+    return places
+
+def refresh_hot_places_tiles():
+    """Background loop: re-fetch the most-used tiles before they go stale"""
+    while True:
+        eventlet.sleep(PLACES_REFRESH_INTERVAL_S)
+        try:
+            for key, hits in places_cache.hot_entries(PLACES_REFRESH_AHEAD_S, PLACES_REFRESH_BATCH):
+                try:
+                    fetch_places_tile(key)
+                    places_store_stats["refreshed"] += 1
+                except Exception as e:
+                    places_store_stats["errors"] += 1
+                    log.warning(f"⚠️ Places tile refresh failed for {key[0]}/{key[1]}: {e}")
+        except Exception as e:
+            log.warning(f"⚠️ Places refresher error: {e}")
+
+def cached_places_nearby(lat, lng, place_type, radius, max_count=10, timeout=5):
+    """
+    Tile-cached front for search_places_nearby, shared by the route and SOS lookups.
+    Lookups go memory -> SQLite -> Places API; a fetched tile serves any search
+    inside it that it holds completely (see tile_results). Otherwise - a full
+    tile in a dense area, searched far from its centre - the search goes to
+    the Places API directly. Results are filtered to `radius` around (lat, lng)
+    and ranked by distance, as a direct DISTANCE-ranked search returns them.
+    """
+    key = places_cache_key(lat, lng, place_type, radius)
+    with metrics.PLACES_SEARCH_SECONDS.time(place_type=place_type):
+        places = places_cache.get(key)
+        if places is None:
+            places = load_places_tile(key)
+        if places is None:
+            try:
+                places = places_tile_flight.do(key, fetch_places_tile, key, timeout)
+            except requests.RequestException as e:
+                # Places is failing (or its circuit is open): an expired tile beats no data
+                places = stale_places_tile(key)
+                if places is None:
+                    raise
+                metrics.PLACES_SEARCH_ERRORS.inc(outcome="stale")
+                log.warning(f"♻️ Serving stale {place_type} tile {key[1]}: {e}")
+        nearby = tile_results(key, places, lat, lng, radius, max_count)
+        if nearby is not None:
+            return nearby
+        places_store_stats["direct_searches"] += 1
+        try:
+            return places_within(search_places_nearby(lat, lng, place_type, radius, max_count, timeout), lat, lng, radius, max_count)
+        except requests.RequestException as e:
+            # The tile's nearest places are still right, it just may miss some
+            metrics.PLACES_SEARCH_ERRORS.inc(outcome="capped_tile")
+            log.warning(f"⚠️ Direct {place_type} search failed, using the capped tile: {e}")
+            return places_within(places, lat, lng, radius, max_count)
+
+def tile_coverage_m(key, places, lat, lng):
+    """
+    Distance from (lat, lng) within which the tile is known to hold every place.
+    A tile is one DISTANCE-ranked search from its centre: if it came back
+    short of PLACES_CACHE_FETCH_COUNT it holds everything in its search
+    circle, otherwise only what is closer to the centre than its farthest result.
+    """
+    if len(places) < PLACES_CACHE_FETCH_COUNT:
+        return float('inf')
+    center_lat, center_lng = geohash_center(key[1])
+    farthest_m = max((haversine(center_lat, center_lng, place['location']['latitude'], place['location']['longitude'])
+                      for place in places
+                      if place.get('location', {}).get('latitude') is not None and place['location'].get('longitude') is not None),
+                     default=0.0)
+    return farthest_m - haversine(lat, lng, center_lat, center_lng)
+
+def tile_results(key, places, lat, lng, radius, max_count):
+    """
+    places_within() for a tile, or None if the tile cannot answer exactly:
+    the circle reaches past the tile's coverage and the nearest `max_count`
+    places found do not all lie inside it.
+    """
+    nearby = places_within(places, lat, lng, radius, max_count)
+    coverage_m = tile_coverage_m(key, places, lat, lng)
+    if radius <= coverage_m:
+        return nearby
+    if len(nearby) == max_count:
+        location = nearby[-1]['location']
+        if haversine(lat, lng, location['latitude'], location['longitude']) <= coverage_m:
+            return nearby
+    return None
+
+def places_within(places, lat, lng, radius, max_count):
+    """A tile's places within `radius` of (lat, lng), nearest first"""
+    in_range = []
+    for place in places:
+        location = place.get('location', {})
+        if location.get('latitude') is None or location.get('longitude') is None:
+            continue
+        distance_m = haversine(lat, lng, location['latitude'], location['longitude'])
+        if distance_m <= radius:
+            in_range.append((distance_m, place))
+    in_range.sort(key=lambda item: item[0])
+    return [place for _, place in in_range[:max_count]]
+
+def fan_out_places_searches(searches, deadline_s=PLACES_ROUTE_DEADLINE_S, concurrency=PLACES_FETCH_CONCURRENCY):
+    """
+    Dispatch a batch of Places searches at once on a bounded eventlet GreenPool.
+    
+    Args:
+        searches: List of (lat, lng, place_type, radius, max_count) tuples
+        deadline_s: Overall budget for the whole batch; stragglers are killed
+        concurrency: Maximum number of searches in flight at the same time
+    
+    Returns:
+        List of raw place lists in the SAME order as `searches`, so callers can
+        merge deterministically. Failed or late searches yield None.
+    """
+    results = [None] * len(searches)
+    if not searches:
+        return results
+    if upstream.enabled:
+        return fan_out_places_searches_async(searches, deadline_s)
+    
+    pool = eventlet.GreenPool(max(1, concurrency))
+    threads = []
+    completed = 0
+    
+    # eventlet.Timeout(..., False) silently leaves the block once the deadline passes
+    with eventlet.Timeout(deadline_s, False):
+        for search in searches:
+            threads.append(pool.spawn(logs.bind(cached_places_nearby), *search))
+        for idx, thread in enumerate(threads):
+            lat, lng, place_type = searches[idx][:3]
+            try:
+                results[idx] = thread.wait()
             except requests.Timeout:
-                print(f"⚠️ Timeout searching for {place_type} at point {idx}")
+                metrics.PLACES_SEARCH_ERRORS.inc(outcome="none")
+                log.warning(f"⚠️ Timeout searching for {place_type} at ({lat:.4f}, {lng:.4f})")
+            except Exception as e:
+                metrics.PLACES_SEARCH_ERRORS.inc(outcome="none")
+                log.warning(f"⚠️ Error searching for {place_type} at ({lat:.4f}, {lng:.4f}): {e}")
+            completed += 1
+    
+    if completed < len(searches):
+        # Keep whatever already finished behind the slow search, drop the rest
+        dropped = 0
+        for idx in range(completed, len(threads)):
+            thread = threads[idx]
+            if thread.dead:
+                try:
+                    results[idx] = thread.wait()
+                except Exception:
+                    pass
+            else:
+                thread.kill()
+                dropped += 1
+        log.warning(f"⏱️ Places fan-out deadline ({deadline_s}s) hit: {dropped}/{len(searches)} searches dropped")
+    
+    return results
+
+def fan_out_places_searches_async(searches, deadline_s):
+    """
+    fan_out_places_searches for OUTBOUND_IO_MODE=async. Cache tiers are read
+    inline and each missing tile is fetched once on the async client, through
+    places_tile_flight so concurrent routes and SOS lookups share it. Whatever
+    is still running at the deadline is dropped. Same return contract.
+    """
+    started = time.monotonic()
+    keys = [places_cache_key(*search[:4]) for search in searches]
+    tiles, timeouts = {}, {}
+    for key, search in zip(keys, searches):
+        if key not in tiles:
+            places = places_cache.get(key)
+            tiles[key] = places if places is not None else load_places_tile(key)
+            timeouts[key] = search[5] if len(search) > 5 else 5  # cached_places_nearby's timeout argument
+    
+    missing = [key for key, places in tiles.items() if places is None]
+    if missing:
+        # One green thread per tile parks on its async fetch, or on another request's
+        pool = eventlet.GreenPool(len(missing))
+        threads = [pool.spawn(logs.bind(places_tile_flight.do), key, fetch_places_tile_async, key, timeouts[key])
+                   for key in missing]
+        fetched = [None] * len(missing)
+        with eventlet.Timeout(deadline_s, False):
+            for thread in threads:
+                try:
+                    thread.wait()
+                except Exception:
+                    pass  # Collected below
+        for idx, thread in enumerate(threads):
+            if not thread.dead:
+                thread.kill()  # Past the deadline: cancels the fetch, or leaves it to another waiter
+                fetched[idx] = asyncio.TimeoutError(f"deadline of {deadline_s}s exceeded")
                 continue
+            try:
+                fetched[idx] = thread.wait()
             except Exception as e:
-                print(f"⚠️ Error searching at point {idx}: {e}")
+                fetched[idx] = e
+        late = 0
+        for key, result in zip(missing, fetched):
+            if not isinstance(result, BaseException):
+                tiles[key] = result
                 continue
-        
-        # Final deduplication pass: Remove places that are too close to each other
-        # Sort by distance from route first (closest to route preferred)
-        all_places.sort(key=lambda x: x['distance_from_route_km'])
-        
-        # Filter to ensure minimum 500m spacing between places
-        final_places = []
-        min_spacing_m = 500.0  # Minimum 500m between any two places
-        
-        for place in all_places:
-            is_too_close = False
-            for existing in final_places:
-                distance = haversine(
-                    place['lat'], place['lng'],
-                    existing['lat'], existing['lng']
-                )
-                if distance < min_spacing_m:
-                    is_too_close = True
-                    break
+            late += isinstance(result, asyncio.TimeoutError)
+            tiles[key] = stale_places_tile(key)
+            if tiles[key] is not None:
+                metrics.PLACES_SEARCH_ERRORS.inc(outcome="stale")
+                log.warning(f"♻️ Serving stale {key[0]} tile {key[1]}: {result}")
+            else:
+                metrics.PLACES_SEARCH_ERRORS.inc(outcome="none")
+                if not isinstance(result, asyncio.TimeoutError):
+                    log.warning(f"⚠️ Error searching for {key[0]} in tile {key[1]}: {result}")
+        if late:
+            log.warning(f"⏱️ Places fan-out deadline ({deadline_s}s) hit: {late}/{len(missing)} tile fetches cancelled")
+    
+    results, direct = [], []
+    for idx, (key, (lat, lng, place_type, radius, max_count, *_)) in enumerate(zip(keys, searches)):
+        if tiles[key] is None:
+            results.append(None)
+            continue
+        nearby = tile_results(key, tiles[key], lat, lng, radius, max_count)
+        if nearby is None:
+            # Reaches past a capped tile: ask directly, keep the tile's answer if that fails
+            direct.append(idx)
+            nearby = places_within(tiles[key], lat, lng, radius, max_count)
+        results.append(nearby)
+    
+    remaining_s = deadline_s - (time.monotonic() - started)
+    if direct and remaining_s > 0:
+        places_store_stats["direct_searches"] += len(direct)
+        fetches = [search_places_nearby_async(*searches[idx][:5], timeout=timeouts[keys[idx]]) for idx in direct]
+        for idx, result in zip(direct, upstream.run(upstream.gather(fetches, remaining_s))):
+            if not isinstance(result, BaseException):
+                lat, lng, _, radius, max_count = searches[idx][:5]
+                results[idx] = places_within(result, lat, lng, radius, max_count)
+    return results
+
+def sample_route_for_places(route_points):
+    """
+    Distribute search points evenly across the ENTIRE route based on DISTANCE.
+    This ensures we cover the full route length, not just the beginning.
+    
+    Returns:
+        Tuple of (sample_points, total_distance_km)
+    """
+    total_points = len(route_points)
+    
+    if total_points <= 3:
+        return route_points, 0.0
+    
+    # Cumulative distance from start at each point (one vectorized pass)
+    cumulative_distances = geodesy.cumulative_lengths_km(route_points)
+    total_distance_km = cumulative_distances[-1]
+    
+    if total_points <= 10:
+        # Use all points for very short routes
+        return route_points, total_distance_km
+    
+    # Determine number of samples based on route length
+    # Sample every 4-5km to ensure full coverage with overlapping search radii (3km)
+    target_sample_interval_km = 4.5  # Sample every 4.5km (with 3km radius = 1.5km overlap)
+    num_samples = max(3, min(8, int(total_distance_km / target_sample_interval_km) + 1))
+    
+    log.debug(f"📏 Route distance: {total_distance_km:.2f} km, will use {num_samples} evenly distributed search points")
+    
+    # Always include start point
+    sample_points = [route_points[0]]
+    
+    # Calculate target distances for evenly spaced samples
+    if num_samples > 2:
+        # Distribute middle points evenly
+        for i in range(1, num_samples - 1):
+            target_distance = (i * total_distance_km) / (num_samples - 1)
             
-            if not is_too_close:
-                final_places.append(place)
-                if len(final_places) >= max_results:
-                    break
+            # Find the route point closest to this target distance (cumulative
+            # distances are sorted, so bisect and compare the two neighbours)
+            closest_idx = min(bisect_left(cumulative_distances, target_distance), total_points - 1)
+            if closest_idx > 0 and abs(cumulative_distances[closest_idx - 1] - target_distance) <= abs(cumulative_distances[closest_idx] - target_distance):
+                closest_idx = bisect_left(cumulative_distances, cumulative_distances[closest_idx - 1])
+            
+            if route_points[closest_idx] not in sample_points:
+                sample_points.append(route_points[closest_idx])
+    
+    # Always include end point
+    if route_points[-1] not in sample_points:
+        sample_points.append(route_points[-1])
+    
+    return sample_points, total_distance_km
+
+def merge_places_along_route(route_points, place_type, results_per_sample, max_results, geometry=None):
+    """
+    Merge raw Places results (one list per sample point, in route order) into a
+    deduplicated list with a minimum 500m spacing between places.
+    Walking the samples in route order keeps the output stable no matter in
+    which order the concurrent searches completed. Places are ranked by their
+    exact distance to the route polyline (see geodesy.RouteGeometry).
+    """
+    # Minimum distance between places: 500m (0.5km) to avoid clustering
+    min_spacing_m = 500.0
+    accepted = []  # (place, lat, lng) in acceptance order
+    
+    for places in results_per_sample:
+        candidates = []
+        for place in places or []:
+            place_lat = place.get('location', {}).get('latitude')
+            place_lng = place.get('location', {}).get('longitude')
+            if not place_lat or not place_lng:
+                continue
+            candidates.append((place, place_lat, place_lng))
+        
+        # Keep candidates far enough from every place accepted so far and from
+        # each other, stopping once we have extra for the final deduplication
+        kept = geodesy.greedy_spacing_filter(
+            [(lat, lng) for _, lat, lng in candidates],
+            min_spacing_m,
+            limit=max_results * 2 - len(accepted),
+            existing=[(lat, lng) for _, lat, lng in accepted]
+        )
+        accepted.extend(candidates[i] for i in kept)
         
-        print(f"✅ Found {len(final_places)} unique {place_type}s along route (min 500m spacing)")
-        return final_places
+        # If we have enough results, stop merging further sample points
+        if len(accepted) >= max_results:
+            break
+    
+    # Distance from route: exact point-to-segment distance to the polyline
+    geometry = geometry or geodesy.RouteGeometry(route_points)
+    distances_m = geometry.distances_to_m([(lat, lng) for _, lat, lng in accepted])
+    
+    all_places = []
+    for (place, place_lat, place_lng), min_distance in zip(accepted, distances_m):
+        try:
+            name = place.get('displayName', {}).get('text', f'Unknown {place_type.title()}')
+            address = place.get('formattedAddress', 'Address not available')
+            phone = place.get('internationalPhoneNumber', f'Emergency: {"112" if place_type == "hospital" else "100"}')
+            distance_km = min_distance / 1000.0
+            
+            all_places.append({
+                "name": name,
+                "address": address,
+                "phone": phone,
+                "lat": place_lat,
+                "lng": place_lng,
+                "distance_from_route_km": round(distance_km, 2),
+                "distance_from_route": f"{distance_km:.1f} km"
+            })
+        except Exception as e:
+            log.warning(f"⚠️ Error processing {place_type}: {e}", extra={"sample": "places_parse"})
+            continue
+    
+    # Final deduplication pass: Remove places that are too close to each other
+    # Sort by distance from route first (closest to route preferred)
+    all_places.sort(key=lambda x: x['distance_from_route_km'])
+    kept = geodesy.greedy_spacing_filter(
+        [(p['lat'], p['lng']) for p in all_places], min_spacing_m, limit=max_results
+    )
+    return [all_places[i] for i in kept]
+
+places_along_route_flight = SingleFlight("places_along_route")
+
+def get_places_along_route_multi(route_points, type_limits, deadline_s=PLACES_ROUTE_DEADLINE_S, geometry=None):
+    """
+    Find real places of several types along a route in ONE concurrent fan-out.
+    Every sample point x place type search is dispatched at once, bounded by
+    PLACES_FETCH_CONCURRENCY and a per-route deadline. Concurrent requests for
+    the same route (to ~1m), types and deadline share one fan-out.
+    
+    Args:
+        route_points: List of (lat, lng) tuples representing the route
+        type_limits: Dict of place_type -> max_results, e.g. {"hospital": 10, "police": 5}
+        deadline_s: Budget for the whole fan-out in seconds
+        geometry: Optional prebuilt geodesy.RouteGeometry for route_points
+    
+    Returns:
+        Tuple of (places_by_type, complete): a dict of place_type -> list of place
+        dictionaries (see get_places_along_route), and whether every search answered
+    """
+    if not route_points or len(route_points) == 0:
+        return {place_type: [] for place_type in type_limits}, True
+    
+    key = (tuple(sorted(type_limits.items())), deadline_s,
+           tuple((round(lat, 5), round(lng, 5)) for lat, lng in route_points))
+    return places_along_route_flight.do(key, search_places_along_route, route_points, type_limits, deadline_s, geometry)
+
+def search_places_along_route(route_points, type_limits, deadline_s, geometry):
+    """Uncoalesced body of get_places_along_route_multi"""
+    try:
+        sample_points, total_distance_km = sample_route_for_places(route_points)
+        place_types = list(type_limits)
+        
+        log.info(f"🔍 Searching for {', '.join(place_types)} along route with {len(sample_points)} sample points "
+                 f"(from {len(route_points)} route points, {total_distance_km:.1f}km)",
+                 extra={"place_types": place_types, "sample_points": len(sample_points), "route_km": round(total_distance_km, 2)})
+        
+        # One search per (place type, sample point), laid out type-major so each
+        # type's results can be sliced back out in route order
+        searches = [
+            (lat, lng, place_type, ROUTE_SEARCH_RADIUS_M, 10)
+            for place_type in place_types
+            for (lat, lng) in sample_points
+        ]
+        with metrics.stage("places_fanout_route"):
+            raw_results = fan_out_places_searches(searches, deadline_s=deadline_s)
+        
+        geometry = geometry or geodesy.RouteGeometry(route_points)
+        places_by_type = {}
+        for type_idx, place_type in enumerate(place_types):
+            start = type_idx * len(sample_points)
+            results_per_sample = raw_results[start:start + len(sample_points)]
+            places_by_type[place_type] = merge_places_along_route(
+                route_points, place_type, results_per_sample, type_limits[place_type], geometry
+            )
+            log.debug(f"✅ Found {len(places_by_type[place_type])} unique {place_type}s along route (min 500m spacing)",
+                     extra={"place_type": place_type, "found": len(places_by_type[place_type])})
+        
+        complete = all(result is not None for result in raw_results)
+        return places_by_type, complete
         
     except Exception as e:
-        print(f"❌ Error in get_places_along_route: {e}")
-        import traceback
-        traceback.print_exc()
-        return []
+        log.exception(f"❌ Error in get_places_along_route_multi: {e}")
+        return {place_type: [] for place_type in type_limits}, False
+
+def get_places_along_route(route_points, place_type="hospital", max_results=10):
+    """
+    Find real hospitals or police stations along a route path using Google Places API.
+    Samples points along the route and searches for places within 3km radius.
+    All sample points are searched concurrently (see get_places_along_route_multi).
+    
+    Args:
+        route_points: List of (lat, lng) tuples representing the route
+        place_type: "hospital" or "police"
+        max_results: Maximum number of places to return
+    
+    Returns:
+        List of place dictionaries with name, lat, lng, address, phone, distance
+    """
+    places_by_type, _ = get_places_along_route_multi(route_points, {place_type: max_results})
+    return places_by_type.get(place_type, [])
 
-def get_safety_counts(route_points):
+def get_safety_counts(route_points, polyline_str=None, geometry=None):
     """
     Get real hospital and police station counts and locations along the route.
     Uses Google Places API to find actual emergency services along the route path.
-    Optimized with timeout to prevent blocking route responses.
+    Hospital and police searches share one concurrent fan-out with a per-route deadline.
     
     Args:
         route_points: List of (lat, lng) tuples from decoded polyline
+        polyline_str: Optional encoded overview polyline; when given, results for
+            that exact geometry are memoized in route_analysis_cache
+        geometry: Optional prebuilt geodesy.RouteGeometry for route_points
     
     Returns:
         Tuple of (counts_dict, locations_dict)
     """
-    print(f"🏥 Searching for real hospitals and police stations along route...")
+    if polyline_str:
+        memo = route_analysis_cache.get(polyline_str)
+        if memo is not None:
+            log.debug(f"♻️ Reusing memoized emergency services for this route geometry")
+            return copy.deepcopy(memo["counts"]), copy.deepcopy(memo["locations"])
+    
+    log.debug(f"🏥 Searching for real hospitals and police stations along route...")
     
     # Use shorter max_results to speed up
     max_hospitals = 10
     max_police = 5
     
-    # Find real hospitals along the route (with timeout protection)
-    try:
-        hospitals = get_places_along_route(route_points, place_type="hospital", max_results=max_hospitals)
-    except Exception as e:
-        print(f"⚠️ Error finding hospitals: {e}")
-        hospitals = []
-    
-    # Find real police stations along the route (with timeout protection)
-    try:
-        police_stations = get_places_along_route(route_points, place_type="police", max_results=max_police)
-    except Exception as e:
-        print(f"⚠️ Error finding police stations: {e}")
-        police_stations = []
+    # Find real hospitals and police stations along the route in one fan-out
+    places_by_type, complete = get_places_along_route_multi(
+        route_points, {"hospital": max_hospitals, "police": max_police}, geometry=geometry
+    )
+    hospitals = places_by_type.get("hospital", [])
+    police_stations = places_by_type.get("police", [])
     
     # Format locations for frontend
     hospital_locations = [
@@ -538,9 +1181,13 @@ def get_safety_counts(route_points):
         "police": police_locations
     }
     
-    print(f"📊 Route safety counts: {counts['hospitals']} hospitals, {counts['police']} police stations")
+    log.debug(f"📊 Route safety counts: {counts['hospitals']} hospitals, {counts['police']} police stations")
+    
+    # Only memoize when every search answered, so a deadline miss is retried next time
+    if polyline_str and complete:
+        route_analysis_cache.set(polyline_str, {"counts": counts, "locations": locations})
     
-    return counts, locations
+    return copy.deepcopy(counts), copy.deepcopy(locations)
 
 def generate_safety_warnings(crime_incidents, amenities, light_score):
     """Generate safety warnings based on route analysis"""
@@ -564,327 +1211,354 @@ def generate_safety_warnings(crime_incidents, amenities, light_score):
             warnings.append("🌃 Higher risk at night - extra caution advised")
     return warnings[:3]
 
-def get_nearby_places_with_google_api(lat, lng):
+# Directions responses are cached per normalized (origin, destination, time-of-day
+# bucket); the emergency-service analysis is memoized per overview polyline, so a
+# repeated request skips both the Directions call and the Places fan-out.
+DIRECTIONS_API_BASE_URL = os.getenv('DIRECTIONS_API_BASE_URL', 'https://maps.googleapis.com').rstrip('/')
+DIRECTIONS_URL = f"{DIRECTIONS_API_BASE_URL}/maps/api/directions/json"
+http.mount_host(DIRECTIONS_API_BASE_URL, int(os.getenv('DIRECTIONS_HTTP_POOL_SIZE', '8')))
+# Directions reports these with HTTP 200; they are worth retrying and, if they
+# persist, answering from an older cached response. UNAVAILABLE is our own
+# status for a request that never got an answer.
+DIRECTIONS_UPSTREAM_ERRORS = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR", "UNAVAILABLE"}
+DIRECTIONS_TIMEOUT_S = float(os.getenv('DIRECTIONS_TIMEOUT_S', '10'))
+DIRECTIONS_TIME_BUCKET_MIN = int(os.getenv('DIRECTIONS_TIME_BUCKET_MIN', '60'))
+COORDINATE_PATTERN = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$')
+directions_cache = TTLCache(
+    "directions",
+    ttl_s=float(os.getenv('DIRECTIONS_CACHE_TTL_S', '900')),
+    max_bytes=int(os.getenv('DIRECTIONS_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+)
+route_analysis_cache = TTLCache(
+    "route_analysis",
+    ttl_s=float(os.getenv('ROUTE_ANALYSIS_CACHE_TTL_S', '1800')),
+    max_bytes=int(os.getenv('ROUTE_ANALYSIS_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+)
+
+def normalize_location(location):
+    """Normalize a Directions origin/destination: round "lat,lng" to ~10m, else casefold the address"""
+    match = COORDINATE_PATTERN.match(location)
+    if match:
+        return f"{float(match.group(1)):.4f},{float(match.group(2)):.4f}"
+    return " ".join(location.split()).casefold()
+
+def directions_cache_key(source, destination):
+    now = datetime.now()
+    time_bucket = (now.hour * 60 + now.minute) // DIRECTIONS_TIME_BUCKET_MIN
+    return (normalize_location(source), normalize_location(destination), time_bucket)
+
+directions_flight = SingleFlight("directions")
+
+def stale_directions(key):
+    """Newest-looking expired response for the same trip, trying the nearest time buckets first"""
+    origin, destination, time_bucket = key
+    bucket_count = ceil(24 * 60 / DIRECTIONS_TIME_BUCKET_MIN)
+    for offset in sorted(range(bucket_count), key=lambda o: min(o, bucket_count - o)):
+        cached = directions_cache.get_stale((origin, destination, (time_bucket + offset) % bucket_count))
+        if cached is not None:
+            return cached
+    return None
+
+def get_directions(source, destination):
     """
-    Use Google Places API (New) to find real nearby emergency services for ANY location worldwide
+    Fetch driving alternatives from the Directions API, served from
+    directions_cache when the same trip was requested in the same time bucket.
+    Only OK responses are cached. While Directions is failing, an expired
+    response for the same trip is served instead of the error. Concurrent
+    requests for the same trip share one call.
     """
+    key = directions_cache_key(source, destination)
+    cached = directions_cache.get(key)
+    if cached is not None:
+        log.debug(f"♻️ Directions cache hit for {key[0]} → {key[1]}")
+        return cached
+    with metrics.stage("directions_fetch"):
+        return directions_flight.do(key, fetch_directions, key, source, destination)
+
+def fetch_directions(key, source, destination):
+    """Call the Directions API for one trip (coalesced by get_directions)"""
+    params = {"origin": source, "destination": destination, "alternatives": "true", "key": API_KEY}
     try:
-        print(f"🌐 Searching for emergency services near {lat}, {lng} using Google Places API (New)")
-        
-        url = "https://places.googleapis.com/v1/places:searchNearby"
-        
-        headers = {
-            'Content-Type': 'application/json',
-            'X-Goog-Api-Key': API_KEY,
-            'X-Goog-FieldMask': 'places.displayName,places.formattedAddress,places.location,places.rating,places.internationalPhoneNumber,places.types'
-        }
-        
-        # Search for hospitals
-        hospitals = []
-        print(f"🏥 Searching for hospitals within 10km...")
-        
-        hospital_data = {
-            "includedTypes": ["hospital"],
-            "maxResultCount": 10,
-            "locationRestriction": {
-                "circle": {
-                    "center": {
-                        "latitude": lat,
-                        "longitude": lng
-                    },
-                    "radius": 5000.0  # Reduced to 5km for closer results
-                }
-            },
-            "rankPreference": "DISTANCE"  # Prioritize closest results
-        }
-        
-        response = requests.post(url, json=hospital_data, headers=headers, timeout=10)
-        print(f"🔍 Google Places API Response Status: {response.status_code}")
-        
-        if response.status_code == 200:
-            result = response.json()
-            places = result.get('places', [])
-            print(f"📊 Google Places API returned {len(places)} hospitals")
-            
-            # Calculate distances and sort by proximity
-            hospitals_with_distance = []
-            for place in places:
-                try:
-                    name = place.get('displayName', {}).get('text', 'Unknown Hospital')
-                    address = place.get('formattedAddress', 'Address not available')
-                    phone = place.get('internationalPhoneNumber', 'Emergency: 112')
-                    rating = place.get('rating', 0)
-                    
-                    # Calculate distance
-                    place_lat = place.get('location', {}).get('latitude')
-                    place_lng = place.get('location', {}).get('longitude')
-                    
-                    if place_lat and place_lng:
-                        distance = calculate_distance(lat, lng, place_lat, place_lng)
-                        distance_str = f"{distance:.1f} km"
-                        
-                        # Determine specialties based on types
-                        specialties = ["Emergency"]
-                        place_types = place.get('types', [])
-                        if 'hospital' in place_types:
-                            specialties.append("General Medicine")
-                        if 'doctor' in place_types:
-                            specialties.append("Medical Care")
-                        
-                        # ✅ FIX: Include GPS coordinates for accurate navigation
-                        hospitals_with_distance.append({
-                            "name": name,
-                            "address": address,
-                            "phone": phone,
-                            "distance": distance_str,
-                            "distance_km": distance,
-                            "lat": place_lat,  # ✅ GPS LATITUDE
-                            "lng": place_lng,  # ✅ GPS LONGITUDE
-                            "specialties": specialties,
-                            "rating": rating
-                        })
-                        
-                except Exception as e:
-                    print(f"⚠️ Error processing hospital: {e}")
-                    continue
-            
-            # Sort by distance and take top 5 closest
-            hospitals_with_distance.sort(key=lambda x: x['distance_km'])
-            hospitals = hospitals_with_distance[:5]
-            
-            # Remove distance_km from final output but KEEP lat/lng for navigation
-            for hospital in hospitals:
-                del hospital['distance_km']
-                print(f"✅ Added hospital: {hospital['name']} - {hospital['distance']} - GPS: ({hospital['lat']:.4f}, {hospital['lng']:.4f})")
-                
-        else:
-            print(f"❌ Google Places API HTTP error: {response.status_code}")
-            print(f"Response: {response.text}")
-        
-        # Search for police stations
-        police_stations = []
-        print(f"👮 Searching for police stations within 8km...")
-        
-        police_data = {
-            "includedTypes": ["police"],
-            "maxResultCount": 5,
-            "locationRestriction": {
-                "circle": {
-                    "center": {
-                        "latitude": lat,
-                        "longitude": lng
-                    },
-                    "radius": 3000.0  # Reduced to 3km for closer results
-                }
-            },
-            "rankPreference": "DISTANCE"  # Prioritize closest results
-        }
-        
-        response = requests.post(url, json=police_data, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            result = response.json()
-            places = result.get('places', [])
-            print(f"📊 Google Places API returned {len(places)} police stations")
-            
-            for place in places[:3]:  # Get top 3 police stations
-                try:
-                    name = place.get('displayName', {}).get('text', 'Police Station')
-                    address = place.get('formattedAddress', 'Address not available')
-                    phone = place.get('internationalPhoneNumber', 'Emergency: 100')
-                    
-                    # Calculate distance
-                    place_lat = place.get('location', {}).get('latitude')
-                    place_lng = place.get('location', {}).get('longitude')
-                    
-                    if place_lat and place_lng:
-                        distance = calculate_distance(lat, lng, place_lat, place_lng)
-                        distance_str = f"{distance:.1f} km"
-                        
-                        # ✅ FIX: Include GPS coordinates for accurate navigation
-                        police_stations.append({
-                            "name": name,
-                            "address": address,
-                            "phone": phone,
-                            "distance": distance_str,
-                            "lat": place_lat,  # ✅ GPS LATITUDE
-                            "lng": place_lng,  # ✅ GPS LONGITUDE
-                            "type": "Local Police"
-                        })
-                    else:
-                        # Skip if no GPS coordinates available
-                        continue
-                    
-                    print(f"✅ Added police station: {name} - {distance_str} - GPS: ({place_lat:.4f}, {place_lng:.4f})")
-                    
-                except Exception as e:
-                    print(f"⚠️ Error processing police station: {e}")
-                    continue
-        else:
-            print(f"⚠️ No police stations found or API error")
-        
-        # Search for gas stations (as mechanics alternative)
-        mechanics = []
-        print(f"⛽ Searching for gas stations within 8km...")
-        
-        gas_data = {
-            "includedTypes": ["gas_station"],
-            "maxResultCount": 5,
-            "locationRestriction": {
-                "circle": {
-                    "center": {
-                        "latitude": lat,
-                        "longitude": lng
-                    },
-                    "radius": 3000.0  # Reduced to 3km for closer results
-                }
-            },
-            "rankPreference": "DISTANCE"  # Prioritize closest results
-        }
-        
-        response = requests.post(url, json=gas_data, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            result = response.json()
-            places = result.get('places', [])
-            print(f"📊 Google Places API returned {len(places)} gas stations")
-            
-            for place in places[:3]:  # Get top 3 gas stations
-                try:
-                    name = place.get('displayName', {}).get('text', 'Gas Station')
-                    address = place.get('formattedAddress', 'Address not available')
-                    phone = place.get('internationalPhoneNumber', 'Roadside: 1073')
-                    
-                    # Calculate distance
-                    place_lat = place.get('location', {}).get('latitude')
-                    place_lng = place.get('location', {}).get('longitude')
-                    
-                    if place_lat and place_lng:
-                        distance = calculate_distance(lat, lng, place_lat, place_lng)
-                        distance_str = f"{distance:.1f} km"
-                        
-                        # ✅ FIX: Include GPS coordinates for accurate navigation
-                        mechanics.append({
-                            "name": name,
-                            "address": address,
-                            "phone": phone,
-                            "distance": distance_str,
-                            "lat": place_lat,  # ✅ GPS LATITUDE
-                            "lng": place_lng,  # ✅ GPS LONGITUDE
-                            "services": ["Fuel", "Basic Repairs", "Emergency Service"]
-                        })
-                    else:
-                        # Skip if no GPS coordinates available
-                        continue
-                    
-                    print(f"✅ Added gas station: {name} - {distance_str} - GPS: ({place_lat:.4f}, {place_lng:.4f})")
-                    
-                except Exception as e:
-                    print(f"⚠️ Error processing gas station: {e}")
-                    continue
+        is_failure = lambda r: r.json().get("status") in DIRECTIONS_UPSTREAM_ERRORS
+        if upstream.enabled:
+            raw = upstream.run(upstream.request("directions", "GET", DIRECTIONS_URL, params=params,
+                                                timeout=DIRECTIONS_TIMEOUT_S, is_failure=is_failure))
         else:
-            print(f"⚠️ No gas stations found or API error")
-        
-        # Search for lodging (hotels)
-        hotels = []
-        print(f"🏨 Searching for hotels within 8km...")
-        
-        hotel_data = {
-            "includedTypes": ["lodging"],
-            "maxResultCount": 5,
-            "locationRestriction": {
-                "circle": {
-                    "center": {
-                        "latitude": lat,
-                        "longitude": lng
-                    },
-                    "radius": 3000.0  # Reduced to 3km for closer results
-                }
-            },
-            "rankPreference": "DISTANCE"  # Prioritize closest results
-        }
-        
-        response = requests.post(url, json=hotel_data, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            result = response.json()
-            places = result.get('places', [])
-            print(f"📊 Google Places API returned {len(places)} hotels")
+            raw = http.request("directions", "GET", DIRECTIONS_URL, params=params,
+                               timeout=DIRECTIONS_TIMEOUT_S, is_failure=is_failure)
+        if raw.status_code != 200:
+            raise requests.HTTPError(f"Directions API HTTP {raw.status_code}")
+        response = raw.json()
+    except (requests.RequestException, ValueError) as e:
+        response = {"status": "UNAVAILABLE", "error_message": str(e)}
+    
+    if response.get("status") == "OK":
+        directions_cache.set(key, response)
+    elif response.get("status") in DIRECTIONS_UPSTREAM_ERRORS:
+        stale = stale_directions(key)
+        if stale is not None:
+            log.info(f"♻️ Directions {response.get('status')} - serving stale response for {key[0]} → {key[1]}")
+            return stale
+    return response
+
+# Whole-request budget for analysing every Directions alternative in /get-routes
+ROUTE_ANALYSIS_DEADLINE_S = float(os.getenv('ROUTE_ANALYSIS_DEADLINE_S', '8'))
+
+def build_route_data(route_idx, route, route_points, geometry, amenities, locations, degraded=False):
+    """
+    Score one Directions alternative and shape it for the frontend.
+    `degraded` marks routes whose emergency-service lookup missed the deadline.
+    """
+    leg = route["legs"][0]
+    polyline_str = route["overview_polyline"]["points"]
+    distance_km = leg["distance"]["value"] / 1000
+    area_type = "Main Road" if "highway" in route.get("summary", "").lower() else "Urban"
+    
+    with metrics.stage("crime_generation"):
+        crime_incidents = generate_realistic_crime_incidents(route_points, area_type)
+    with metrics.stage("scoring"):
+        street_light_score = estimate_street_light_score(route_points, area_type)
+        crime_score = calculate_crime_risk_score(crime_incidents, route_points, geometry)
+        safety_score = calculate_final_safety_score(amenities["hospitals"], amenities["police"], street_light_score, crime_score, distance_km)
+        warnings = generate_safety_warnings(crime_incidents, amenities, street_light_score)
+    if degraded:
+        warnings = ["⏱️ Emergency services lookup timed out - partial safety data"] + warnings[:2]
+    
+    return {
+        "distance": leg["distance"]["text"],
+        "duration": leg["duration"]["text"],
+        "distance_meters": leg["distance"]["value"],
+        "duration_seconds": leg["duration"]["value"],
+        "polyline": polyline_str,
+        "hospital_count": amenities["hospitals"],
+        "police_count": amenities["police"],
+        "crime_incidents": crime_incidents,
+        "hospital_locations": locations.get("hospitals", []),
+        "police_locations": locations.get("police", []),
+        "area_type": area_type,
+        "street_light_score": street_light_score,
+        "crime_score": crime_score,
+        "safety_score": safety_score,
+        "summary": route.get("summary", ""),
+        "warnings": warnings,
+        "degraded": degraded,
+        "index": route_idx
+    }
+
+def analyze_route(route_idx, route, route_points, geometry):
+    """Full analysis of one Directions alternative: Places lookups, crime, lighting, scores and warnings"""
+    # Generate safety data with REAL hospitals and police stations along route
+    log.debug(f"🔍 Route {route_idx + 1}: Finding real emergency services along {len(route_points)} route points...")
+    try:
+        amenities, locations = get_safety_counts(route_points, route["overview_polyline"]["points"], geometry)
+    except Exception as e:
+        log.warning(f"⚠️ Error getting safety counts for route {route_idx + 1}: {e}")
+        # Fallback to empty counts if API fails
+        amenities = {"hospitals": 0, "police": 0}
+        locations = {"hospitals": [], "police": []}
+    
+    return build_route_data(route_idx, route, route_points, geometry, amenities, locations)
+
+def analyze_routes_concurrently(google_routes, deadline_s=ROUTE_ANALYSIS_DEADLINE_S, on_route=None):
+    """
+    Analyse all Directions alternatives at once and gather them under one deadline.
+    Routes that miss the deadline come back as partial results flagged `degraded`
+    (geometry and local scores, no emergency services) instead of stalling the response.
+    `on_route(route_data)` is called on the caller's green thread as each route
+    is ready, in completion order.
+    
+    Returns:
+        List of route_data dicts in the same order as `google_routes`
+    """
+    with metrics.stage("polyline_decode"):
+        decoded = [polyline.decode(route["overview_polyline"]["points"]) for route in google_routes]
+        # One segment index per route, shared by the places ranker and crime scorer
+        geometries = [geodesy.RouteGeometry(points) for points in decoded]
+    results = [None] * len(google_routes)
+    if not google_routes:
+        return []
+    
+    finished = queue.Queue()
+    
+    def run(route_idx):
+        try:
+            finished.put((route_idx, analyze_route(route_idx, google_routes[route_idx], decoded[route_idx], geometries[route_idx]), None))
+        except Exception as e:
+            finished.put((route_idx, None, e))
+    
+    pool = eventlet.GreenPool(len(google_routes))
+    threads = [pool.spawn(logs.bind(run), route_idx) for route_idx in range(len(google_routes))]
+    
+    # Collect in completion order; the deadline applies to the batch, not to each route
+    deadline = time.monotonic() + deadline_s
+    for _ in threads:
+        try:
+            route_idx, route_data, error = finished.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            break
+        if error is not None:
+            log.warning(f"⚠️ Route {route_idx + 1} analysis failed: {error}")
+            route_data = build_route_data(
+                route_idx, google_routes[route_idx], decoded[route_idx], geometries[route_idx],
+                {"hospitals": 0, "police": 0}, {"hospitals": [], "police": []}
+            )
+        results[route_idx] = route_data
+        if on_route is not None:
+            on_route(route_data)
+    
+    for route_idx, thread in enumerate(threads):
+        if results[route_idx] is None:
+            thread.kill()
+            log.warning(f"⏱️ Route {route_idx + 1} missed the {deadline_s}s analysis deadline - returning degraded result")
+            results[route_idx] = build_route_data(
+                route_idx, google_routes[route_idx], decoded[route_idx], geometries[route_idx],
+                {"hospitals": 0, "police": 0}, {"hospitals": [], "police": []},
+                degraded=True
+            )
+            if on_route is not None:
+                on_route(results[route_idx])
+    
+    return results
+
+# Emergency services looked up for an SOS, one Places search per category, all
+# issued at once. `max_results` is how many the search asks for (nearest first),
+# `keep` how many of the nearest end up in the suggestions.
+SOS_LOOKUP_DEADLINE_S = float(os.getenv('SOS_LOOKUP_DEADLINE_S', '8'))
+
+def hospital_details(place):
+    specialties = ["Emergency"]
+    place_types = place.get('types', [])
+    if 'hospital' in place_types:
+        specialties.append("General Medicine")
+    if 'doctor' in place_types:
+        specialties.append("Medical Care")
+    return {"specialties": specialties, "rating": place.get('rating', 0)}
+
+EMERGENCY_CATEGORIES = [
+    {"key": "hospitals", "place_type": "hospital", "label": "hospitals", "icon": "🏥",
+     "radius_m": 5000.0, "max_results": 10, "keep": 5,
+     "default_name": "Unknown Hospital", "default_phone": "Emergency: 112",
+     "details": hospital_details},
+    {"key": "police_stations", "place_type": "police", "label": "police stations", "icon": "👮",
+     "radius_m": 3000.0, "max_results": 5, "keep": 3,
+     "default_name": "Police Station", "default_phone": "Emergency: 100",
+     "details": lambda place: {"type": "Local Police"}},
+    # Gas stations stand in for mechanics
+    {"key": "mechanics", "place_type": "gas_station", "label": "gas stations", "icon": "⛽",
+     "radius_m": 3000.0, "max_results": 5, "keep": 3,
+     "default_name": "Gas Station", "default_phone": "Roadside: 1073",
+     "details": lambda place: {"services": ["Fuel", "Basic Repairs", "Emergency Service"]}},
+    {"key": "hotels_restrooms", "place_type": "lodging", "label": "hotels", "icon": "🏨",
+     "radius_m": 3000.0, "max_results": 5, "keep": 3,
+     "default_name": "Hotel", "default_phone": "Emergency: 112",
+     "details": lambda place: {"amenities": ["Safe Space", "Reception", "Restrooms", "Security"]}},
+]
+
+EMERGENCY_TIPS = [
+    "Stay calm and move to a well-lit, populated area immediately",
+    "Call 100 for police, 102 for ambulance, or 112 for general emergency",
+    "Share your live location with trusted contacts using WhatsApp or Google Maps",
+    "If you feel unsafe, enter the nearest shop, hotel, or public building",
+    "Keep your phone charged and emergency numbers readily accessible",
+    "Trust your instinsts - if something feels wrong, seek help immediately"
+]
+
+def normalize_emergency_place(place, lat, lng, category):
+    """
+    Turn one Places API (New) result into a suggestion entry for `category`.
+    
+    Returns:
+        (entry, distance_km), or None when the place has no coordinates
+    """
+    location = place.get('location', {})
+    place_lat = location.get('latitude')
+    place_lng = location.get('longitude')
+    if not place_lat or not place_lng:
+        return None
+    
+    distance = calculate_distance(lat, lng, place_lat, place_lng)
+    entry = {
+        "name": place.get('displayName', {}).get('text', category["default_name"]),
+        "address": place.get('formattedAddress', 'Address not available'),
+        "phone": place.get('internationalPhoneNumber', category["default_phone"]),
+        "distance": f"{distance:.1f} km",
+        "lat": place_lat,  # ✅ GPS coordinates for accurate navigation
+        "lng": place_lng
+    }
+    entry.update(category["details"](place))
+    return entry, distance
+
+# SOS alerts from the same spot (rounded to SOS_COALESCE_DECIMALS, 4 ~ 11m)
+# share one emergency-services lookup
+SOS_COALESCE_DECIMALS = int(os.getenv('SOS_COALESCE_DECIMALS', '4'))
+nearby_places_flight = SingleFlight("nearby_places")
+
+def get_nearby_places_with_google_api(lat, lng, deadline_s=SOS_LOOKUP_DEADLINE_S):
+    """
+    Use Google Places API (New) to find real nearby emergency services for ANY location worldwide.
+    All EMERGENCY_CATEGORIES are searched concurrently; categories that have not
+    answered by `deadline_s` come back empty instead of holding up the rest.
+    Concurrent lookups for the same spot and deadline share one search.
+    """
+    key = (round(lat, SOS_COALESCE_DECIMALS), round(lng, SOS_COALESCE_DECIMALS), deadline_s)
+    return nearby_places_flight.do(key, search_nearby_emergency_places, lat, lng, deadline_s)
+
+def search_nearby_emergency_places(lat, lng, deadline_s):
+    """Uncoalesced body of get_nearby_places_with_google_api"""
+    try:
+        log.info(f"🌐 Searching for emergency services near {lat}, {lng} using Google Places API (New)")
+        
+        searches = [(lat, lng, category["place_type"], category["radius_m"], category["max_results"], deadline_s)
+                    for category in EMERGENCY_CATEGORIES]
+        with metrics.stage("places_fanout_sos"):
+            results = fan_out_places_searches(searches, deadline_s, concurrency=len(searches))
+        
+        suggestions = {}
+        for category, places in zip(EMERGENCY_CATEGORIES, results):
+            if places is None:
+                log.warning(f"⚠️ No {category['label']} found - API error or deadline")
+                suggestions[category["key"]] = []
+                continue
             
-            for place in places[:3]:  # Get top 3 hotels
+            entries = []
+            for place in places:
                 try:
-                    name = place.get('displayName', {}).get('text', 'Hotel')
-                    address = place.get('formattedAddress', 'Address not available')
-                    phone = place.get('internationalPhoneNumber', 'Emergency: 112')
-                    
-                    # Calculate distance
-                    place_lat = place.get('location', {}).get('latitude')
-                    place_lng = place.get('location', {}).get('longitude')
-                    
-                    if place_lat and place_lng:
-                        distance = calculate_distance(lat, lng, place_lat, place_lng)
-                        distance_str = f"{distance:.1f} km"
-                        
-                        # ✅ FIX: Include GPS coordinates for accurate navigation
-                        hotels.append({
-                            "name": name,
-                            "address": address,
-                            "phone": phone,
-                            "distance": distance_str,
-                            "lat": place_lat,  # ✅ GPS LATITUDE
-                            "lng": place_lng,  # ✅ GPS LONGITUDE
-                            "amenities": ["Safe Space", "Reception", "Restrooms", "Security"]
-                        })
-                    else:
-                        # Skip if no GPS coordinates available
-                        continue
-                    
-                    print(f"✅ Added hotel: {name} - {distance_str} - GPS: ({place_lat:.4f}, {place_lng:.4f})")
-                    
+                    normalized = normalize_emergency_place(place, lat, lng, category)
                 except Exception as e:
-                    print(f"⚠️ Error processing hotel: {e}")
+                    log.warning(f"⚠️ Error processing {category['place_type']}: {e}", extra={"sample": "places_parse"})
                     continue
-        else:
-            print(f"⚠️ No hotels found or API error")
+                if normalized is not None:
+                    entries.append(normalized)
+            entries.sort(key=lambda item: item[1])
+            suggestions[category["key"]] = [entry for entry, _ in entries[:category["keep"]]]
+            log.debug(f"{category['icon']} Google Places API returned {len(places)} {category['label']}, kept {len(suggestions[category['key']])}")
         
         # Return the real places data if we found at least some services
-        if hospitals or police_stations or mechanics or hotels:
-            print(f"✅ Google Places API found: {len(hospitals)} hospitals, {len(police_stations)} police, {len(mechanics)} mechanics, {len(hotels)} safe places")
-            return {
-                "hospitals": hospitals,
-                "police_stations": police_stations,
-                "mechanics": mechanics,
-                "hotels_restrooms": hotels,
-                "emergency_tips": [
-                    "Stay calm and move to a well-lit, populated area immediately",
-                    "Call 100 for police, 102 for ambulance, or 112 for general emergency",
-                    "Share your live location with trusted contacts using WhatsApp or Google Maps",
-                    "If you feel unsafe, enter the nearest shop, hotel, or public building",
-                    "Keep your phone charged and emergency numbers readily accessible",
-                    "Trust your instinsts - if something feels wrong, seek help immediately"
-                ]
-            }
+        if any(suggestions.values()):
+            log.info(f"✅ Google Places API found: " + ", ".join(f"{len(suggestions[c['key']])} {c['label']}" for c in EMERGENCY_CATEGORIES))
+            suggestions["emergency_tips"] = list(EMERGENCY_TIPS)
+            return suggestions
         else:
-            print(f"⚠️ Google Places API found no emergency services")
+            log.warning(f"⚠️ Google Places API found no emergency services")
             return None
             
     except Exception as e:
-        print(f"❌ Error fetching places from Google API: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"❌ Error fetching places from Google API: {e}")
         return None
 
-def get_emergency_suggestions_with_groq(lat, lng):
+def request_groq_emergency_suggestions(lat, lng):
     """
-    Use Groq AI to find nearby emergency services and provide safety suggestions
-    FAST & UNLIMITED - Primary AI provider
+    Use Groq AI to find nearby emergency services and provide safety suggestions.
+    Returns None when Groq is unavailable or gives no usable answer, so callers
+    decide what to fall back to.
     """
-    if not GROQ_AVAILABLE or not groq_client:
-        print("⚠️ Groq AI not available, using fallback")
-        return get_fallback_emergency_suggestions(lat, lng)
+    groq_client = get_groq_client()
+    if groq_client is None:
+        log.warning("⚠️ Groq AI not available")
+        return None
     
     try:
-        print(f"🤖 Using Groq AI for emergency suggestions at {lat}, {lng}")
+        log.info(f"🤖 Using Groq AI for emergency suggestions at {lat}, {lng}")
         
         prompt = f"""You are an emergency response AI. Find the CLOSEST emergency services to these coordinates: {lat}, {lng}
 
@@ -914,7 +1588,7 @@ Respond ONLY with valid JSON (no markdown, no explanation):
 }}"""
 
         # Call Groq API
-        chat_completion = groq_client.chat.completions.create(
+        completion_args = dict(
             messages=[
                 {
                     "role": "system",
@@ -925,15 +1599,18 @@ Respond ONLY with valid JSON (no markdown, no explanation):
                     "content": prompt
                 }
             ],
-            model="llama-3.1-8b-instant",  # Fast and current model
+            model=GROQ_MODEL,
             temperature=0.1,
             max_tokens=4096,
             response_format={"type": "json_object"}  # Forces JSON response
         )
+        if upstream.enabled:
+            chat_completion = upstream.run(upstream.chat_completion(**completion_args))
+        else:
+            chat_completion = groq_client.chat.completions.create(**completion_args)
         
         response_text = chat_completion.choices[0].message.content.strip()
-        print(f"📝 Groq Response Length: {len(response_text)} chars")
-        print(f"📝 First 200 chars: {response_text[:200]}")
+        log.debug("📝 Groq response: %s chars: %s", len(response_text), response_text[:200])
         
         # Parse JSON
         suggestions = json.loads(response_text)
@@ -947,27 +1624,28 @@ Respond ONLY with valid JSON (no markdown, no explanation):
         total_results = sum(len(suggestions.get(key, [])) for key in required_keys[:4])
         
         if total_results == 0:
-            print("⚠️ Groq returned no results, using fallback")
-            return get_fallback_emergency_suggestions(lat, lng)
+            log.warning("⚠️ Groq returned no results")
+            return None
         
-        print(f"✅ Groq AI Success!")
-        print(f"   📊 Hospitals: {len(suggestions.get('hospitals', []))}")
-        print(f"   📊 Police: {len(suggestions.get('police_stations', []))}")
-        print(f"   📊 Mechanics: {len(suggestions.get('mechanics', []))}")
-        print(f"   📊 Safe Places: {len(suggestions.get('hotels_restrooms', []))}")
+        log.info("✅ Groq AI success", extra={"counts": {key: len(suggestions.get(key, [])) for key in required_keys[:4]}})
         
         return suggestions
         
     except json.JSONDecodeError as e:
-        print(f"❌ JSON Parse Error: {e}")
-        print(f"Raw response: {response_text[:500] if 'response_text' in locals() else 'N/A'}")
-        return get_fallback_emergency_suggestions(lat, lng)
+        log.error(f"❌ Groq JSON parse error: {e}",
+                  extra={"raw_response": response_text[:500] if 'response_text' in locals() else None})
+        return None
     except Exception as e:
-        print(f"❌ Groq API Error: {e}")
-        traceback.print_exc()
-        return get_fallback_emergency_suggestions(lat, lng)
-
+        log.exception(f"❌ Groq API error: {e}")
+        return None
 
+def get_emergency_suggestions_with_groq(lat, lng):
+    """Groq AI emergency suggestions, falling back to get_fallback_emergency_suggestions"""
+    suggestions = request_groq_emergency_suggestions(lat, lng)
+    if suggestions is None:
+        log.warning("⚠️ Groq AI gave no suggestions, using fallback")
+        return get_fallback_emergency_suggestions(lat, lng)
+    return suggestions
 
 def get_fallback_emergency_suggestions(lat, lng):
     """
@@ -975,10 +1653,9 @@ def get_fallback_emergency_suggestions(lat, lng):
     1. Try Google Places API (New) FIRST
     2. If that fails, use generic suggestions
     """
-    print(f"🔄 Using fallback emergency suggestions for {lat}, {lng}")
+    log.info(f"🔄 Using fallback emergency suggestions for {lat}, {lng} - trying Google Places API (New)")
     
     # Try Google Places API (New)
-    print(f"🌐 Attempting Google Places API (New)...")
     try:
         places_suggestions = get_nearby_places_with_google_api(lat, lng)
         
@@ -990,23 +1667,23 @@ def get_fallback_emergency_suggestions(lat, lng):
                        (places_suggestions.get('hotels_restrooms') and len(places_suggestions.get('hotels_restrooms', [])) > 0))
             
             if has_data:
-                print(f"✅ Google Places API Success!")
-                print(f"   📊 Hospitals: {len(places_suggestions.get('hospitals', []))}")
-                print(f"   📊 Police: {len(places_suggestions.get('police_stations', []))}")
-                print(f"   📊 Mechanics: {len(places_suggestions.get('mechanics', []))}")
-                print(f"   📊 Safe Places: {len(places_suggestions.get('hotels_restrooms', []))}")
+                log.info("✅ Google Places API success", extra={"counts": {
+                    key: len(places_suggestions.get(key, [])) for key in ('hospitals', 'police_stations', 'mechanics', 'hotels_restrooms')}})
                 return places_suggestions
             else:
-                print(f"⚠️ Google Places API returned empty results")
+                log.warning(f"⚠️ Google Places API returned empty results")
         else:
-            print(f"⚠️ Google Places API returned None")
+            log.warning(f"⚠️ Google Places API returned None")
             
     except Exception as e:
-        print(f"⚠️ Google Places API failed: {e}")
-        traceback.print_exc()
+        log.warning(f"⚠️ Google Places API failed: {e}", exc_info=True)
     
     # Generic fallback as last resort
-    print(f"📍 Using generic emergency suggestions for {lat:.4f}, {lng:.4f}")
+    return get_generic_emergency_suggestions(lat, lng)
+
+def get_generic_emergency_suggestions(lat, lng):
+    """Static emergency numbers and advice; needs no network"""
+    log.info(f"📍 Using generic emergency suggestions for {lat:.4f}, {lng:.4f}")
     return {
         "hospitals": [
             {
@@ -1062,45 +1739,397 @@ def get_fallback_emergency_suggestions(lat, lng):
     }
 
 # Database Initialization
+FEEDBACK_RTREE_AVAILABLE = False  # Set by init_db once the R*Tree index exists
+
+def feedback_rows_query(bbox=None, before_id=None):
+    """
+    SQL and parameters selecting route_feedback rows newest-first, optionally
+    only those inside `bbox` = (min_lat, min_lng, max_lat, max_lng), continuing
+    after the report `before_id`. The (timestamp, id) keyset walks the timestamp
+    index, as alerts_query does for alerts. The box is
+    resolved through the route_feedback_rtree index when SQLite has R*Tree support.
+    R*Tree stores 32-bit coordinates rounded outwards, so its entries are matched
+    by overlap rather than containment (a point on the edge is never lost); the
+    few extra rows that admits are dropped by the callers' exact distance check.
+    """
+    join = ""
+    clauses = ["f.lat IS NOT NULL", "f.lng IS NOT NULL"]
+    params = []
+    if before_id is not None:
+        clauses.append("(f.timestamp, f.id) < ((SELECT timestamp FROM route_feedback WHERE id = ?), ?)")
+        params += [before_id, before_id]
+    if bbox is not None:
+        min_lat, min_lng, max_lat, max_lng = bbox
+        if FEEDBACK_RTREE_AVAILABLE:
+            join = "JOIN route_feedback_rtree r ON r.id = f.id"
+            clauses += ["r.max_lat >= ?", "r.min_lat <= ?", "r.max_lng >= ?", "r.min_lng <= ?"]
+        else:
+            clauses += ["f.lat BETWEEN ? AND ?", "f.lng BETWEEN ? AND ?"]
+        params += [min_lat, max_lat, min_lng, max_lng]
+    
+    sql = f"""SELECT f.id, f.lat, f.lng, f.type, f.description, f.timestamp, f.user_name
+              FROM route_feedback f {join}
+              WHERE {' AND '.join(clauses)}
+              ORDER BY f.timestamp DESC, f.id DESC"""
+    return sql, params
+
+def iter_feedback_rows(c, bbox=None, before_id=None):
+    """Yield the rows selected by feedback_rows_query, fetched in batches"""
+    c.execute(*feedback_rows_query(bbox, before_id))
+    while True:
+        rows = c.fetchmany(200)
+        if not rows:
+            return
+        yield from rows
+
+ALERTS_PAGE_LIMIT = 200
+ALERTS_MAX_PAGE_LIMIT = 1000
+# An X-Sync-Cursor value: updated_at as written by SQLite, or a legacy timestamp
+ALERT_SYNC_TS_RE = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(\.\d{1,6})?')
+
+def int_arg(name, default=None, minimum=None):
+    """Integer query parameter; ValueError if it is present but malformed or below `minimum`"""
+    raw = request.args.get(name)
+    if raw is None or raw == '':
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+    if minimum is not None and value < minimum:
+        raise ValueError(f"{name} must be at least {minimum}")
+    return value
+
+# updated_at for a write to sos_alerts, evaluated by SQLite inside the write.
+# SQLite runs one writer at a time, so the values follow commit order and a
+# reader's cursor can never pass a change that is still uncommitted; stepping
+# past the newest existing value keeps them unique within a millisecond.
+NEXT_ALERT_UPDATED_AT_SQL = """(SELECT MAX(strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'),
+                                      COALESCE(strftime('%Y-%m-%d %H:%M:%f', julianday(MAX(updated_at)) + 0.001 / 86400.0), ''))
+                                FROM sos_alerts)"""
+
+def alerts_query(status=None, before_id=None, since_id=None, since_ts=None, since_ts_id=0, limit=ALERTS_PAGE_LIMIT):
+    """
+    SQL and parameters for one page of sos_alerts.
+    
+    Listing mode (no since_*): newest first, optionally filtered by status,
+    continuing after the alert `before_id`. The (timestamp, id) keyset walks
+    the status/timestamp indexes without sorting or skipping rows.
+    
+    Delta mode: alerts created or updated after the (`since_ts`, `since_ts_id`)
+    cursor - an (updated_at, id) pair, so rows sharing an updated_at are never
+    split across pages - or failing that only those created after `since_id`,
+    oldest change first so the last row is the cursor for the next call.
+    """
+    clauses = []
+    params = []
+    if since_ts is not None:
+        clauses.append("(updated_at, id) > (?, ?)")
+        params += [since_ts, since_ts_id]
+        order = "updated_at, id"
+    elif since_id is not None:
+        clauses.append("id > ?")
+        params.append(since_id)
+        order = "id"
+    else:
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if before_id is not None:
+            clauses.append("(timestamp, id) < ((SELECT timestamp FROM sos_alerts WHERE id = ?), ?)")
+            params += [before_id, before_id]
+        order = "timestamp DESC, id DESC"
+    
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sql = f"""SELECT id, lat, lng, timestamp, status, user_name, updated_at FROM sos_alerts
+              {where} ORDER BY {order} LIMIT ?"""
+    return sql, params + [limit]
+
+def hot_queries():
+    """
+    The per-request queries whose plans init_db checks at startup, as
+    (name, sql, params, allow_sort). A full table scan in any of them means an
+    index went missing.
+    """
+    feedback_sql, feedback_params = feedback_rows_query(bbox=(17.3, 78.4, 17.5, 78.6))
+    return [
+        ("get_all_alerts", *alerts_query(), False),
+        ("get_all_alerts?cursor", *alerts_query(before_id=1), False),
+        ("get_all_alerts?status", *alerts_query(status="PENDING"), False),
+        ("get_all_alerts?status&cursor", *alerts_query(status="PENDING", before_id=1), False),
+        ("get_all_alerts?since_ts", *alerts_query(since_ts="2024-01-01 00:00:00", since_ts_id=1), False),
+        ("get_all_alerts?since_id", *alerts_query(since_id=1), False),
+        ("get_feedback", *feedback_rows_query(), False),
+        ("get_feedback?cursor", *feedback_rows_query(before_id=1), False),
+        # The box is small, so sorting its matches is fine; scanning the table is not
+        ("get_feedback?bbox", feedback_sql, feedback_params, True),
+    ]
+
 def init_db():
-    conn = sqlite3.connect('saferoute.db')
-    c = conn.cursor()
-   
-    # Create SOS alerts table with user_name column
-    c.execute('''CREATE TABLE IF NOT EXISTS sos_alerts
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  lat REAL NOT NULL,
-                  lng REAL NOT NULL,
-                  timestamp DATETIME NOT NULL,
-                  status TEXT DEFAULT 'PENDING',
-                  user_name TEXT DEFAULT 'Anonymous')''')
-   
-    # Create feedback table with user_name column
-    c.execute('''CREATE TABLE IF NOT EXISTS route_feedback
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  lat REAL,
-                  lng REAL,
-                  type TEXT,
-                  description TEXT,
-                  timestamp DATETIME NOT NULL,
-                  route_polyline TEXT,
-                  user_name TEXT DEFAULT 'Anonymous')''')
-   
-    # Add user_name column to existing tables if they don't have it
+    """Apply pending schema migrations and check the hot queries still use indexes"""
+    global FEEDBACK_RTREE_AVAILABLE
+    with get_db() as conn:
+        before, after = migrations.migrate(conn)
+        if before != after:
+            log.info(f"🗄️ Database schema upgraded from version {before} to {after}")
+        
+        try:
+            conn.execute("SELECT 1 FROM route_feedback_rtree LIMIT 1")
+            FEEDBACK_RTREE_AVAILABLE = True
+        except sqlite3.OperationalError:
+            FEEDBACK_RTREE_AVAILABLE = False
+        
+        regressions = migrations.check_query_plans(conn, hot_queries())
+    for name, plan in regressions.items():
+        log.warning(f"⚠️ Query plan regression in {name}: {'; '.join(plan)}")
+
+init_db()
+warm_places_cache()
+eventlet.spawn(refresh_hot_places_tiles)
+
+# Admin event stream: every dashboard event carries a sequence number and is
+# kept in a ring buffer, so a reconnecting admin replays only what it missed.
+# The epoch changes on every restart, which invalidates old sequence numbers.
+ADMIN_EVENT_BUFFER_SIZE = int(os.getenv('ADMIN_EVENT_BUFFER_SIZE', '500'))
+ADMIN_STREAM_EPOCH = f"{int(time.time() * 1000):x}-{os.getpid()}"
+admin_events = deque(maxlen=ADMIN_EVENT_BUFFER_SIZE)
+admin_event_seq = 0
+admin_events_lock = threading.Lock()
+
+def emit_admin_event(event, payload, room='admin'):
+    """
+    Stamp `payload` with the next sequence number, buffer it and emit it.
+    Call after the change is committed so a snapshot read at sequence N
+    already reflects events 1..N. `room=None` broadcasts to every client.
+    """
+    global admin_event_seq
+    with admin_events_lock:
+        admin_event_seq += 1
+        data = dict(payload, seq=admin_event_seq, epoch=ADMIN_STREAM_EPOCH)
+        admin_events.append((event, data))
+        # Emit under the lock so clients receive events in sequence order
+        with metrics.stage("socketio_emit"):
+            if room is None:
+                socketio.emit(event, data, namespace='/')
+            else:
+                socketio.emit(event, data, room=room)
+        metrics.SOCKETIO_EMITS.inc(event=event)
+    return data
+
+# SOS enrichment: send_alert stores and broadcasts the alert straight away and
+# queues the slow emergency-services lookup for a pool of background workers.
+# Results are pushed as 'sos_enriched' and kept in sos_enrichments for polling.
+SOS_ENRICH_WORKERS = int(os.getenv('SOS_ENRICH_WORKERS', '4'))
+SOS_ENRICH_QUEUE_SIZE = int(os.getenv('SOS_ENRICH_QUEUE_SIZE', '200'))
+SOS_ENRICH_RESUME_WINDOW_S = float(os.getenv('SOS_ENRICH_RESUME_WINDOW_S', '3600'))
+EMERGENCY_SUGGESTION_KEYS = [category["key"] for category in EMERGENCY_CATEGORIES]
+sos_enrich_queue = queue.Queue(maxsize=SOS_ENRICH_QUEUE_SIZE)
+sos_enrich_stats = {"queued": 0, "done": 0, "failed": 0, "rejected": 0, "resumed": 0}
+
+def has_emergency_suggestions(suggestions):
+    return bool(suggestions) and any(len(suggestions.get(key, [])) > 0 for key in EMERGENCY_SUGGESTION_KEYS)
+
+# Provider chain for SOS suggestions. The primary (Google Places) gets a head
+# start of SOS_HEDGE_DELAY_S; if it has not produced a valid answer by then the
+# backup (Groq) is started alongside it and the first valid answer wins. A
+# provider that fails or answers with nothing starts the next one at once.
+SOS_HEDGE_DELAY_S = float(os.getenv('SOS_HEDGE_DELAY_S', '2.5'))
+SOS_PROVIDER_DEADLINE_S = float(os.getenv('SOS_PROVIDER_DEADLINE_S', '12'))
+
+sos_provider_histogram = metrics_registry.histogram(
+    "saferoute_sos_provider_seconds", "SOS suggestion provider latency in the hedged race", ("provider",),
+    buckets=LatencyHistogram.BUCKETS, outcomes_name="saferoute_sos_provider_outcomes_total")
+sos_provider_latency = {name: sos_provider_histogram.labels(provider=name) for name in ("google_places", "groq")}
+
+def hedged_first_valid(providers, is_valid, hedge_delay_s=SOS_HEDGE_DELAY_S, deadline_s=SOS_PROVIDER_DEADLINE_S):
+    """
+    Run `providers` as a hedged race and return the first valid answer.
+    
+    Args:
+        providers: List of (name, func) in priority order; func() takes no arguments
+        is_valid: Predicate for an acceptable answer
+        hedge_delay_s: How long a provider runs alone before the next one is started
+        deadline_s: Budget for the whole race; anything still running is killed
+    
+    Returns:
+        (answer, provider_name), or (None, None) if nothing valid arrived in time
+    """
+    done = queue.Queue()
+    running = {}  # name -> (green thread, start time)
+    next_idx = 0
+    
+    def attempt(name, func):
+        started = time.time()
+        try:
+            answer = func()
+            outcome = "ok" if is_valid(answer) else "invalid"
+        except Exception as e:
+            log.warning(f"⚠️ {name} provider error: {e}")
+            answer, outcome = None, "error"
+        sos_provider_latency[name].observe(time.time() - started, outcome)
+        done.put((name, answer, outcome))
+    
+    def launch():
+        nonlocal next_idx
+        name, func = providers[next_idx]
+        next_idx += 1
+        running[name] = (eventlet.spawn(logs.bind(attempt), name, func), time.time())
+        return time.time() + hedge_delay_s
+    
+    deadline = time.time() + deadline_s
+    next_hedge = launch()
     try:
-        c.execute("ALTER TABLE sos_alerts ADD COLUMN user_name TEXT DEFAULT 'Anonymous'")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
+        while running or next_idx < len(providers):
+            now = time.time()
+            if now >= deadline:
+                log.warning(f"⏱️ SOS providers deadline ({deadline_s}s) hit with {', '.join(running)} still running")
+                return None, None
+            if not running:
+                next_hedge = launch()
+                continue
+            wait = deadline - now
+            if next_idx < len(providers):
+                wait = min(wait, max(0.0, next_hedge - now))
+            try:
+                name, answer, outcome = done.get(timeout=wait)
+            except queue.Empty:
+                if next_idx < len(providers) and time.time() >= next_hedge:
+                    log.info(f"🏁 {', '.join(running)} slower than {hedge_delay_s}s - hedging with {providers[next_idx][0]}")
+                    next_hedge = launch()
+                continue
+            
+            running.pop(name)
+            if outcome == "ok":
+                return answer, name
+            if next_idx < len(providers):
+                log.warning(f"⚠️ {name} gave no usable answer ({outcome}) - starting {providers[next_idx][0]}")
+                next_hedge = launch()
+        return None, None
+    finally:
+        # Cancel the losers
+        for name, (thread, started) in running.items():
+            thread.kill()
+            sos_provider_latency[name].observe(time.time() - started, "cancelled")
+
+def build_emergency_suggestions(lat, lng):
+    """
+    Nearby emergency services for an SOS location.
+    
+    Returns:
+        (suggestions, source) where source is 'google_places', 'groq' or 'fallback'
+    """
+    # 1. Google Places API (New) - Real locations, addresses, phone numbers (PRIMARY)
+    # 2. Groq AI - AI-generated suggestions (BACKUP, hedged)
+    # 3. Generic fallback - Last resort
+    candidates = [("google_places", lambda: get_nearby_places_with_google_api(lat, lng))]
+    if providers.is_usable("groq"):
+        candidates.append(("groq", lambda: request_groq_emergency_suggestions(lat, lng)))
+    
+    suggestions, source = hedged_first_valid(candidates, has_emergency_suggestions)
+    if suggestions is not None:
+        log.info(f"✅ Emergency services from {source}", extra={
+            "source": source, "counts": {key: len(suggestions.get(key, [])) for key in EMERGENCY_SUGGESTION_KEYS}})
+        return suggestions, source
     
+    log.warning(f"⚠️ No provider answered in time, using generic fallback...")
+    return get_generic_emergency_suggestions(lat, lng), 'fallback'
+
+def save_alert_enrichment(alert_id, status, source=None, suggestions=None, error=None):
+    """Insert or update the enrichment row for an alert; returns its updated_at"""
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
+    with get_db() as conn:
+        conn.execute("""INSERT INTO sos_enrichments (alert_id, status, source, suggestions, error, created_at, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(alert_id) DO UPDATE SET
+                            status = excluded.status, source = excluded.source, suggestions = excluded.suggestions,
+                            error = excluded.error, updated_at = excluded.updated_at""",
+                     (alert_id, status, source, json.dumps(suggestions) if suggestions is not None else None,
+                      error, now, now))
+    return now
+
+def publish_alert_enrichment(alert_id, status, source=None, suggestions=None, error=None, socket_id=None):
+    """Persist an enrichment result and push it to the reporting user and the admins"""
+    updated_at = save_alert_enrichment(alert_id, status, source, suggestions, error)
+    sos_enrich_stats["done" if status == 'DONE' else "failed"] += 1
+    if socket_id:
+        with metrics.stage("socketio_emit"):
+            socketio.emit('sos_enriched', {
+                'alert_id': alert_id,
+                'status': status,
+                'source': source,
+                'emergency_suggestions': suggestions,
+                'error': error,
+                'updated_at': updated_at
+            }, to=socket_id)
+        metrics.SOCKETIO_EMITS.inc(event='sos_enriched')
+    # Admins get the counts; the full lists are one request away
+    emit_admin_event('sos_enriched', {
+        'alert_id': alert_id,
+        'status': status,
+        'source': source,
+        'counts': {key: len((suggestions or {}).get(key, [])) for key in EMERGENCY_SUGGESTION_KEYS},
+        'updated_at': updated_at
+    })
+
+def run_sos_enrichment(job):
+    alert_id = job['alert_id']
+    logs.set_request_id(job.get('request_id'))  # Log under the id of the request that raised the alert
+    started = time.time()
     try:
-        c.execute("ALTER TABLE route_feedback ADD COLUMN user_name TEXT DEFAULT 'Anonymous'")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-   
-    conn.commit()
-    conn.close()
+        suggestions, source = build_emergency_suggestions(job['lat'], job['lng'])
+    except Exception as e:
+        log.exception(f"❌ SOS enrichment failed for alert {alert_id}: {e}", extra={"alert_id": alert_id})
+        publish_alert_enrichment(alert_id, 'FAILED', error=str(e), socket_id=job.get('socket_id'))
+        return
+    log.info(f"✅ SOS alert {alert_id} enriched from {source} in {time.time() - started:.1f}s",
+             extra={"alert_id": alert_id, "source": source, "duration_ms": round((time.time() - started) * 1000, 1)})
+    publish_alert_enrichment(alert_id, 'DONE', source, suggestions, socket_id=job.get('socket_id'))
 
-init_db()
+def sos_enrichment_worker():
+    """Background loop: take enrichment jobs off the queue one at a time"""
+    while True:
+        job = sos_enrich_queue.get()
+        try:
+            run_sos_enrichment(job)
+        except Exception as e:
+            log.warning(f"⚠️ SOS enrichment worker error: {e}")
+        finally:
+            sos_enrich_queue.task_done()
+
+def queue_sos_enrichment(alert_id, lat, lng, socket_id=None):
+    """
+    Hand an alert to the enrichment workers. The sos_enrichments row must
+    already exist as PENDING. Returns False if the queue is full, in which
+    case the alert is marked FAILED straight away.
+    """
+    try:
+        sos_enrich_queue.put_nowait({"alert_id": alert_id, "lat": lat, "lng": lng, "socket_id": socket_id,
+                                     "request_id": logs.get_request_id()})
+        sos_enrich_stats["queued"] += 1
+        return True
+    except queue.Full:
+        sos_enrich_stats["rejected"] += 1
+        log.warning(f"⚠️ SOS enrichment queue full - alert {alert_id} will not be enriched")
+        publish_alert_enrichment(alert_id, 'FAILED', error="Enrichment queue is full", socket_id=socket_id)
+        return False
+
+def resume_pending_enrichments():
+    """Re-queue recent alerts whose enrichment was cut short by a restart"""
+    cutoff = (datetime.now() - timedelta(seconds=SOS_ENRICH_RESUME_WINDOW_S)).strftime('%Y-%m-%d %H:%M:%S')
+    with get_db() as conn:
+        rows = conn.execute("""SELECT a.id, a.lat, a.lng FROM sos_enrichments e JOIN sos_alerts a ON a.id = e.alert_id
+                               WHERE e.status = 'PENDING' AND e.updated_at > ?
+                               ORDER BY e.updated_at DESC LIMIT ?""",
+                            (cutoff, SOS_ENRICH_QUEUE_SIZE)).fetchall()
+    for alert_id, lat, lng in rows:
+        if queue_sos_enrichment(alert_id, lat, lng):
+            sos_enrich_stats["resumed"] += 1
+    if rows:
+        log.info(f"🔁 Resumed enrichment for {len(rows)} SOS alerts")
+
+for _ in range(SOS_ENRICH_WORKERS):
+    eventlet.spawn(sos_enrichment_worker)
+resume_pending_enrichments()
 
 @app.route("/send-alert", methods=["POST", "OPTIONS"])
 def send_alert():
@@ -1112,6 +2141,7 @@ def send_alert():
         data = request.json
         lat, lng = data.get("lat"), data.get("lng")
         user_name = data.get("user_name", "Anonymous User")  # Get user name
+        socket_id = data.get("socket_id")  # Where to push the enrichment when it is ready
         
         if not lat or not lng:
             return jsonify({"error": "Lat/Lng required"}), 400
@@ -1125,105 +2155,135 @@ def send_alert():
         # Get current timestamp
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
        
-        conn = sqlite3.connect('saferoute.db')
-        c = conn.cursor()
-        c.execute("INSERT INTO sos_alerts (lat, lng, timestamp, status, user_name) VALUES (?, ?, ?, 'PENDING', ?)",
-                  (lat, lng, current_time, user_name))
-        alert_id = c.lastrowid
-        conn.commit()
-        conn.close()
-
-        # Enhanced logging
-        print(f"\n{'='*50}")
-        print(f"🚨 SOS ALERT RECEIVED")
-        print(f"   ID: {alert_id}")
-        print(f"   Location: ({lat}, {lng})")
-        print(f"   Time: {current_time}")
-        print(f"   Database: ✅ Saved")
-        print(f"   Broadcasting to: 'admin' room")
-        
-        # 🚀 PRIORITY: Use Google Places API (New) for REAL emergency services data
-        # 1. Google Places API (New) - Real locations, addresses, phone numbers (PRIMARY)
-        # 2. Groq AI - AI-generated suggestions (BACKUP)
-        # 3. Generic fallback - Last resort
-        
-        print(f"🌐 Using Google Places API (New) for real emergency services...")
-        emergency_suggestions = get_nearby_places_with_google_api(lat, lng)
-        
-        # Check if Google Places provided good results
-        if emergency_suggestions and any(len(emergency_suggestions.get(key, [])) > 0 for key in ['hospitals', 'police_stations', 'mechanics', 'hotels_restrooms']):
-            print(f"✅ Google Places API provided real emergency services")
-            print(f"   📊 Hospitals: {len(emergency_suggestions.get('hospitals', []))}")
-            print(f"   📊 Police: {len(emergency_suggestions.get('police_stations', []))}")
-            print(f"   📊 Mechanics: {len(emergency_suggestions.get('mechanics', []))}")
-            print(f"   📊 Safe Places: {len(emergency_suggestions.get('hotels_restrooms', []))}")
-        else:
-            # If Google Places fails, try Groq AI as backup
-            print(f"⚠️ Google Places API failed or returned no data, trying Groq AI backup...")
-            emergency_suggestions = get_emergency_suggestions_with_groq(lat, lng)
-            
-            # If both fail, use generic fallback
-            if not emergency_suggestions or not any(len(emergency_suggestions.get(key, [])) > 0 for key in ['hospitals', 'police_stations', 'mechanics', 'hotels_restrooms']):
-                print(f"⚠️ Both Google Places and Groq AI failed, using generic fallback...")
-                emergency_suggestions = get_fallback_emergency_suggestions(lat, lng)
-        
-        print(f"✅ Emergency suggestions generated")
-       
+        with get_db() as conn:
+            c = conn.cursor()
+            c.execute(f"INSERT INTO sos_alerts (lat, lng, timestamp, status, user_name, updated_at) VALUES (?, ?, ?, 'PENDING', ?, {NEXT_ALERT_UPDATED_AT_SQL})",
+                      (lat, lng, current_time, user_name))
+            alert_id = c.lastrowid
+            updated_at = c.execute("SELECT updated_at FROM sos_alerts WHERE id = ?", (alert_id,)).fetchone()[0]
+            c.execute("INSERT INTO sos_enrichments (alert_id, status, created_at, updated_at) VALUES (?, 'PENDING', ?, ?)",
+                      (alert_id, updated_at, updated_at))
+
         # Emit to all connected admin clients with proper timestamp
-        socketio.emit('new_sos_alert', {
+        emit_admin_event('new_sos_alert', {
             'id': alert_id,
             'lat': lat,
             'lng': lng,
             'time': current_time,
             'status': 'PENDING',
-            'user_name': user_name  # Include user name
-        }, room='admin')
+            'user_name': user_name,  # Include user name
+            'updated_at': updated_at
+        })
        
-        print(f"🚨 SOS Logged: ID={alert_id}, Location=({lat}, {lng}) at {current_time}")
+        # Nearby emergency services are looked up in the background and pushed
+        # as 'sos_enriched'; the caller can also poll /get-alert-enrichment/<id>
+        queued = queue_sos_enrichment(alert_id, lat, lng, socket_id)
+       
+        log.info(f"🚨 SOS alert {alert_id} received at ({lat}, {lng}) - saved, broadcast to admins",
+                 extra={"alert_id": alert_id, "lat": lat, "lng": lng, "enrichment_queued": queued,
+                        "enrichment_backlog": sos_enrich_queue.qsize()})
         
-        # Return response with AI suggestions
         return jsonify({
             "status": "success",
             "message": "SOS received by Admin Panel",
             "alert_id": alert_id,
             "timestamp": current_time,
-            "emergency_suggestions": emergency_suggestions  # 🤖 AI SUGGESTIONS INCLUDED
+            "enrichment_status": "PENDING" if queued else "FAILED",
+            "enrichment_url": f"/get-alert-enrichment/{alert_id}"
         }), 200
     except Exception as e:
-        print(f"SOS Error: {e}")
-        traceback.print_exc()
+        log.exception(f"SOS error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/get-alert-enrichment/<int:alert_id>", methods=["GET"])
+def get_alert_enrichment(alert_id):
+    """Nearby emergency services found for an SOS alert (status PENDING, DONE or FAILED)"""
+    try:
+        with get_db() as conn:
+            row = conn.execute("""SELECT a.id, e.status, e.source, e.suggestions, e.error, e.updated_at
+                                  FROM sos_alerts a LEFT JOIN sos_enrichments e ON e.alert_id = a.id
+                                  WHERE a.id = ?""", (alert_id,)).fetchone()
+        if row is None:
+            return jsonify({"error": "Alert not found"}), 404
+        
+        _, status, source, suggestions, error, updated_at = row
+        return jsonify({
+            "alert_id": alert_id,
+            "status": status or "UNAVAILABLE",  # Alerts raised before enrichment existed
+            "source": source,
+            "emergency_suggestions": json.loads(suggestions) if suggestions else None,
+            "error": error,
+            "updated_at": updated_at
+        })
+    except Exception as e:
+        log.exception(f"Enrichment fetch error: {e}")
         return jsonify({"error": str(e)}), 500
 
 @app.route("/get-all-alerts", methods=["GET"])
 def get_all_alerts():
+    """
+    SOS alerts, newest first, one page at a time.
+    Paginate with ?cursor=<X-Next-Cursor of the previous page>&limit=N, optionally ?status=.
+    Deltas: ?since_ts=<X-Sync-Cursor>&since_ts_id=<X-Sync-Cursor-Id> returns
+    alerts created or updated since that response; ?since_id=N returns alerts
+    created after alert N.
+    """
     try:
         status_filter = request.args.get('status', None)
-        conn = sqlite3.connect('saferoute.db')
-        c = conn.cursor()
-       
-        if status_filter:
-            c.execute("SELECT id, lat, lng, timestamp, status, user_name FROM sos_alerts WHERE status = ? ORDER BY timestamp DESC",
-                      (status_filter,))
-        else:
-            c.execute("SELECT id, lat, lng, timestamp, status, user_name FROM sos_alerts ORDER BY timestamp DESC")
-       
+        # A bad cursor must fail loudly: an empty page would look like "no changes" forever
+        try:
+            before_id = int_arg('cursor', minimum=1)
+            since_id = int_arg('since_id', minimum=0)
+            since_ts = request.args.get('since_ts') or None
+            since_ts_id = int_arg('since_ts_id', 0, minimum=0)
+            limit = max(1, min(int_arg('limit', ALERTS_PAGE_LIMIT), ALERTS_MAX_PAGE_LIMIT))
+            if since_ts is not None and not ALERT_SYNC_TS_RE.fullmatch(since_ts):
+                raise ValueError("since_ts must be an X-Sync-Cursor value")
+        except ValueError as e:
+            return jsonify({"error": f"Invalid request: {e}"}), 400
+        delta = since_id is not None or since_ts is not None
+        if delta and (status_filter or before_id is not None):
+            return jsonify({"error": "since_id/since_ts cannot be combined with status or cursor"}), 400
+        
+        with get_db() as conn:
+            c = conn.cursor()
+            # Read the high-water mark first: anything changed after this
+            # point is picked up by the caller's next since_ts request
+            c.execute("SELECT updated_at, id FROM sos_alerts ORDER BY updated_at DESC, id DESC LIMIT 1")
+            sync_cursor = c.fetchone()
+            c.execute(*alerts_query(status_filter, before_id, since_id, since_ts, since_ts_id, limit + 1))
+            rows = c.fetchall()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         alerts = []
-        for row in c.fetchall():
+        for row in rows:
             alerts.append({
                 "id": row[0],
                 "lat": row[1],
                 "lng": row[2],
                 "time": row[3],  # This is the actual timestamp from database
                 "status": row[4],
-                "user_name": row[5] or "Anonymous User"  # Include user name
+                "user_name": row[5] or "Anonymous User",  # Include user name
+                "updated_at": row[6]
             })
-       
-        conn.close()
-        print(f"📊 Retrieved {len(alerts)} SOS alerts")
-        return jsonify(alerts)
+        
+        response = jsonify(alerts)
+        if since_ts is not None:
+            # Deltas come oldest change first, so the last row is where to resume
+            sync_cursor = (rows[-1][6], rows[-1][0]) if rows else (since_ts, since_ts_id)
+            if has_more:
+                response.headers['X-Next-Cursor'] = sync_cursor[0]
+        elif has_more:
+            response.headers['X-Next-Cursor'] = str(rows[-1][0])
+        if sync_cursor is not None:
+            response.headers['X-Sync-Cursor'] = sync_cursor[0]
+            response.headers['X-Sync-Cursor-Id'] = str(sync_cursor[1])
+        
+        log.debug(f"📊 Retrieved {len(alerts)} SOS alerts{' (delta)' if delta else ''}")
+        return response
     except Exception as e:
-        print(f"Get Alerts Error: {e}")
-        traceback.print_exc()
+        log.exception(f"Get alerts error: {e}")
         return jsonify({"error": str(e)}), 500
 
 @app.route("/update-alert/<int:alert_id>", methods=["PUT"])
@@ -1231,25 +2291,26 @@ def update_alert(alert_id):
     try:
         data = request.json or {}
         status = data.get('status', 'RESOLVED')
-        conn = sqlite3.connect('saferoute.db')
-        c = conn.cursor()
-        c.execute("UPDATE sos_alerts SET status = ? WHERE id = ?", (status, alert_id))
-        if c.rowcount == 0:
-            conn.close()
+        with get_db() as conn:
+            c = conn.cursor()
+            c.execute(f"UPDATE sos_alerts SET status = ?, updated_at = {NEXT_ALERT_UPDATED_AT_SQL} WHERE id = ?", (status, alert_id))
+            updated = c.rowcount
+            if updated:
+                updated_at = c.execute("SELECT updated_at FROM sos_alerts WHERE id = ?", (alert_id,)).fetchone()[0]
+        if updated == 0:
             return jsonify({"error": "Alert not found"}), 404
-        conn.commit()
-        conn.close()
         
         # Emit update to admin clients
-        socketio.emit('alert_updated', {
+        emit_admin_event('alert_updated', {
             'id': alert_id,
-            'status': status
-        }, room='admin')
+            'status': status,
+            'updated_at': updated_at
+        })
         
-        print(f"✅ Alert {alert_id} updated to '{status}'")
+        log.info(f"✅ Alert {alert_id} updated to '{status}'")
         return jsonify({"status": "updated", "alert_id": alert_id})
     except Exception as e:
-        print(f"Update Error: {e}")
+        log.exception(f"Update error: {e}")
         return jsonify({"error": str(e)}), 500
 
 @app.route("/get-maps-config", methods=["GET"])
@@ -1260,6 +2321,243 @@ def get_maps_config():
         "status": "success"
     })
 
+def finalize_routes(routes_data):
+    """
+    Top up to three routes with synthetic alternatives, rank them safest
+    first and apply the demo colour spread. Shared by the plain and the
+    streaming /get-routes.
+    """
+    # ✅ Generate additional synthetic routes if we have less than 3
+    if len(routes_data) < 3:
+        log.info(f"🔄 Generating synthetic routes to reach 3 total routes...")
+        
+        # Use the first route as a base for synthetic routes
+        if routes_data:
+            base_route = routes_data[0]
+            routes_needed = 3 - len(routes_data)
+            
+            for i in range(routes_needed):
+                synthetic_idx = len(routes_data)
+                
+                # Create variations of the base route with different safety characteristics
+                if i == 0:  # More dangerous route
+                    safety_modifier = -20
+                    area_type = "Industrial"
+                    route_name = "Alternative Route (Industrial Area)"
+                else:  # Moderate route
+                    safety_modifier = -10
+                    area_type = "Residential" 
+                    route_name = "Alternative Route (Residential Area)"
+                
+                # Generate synthetic route data with modified polyline
+                base_polyline = base_route['polyline']
+                base_points = polyline.decode(base_polyline)
+                
+                # Create a slightly modified polyline for synthetic routes
+                modified_points = []
+                for j, (lat, lng) in enumerate(base_points):
+                    # Add small random variations to create a different route path
+                    if j % 5 == 0:  # Modify every 5th point to create route variation
+                        lat_offset = random.uniform(-0.001, 0.001)  # ~100m variation
+                        lng_offset = random.uniform(-0.001, 0.001)
+                        modified_points.append((lat + lat_offset, lng + lng_offset))
+                    else:
+                        modified_points.append((lat, lng))
+                
+                synthetic_polyline = polyline.encode(modified_points)
+                
+                synthetic_route = {
+                    "distance": f"{base_route['distance_meters'] * random.uniform(1.1, 1.3) / 1000:.1f} km",
+                    "duration": f"{int(base_route['duration_seconds'] * random.uniform(1.2, 1.4) / 60)} mins",
+                    "distance_meters": int(base_route['distance_meters'] * random.uniform(1.1, 1.3)),
+                    "duration_seconds": int(base_route['duration_seconds'] * random.uniform(1.2, 1.4)),
+                    "polyline": synthetic_polyline,  # ✅ Use modified polyline
+                    "hospital_count": random.randint(0, 2),
+                    "police_count": random.randint(0, 1),
+                    "crime_incidents": generate_realistic_crime_incidents(
+                        modified_points, area_type  # Use modified points
+                    ),
+                    "hospital_locations": [],
+                    "police_locations": [],
+                    "area_type": area_type,
+                    "street_light_score": max(30, min(90, base_route['street_light_score'] + safety_modifier)),
+                    "crime_score": min(100, base_route['crime_score'] - safety_modifier),
+                    "safety_score": max(10, min(100, base_route['safety_score'] + safety_modifier)),
+                    "summary": route_name,
+                    "warnings": [],
+                    "degraded": False,
+                    "index": synthetic_idx
+                }
+                
+                # Generate warnings for synthetic route
+                synthetic_route["warnings"] = generate_safety_warnings(
+                    synthetic_route["crime_incidents"], 
+                    {"hospitals": synthetic_route["hospital_count"], "police": synthetic_route["police_count"]},
+                    synthetic_route["street_light_score"]
+                )
+                
+                routes_data.append(synthetic_route)
+                log.debug(f"🔄 Generated synthetic Route {synthetic_idx + 1}: {route_name} (Safety: {synthetic_route['safety_score']})")
+    
+    log.info(f"📊 Final route count: {len(routes_data)} routes")
+    routes_data.sort(key=lambda x: x["safety_score"], reverse=True)
+    
+    # ✅ HACKATHON DEMO: Ensure Route 3 (third route card) has low safety score (RED) for clear demonstration
+    # Routes are sorted by safety (highest first), so:
+    # - Route 1 (index 0): Safest (should be green, score >= 75)
+    # - Route 2 (index 1): Moderate (should be yellow, score 60-74)
+    # - Route 3 (index 2): Least Safe (should be red, score < 60)
+    if len(routes_data) >= 3:
+        # Get route 3 (the third route card, which should be the least safe after sorting)
+        route_3 = routes_data[2]
+        current_score = route_3.get("safety_score", 50)
+        
+        # Force route 3 to be clearly unsafe (score < 60 for RED color)
+        # This ensures judges see a clear red route for demonstration
+        if current_score >= 60:
+            log.info(f"🔴 Modifying Route 3 to demonstrate UNSAFE route (current score: {current_score})")
+            
+            # Make route 3 clearly unsafe with:
+            # - Very few/no hospitals and police
+            # - Low lighting score
+            # - High crime score
+            # - More crime incidents
+            
+            route_3["hospital_count"] = 0
+            route_3["police_count"] = 0
+            route_3["hospital_locations"] = []
+            route_3["police_locations"] = []
+            route_3["street_light_score"] = 35  # Very poor lighting
+            route_3["crime_score"] = 85  # High crime risk
+            
+            # Generate more high-severity crime incidents
+            if route_3.get("crime_incidents"):
+                # Add more high-severity crimes
+                high_crime_types = ['robbery', 'assault', 'harassment']
+                for _ in range(3):
+                    crime_type = random.choice(high_crime_types)
+                    crime_data = CRIME_DATABASE[crime_type]
+                    # Add crime near route
+                    route_points_3 = polyline.decode(route_3.get("polyline", ""))
+                    if route_points_3:
+                        point_idx = random.randint(0, len(route_points_3) - 1)
+                        base_lat, base_lng = route_points_3[point_idx]
+                        offset_km = random.uniform(0.05, 0.2)
+                        angle = random.uniform(0, 360)
+                        angle_rad = radians(angle)
+                        lat_offset = (offset_km / 111.0) * cos(angle_rad)
+                        lng_offset = (offset_km / (111.0 * cos(radians(base_lat)))) * sin(angle_rad)
+                        
+                        incident = {
+                            'type': crime_type,
+                            'severity': crime_data['severity'],
+                            'lat': base_lat + lat_offset,
+                            'lng': base_lng + lng_offset,
+                            'time': (datetime.now() - timedelta(hours=random.randint(1, 24))).isoformat(),
+                            'description': crime_data['description'],
+                            'icon': crime_data['icon'],
+                            'color': crime_data['color'],
+                            'recommendation': crime_data['recommendation'],
+                            'hours_ago': random.randint(1, 24),
+                            'distance_from_route': round(offset_km * 1000)
+                        }
+                        route_3["crime_incidents"].append(incident)
+            
+            # Recalculate safety score to be clearly unsafe (< 60)
+            route_3["safety_score"] = max(25, min(55, 
+                calculate_final_safety_score(
+                    route_3["hospital_count"],
+                    route_3["police_count"],
+                    route_3["street_light_score"],
+                    route_3["crime_score"],
+                    route_3.get("distance_meters", 10000) / 1000.0
+                )
+            ))
+            
+            # Update warnings to reflect unsafe conditions
+            route_3["warnings"] = [
+                "⚠️ Multiple high-risk incidents reported",
+                "🏥 No hospitals on this route",
+                "👮 No police stations nearby",
+                "🌙 Very poor street lighting",
+                "🌃 High risk - avoid this route if possible"
+            ]
+            
+            # Update summary
+            route_3["summary"] = "⚠️ UNSAFE ROUTE - High Risk Area"
+            route_3["area_type"] = "High Risk"
+            
+            log.info(f"🔴 Route 3 modified: Safety Score = {route_3['safety_score']} (UNSAFE - RED)", extra={
+                "hospitals": route_3['hospital_count'], "police": route_3['police_count'],
+                "street_light_score": route_3['street_light_score'], "crime_score": route_3['crime_score']})
+        else:
+            # Route 3 already has low score, but ensure it's clearly marked
+            if route_3.get("safety_score", 0) < 60:
+                log.info(f"🔴 Route 3 already unsafe: Safety Score = {route_3['safety_score']} (RED)")
+                # Ensure it has clear unsafe indicators
+                if route_3.get("hospital_count", 0) > 0:
+                    route_3["hospital_count"] = 0
+                    route_3["hospital_locations"] = []
+                if route_3.get("police_count", 0) > 0:
+                    route_3["police_count"] = 0
+                    route_3["police_locations"] = []
+                route_3["summary"] = "⚠️ UNSAFE ROUTE - High Risk Area"
+    
+    # ✅ HACKATHON DEMO: Ensure clear color differentiation for judges
+    # Route 1 should be green (>= 75), Route 2 yellow (60-74), Route 3 red (< 60)
+    if len(routes_data) >= 3:
+        route_1_score = routes_data[0].get("safety_score", 0)
+        route_2_score = routes_data[1].get("safety_score", 0)
+        route_3_score = routes_data[2].get("safety_score", 0)
+        
+        log.info(f"📊 Final route safety scores for demo: {route_1_score} / {route_2_score} / {route_3_score}",
+                 extra={"safety_scores": [route_1_score, route_2_score, route_3_score]})
+    
+    return routes_data
+
+# Streaming /get-routes: a request with {"stream": true, "socket_id": ...}
+# returns as soon as Directions answers and the results follow over Socket.IO,
+# to that client only, tagged with the request's stream_id:
+#   route_geometry   every alternative's polyline, distance and duration
+#   route_enriched   one route's full analysis, as each one finishes
+#   routes_ranked    the final list, exactly what the plain response holds
+#   routes_error     the analysis failed; nothing else follows
+# With every stream worker busy the request gets the plain, fully ranked response.
+ROUTE_STREAM_WORKERS = int(os.getenv('ROUTE_STREAM_WORKERS', '64'))
+route_stream_pool = eventlet.GreenPool(ROUTE_STREAM_WORKERS)
+
+def route_geometry(route_idx, route):
+    """What a map needs to draw one Directions alternative before it is analysed"""
+    leg = route["legs"][0]
+    return {
+        "distance": leg["distance"]["text"],
+        "duration": leg["duration"]["text"],
+        "distance_meters": leg["distance"]["value"],
+        "duration_seconds": leg["duration"]["value"],
+        "polyline": route["overview_polyline"]["points"],
+        "summary": route.get("summary", ""),
+        "index": route_idx
+    }
+
+def emit_route_stream(event, payload, socket_id):
+    with metrics.stage("socketio_emit"):
+        socketio.emit(event, payload, to=socket_id)
+    metrics.SOCKETIO_EMITS.inc(event=event)
+
+def stream_route_analysis(stream_id, socket_id, google_routes):
+    """Background half of a streaming /get-routes: enrich each route, then rank"""
+    try:
+        routes_data = analyze_routes_concurrently(
+            google_routes,
+            on_route=lambda route_data: emit_route_stream('route_enriched', {"stream_id": stream_id, "route": route_data}, socket_id)
+        )
+        routes_data = finalize_routes(routes_data)
+        emit_route_stream('routes_ranked', {"stream_id": stream_id, "routes": routes_data}, socket_id)
+        log.info(f"✅ Streamed {len(routes_data)} routes", extra={"stream_id": stream_id, "routes": len(routes_data)})
+    except Exception as e:
+        log.exception(f"Route stream {stream_id} failed: {e}")
+        emit_route_stream('routes_error', {"stream_id": stream_id, "error": "Route analysis failed"}, socket_id)
+
 @app.route("/get-routes", methods=["POST", "OPTIONS"])
 def get_routes():
     # Handle CORS preflight
@@ -1278,258 +2576,41 @@ def get_routes():
         if destination.lower() == "demo":
             destination = "17.4401,78.3489"
         
-        directions_url = "https://maps.googleapis.com/maps/api/directions/json"
-        params = {"origin": source, "destination": destination, "alternatives": "true", "key": API_KEY}
-        response = requests.get(directions_url, params=params).json()
+        response = get_directions(source, destination)
         
-        print(f"🗺️ Google Directions API Response:")
-        print(f"   Status: {response.get('status')}")
-        print(f"   Routes returned: {len(response.get('routes', []))}")
+        log.info(f"🗺️ Google Directions API: {response.get('status')}, {len(response.get('routes', []))} routes",
+                 extra={"status": response.get('status'), "routes": len(response.get('routes', []))})
         
+        if response.get("status") == "UNAVAILABLE":
+            return jsonify({"error": "Directions service temporarily unavailable"}), 503
         if response.get("status") != "OK":
             return jsonify({"error": f"Directions failed: {response.get('status')}"}), 400
         
         google_routes = response.get("routes", [])
-        print(f"📊 Processing {len(google_routes)} routes from Google Directions API")
-        
-        routes_data = []
-        for route_idx, route in enumerate(google_routes):
-            leg = route["legs"][0]
-            polyline_str = route["overview_polyline"]["points"]
-            route_points = polyline.decode(polyline_str)
-            distance_km = leg["distance"]["value"] / 1000
-            area_type = "Main Road" if "highway" in route.get("summary", "").lower() else "Urban"
-            
-            # Generate safety data with REAL hospitals and police stations along route
-            print(f"🔍 Route {route_idx + 1}: Finding real emergency services along {len(route_points)} route points...")
-            try:
-                amenities, locations = get_safety_counts(route_points)
-            except Exception as e:
-                print(f"⚠️ Error getting safety counts for route {route_idx + 1}: {e}")
-                # Fallback to empty counts if API fails
-                amenities = {"hospitals": 0, "police": 0}
-                locations = {"hospitals": [], "police": []}
-            
-            crime_incidents = generate_realistic_crime_incidents(route_points, area_type)
-            street_light_score = estimate_street_light_score(route_points, area_type)
-            crime_score = calculate_crime_risk_score(crime_incidents, route_points)
-            safety_score = calculate_final_safety_score(amenities["hospitals"], amenities["police"], street_light_score, crime_score, distance_km)
-            
-            route_data = {
-                "distance": leg["distance"]["text"],
-                "duration": leg["duration"]["text"],
-                "distance_meters": leg["distance"]["value"],
-                "duration_seconds": leg["duration"]["value"],
-                "polyline": polyline_str,
-                "hospital_count": amenities["hospitals"],
-                "police_count": amenities["police"],
-                "crime_incidents": crime_incidents,
-                "hospital_locations": locations.get("hospitals", []),
-                "police_locations": locations.get("police", []),
-                "area_type": area_type,
-                "street_light_score": street_light_score,
-                "crime_score": crime_score,
-                "safety_score": safety_score,
-                "summary": route.get("summary", ""),
-                "warnings": generate_safety_warnings(crime_incidents, amenities, street_light_score),
-                "index": route_idx
-            }
-            routes_data.append(route_data)
+        log.info(f"📊 Processing {len(google_routes)} routes from Google Directions API")
         
-        print(f"✅ Processed {len(routes_data)} real routes from Google")
+        socket_id = data.get("socket_id")
+        # A full stream pool would block this request in spawn(); answer it synchronously instead
+        if data.get("stream") and socket_id and route_stream_pool.free() > 0:
+            # Draw first, analyse after: the geometry goes out now, the rest follows over Socket.IO
+            stream_id = str(data.get("stream_id") or logs.new_request_id())[:64]
+            emit_route_stream('route_geometry', {
+                "stream_id": stream_id,
+                "routes": [route_geometry(route_idx, route) for route_idx, route in enumerate(google_routes)]
+            }, socket_id)
+            route_stream_pool.spawn(logs.bind(stream_route_analysis), stream_id, socket_id, google_routes)
+            return jsonify({"status": "STREAMING", "stream_id": stream_id, "route_count": len(google_routes)}), 200
         
-        # ✅ Generate additional synthetic routes if we have less than 3
-        if len(routes_data) < 3:
-            print(f"🔄 Generating synthetic routes to reach 3 total routes...")
-            
-            # Use the first route as a base for synthetic routes
-            if routes_data:
-                base_route = routes_data[0]
-                routes_needed = 3 - len(routes_data)
-                
-                for i in range(routes_needed):
-                    synthetic_idx = len(routes_data)
-                    
-                    # Create variations of the base route with different safety characteristics
-                    if i == 0:  # More dangerous route
-                        safety_modifier = -20
-                        area_type = "Industrial"
-                        route_name = "Alternative Route (Industrial Area)"
-                    else:  # Moderate route
-                        safety_modifier = -10
-                        area_type = "Residential" 
-                        route_name = "Alternative Route (Residential Area)"
-                    
-                    # Generate synthetic route data with modified polyline
-                    base_polyline = base_route['polyline']
-                    base_points = polyline.decode(base_polyline)
-                    
-                    # Create a slightly modified polyline for synthetic routes
-                    modified_points = []
-                    for j, (lat, lng) in enumerate(base_points):
-                        # Add small random variations to create a different route path
-                        if j % 5 == 0:  # Modify every 5th point to create route variation
-                            lat_offset = random.uniform(-0.001, 0.001)  # ~100m variation
-                            lng_offset = random.uniform(-0.001, 0.001)
-                            modified_points.append((lat + lat_offset, lng + lng_offset))
-                        else:
-                            modified_points.append((lat, lng))
-                    
-                    synthetic_polyline = polyline.encode(modified_points)
-                    
-                    synthetic_route = {
-                        "distance": f"{base_route['distance_meters'] * random.uniform(1.1, 1.3) / 1000:.1f} km",
-                        "duration": f"{int(base_route['duration_seconds'] * random.uniform(1.2, 1.4) / 60)} mins",
-                        "distance_meters": int(base_route['distance_meters'] * random.uniform(1.1, 1.3)),
-                        "duration_seconds": int(base_route['duration_seconds'] * random.uniform(1.2, 1.4)),
-                        "polyline": synthetic_polyline,  # ✅ Use modified polyline
-                        "hospital_count": random.randint(0, 2),
-                        "police_count": random.randint(0, 1),
-                        "crime_incidents": generate_realistic_crime_incidents(
-                            modified_points, area_type  # Use modified points
-                        ),
-                        "hospital_locations": [],
-                        "police_locations": [],
-                        "area_type": area_type,
-                        "street_light_score": max(30, min(90, base_route['street_light_score'] + safety_modifier)),
-                        "crime_score": min(100, base_route['crime_score'] - safety_modifier),
-                        "safety_score": max(10, min(100, base_route['safety_score'] + safety_modifier)),
-                        "summary": route_name,
-                        "warnings": [],
-                        "index": synthetic_idx
-                    }
-                    
-                    # Generate warnings for synthetic route
-                    synthetic_route["warnings"] = generate_safety_warnings(
-                        synthetic_route["crime_incidents"], 
-                        {"hospitals": synthetic_route["hospital_count"], "police": synthetic_route["police_count"]},
-                        synthetic_route["street_light_score"]
-                    )
-                    
-                    routes_data.append(synthetic_route)
-                    print(f"🔄 Generated synthetic Route {synthetic_idx + 1}: {route_name} (Safety: {synthetic_route['safety_score']})")
-        
-        print(f"📊 Final route count: {len(routes_data)} routes")
-        routes_data.sort(key=lambda x: x["safety_score"], reverse=True)
-        
-        # ✅ HACKATHON DEMO: Ensure Route 3 (third route card) has low safety score (RED) for clear demonstration
-        # Routes are sorted by safety (highest first), so:
-        # - Route 1 (index 0): Safest (should be green, score >= 75)
-        # - Route 2 (index 1): Moderate (should be yellow, score 60-74)
-        # - Route 3 (index 2): Least Safe (should be red, score < 60)
-        if len(routes_data) >= 3:
-            # Get route 3 (the third route card, which should be the least safe after sorting)
-            route_3 = routes_data[2]
-            current_score = route_3.get("safety_score", 50)
-            
-            # Force route 3 to be clearly unsafe (score < 60 for RED color)
-            # This ensures judges see a clear red route for demonstration
-            if current_score >= 60:
-                print(f"🔴 Modifying Route 3 to demonstrate UNSAFE route (current score: {current_score})")
-                
-                # Make route 3 clearly unsafe with:
-                # - Very few/no hospitals and police
-                # - Low lighting score
-                # - High crime score
-                # - More crime incidents
-                
-                route_3["hospital_count"] = 0
-                route_3["police_count"] = 0
-                route_3["hospital_locations"] = []
-                route_3["police_locations"] = []
-                route_3["street_light_score"] = 35  # Very poor lighting
-                route_3["crime_score"] = 85  # High crime risk
-                
-                # Generate more high-severity crime incidents
-                if route_3.get("crime_incidents"):
-                    # Add more high-severity crimes
-                    high_crime_types = ['robbery', 'assault', 'harassment']
-                    for _ in range(3):
-                        crime_type = random.choice(high_crime_types)
-                        crime_data = CRIME_DATABASE[crime_type]
-                        # Add crime near route
-                        route_points_3 = polyline.decode(route_3.get("polyline", ""))
-                        if route_points_3:
-                            point_idx = random.randint(0, len(route_points_3) - 1)
-                            base_lat, base_lng = route_points_3[point_idx]
-                            offset_km = random.uniform(0.05, 0.2)
-                            angle = random.uniform(0, 360)
-                            angle_rad = radians(angle)
-                            lat_offset = (offset_km / 111.0) * cos(angle_rad)
-                            lng_offset = (offset_km / (111.0 * cos(radians(base_lat)))) * sin(angle_rad)
-                            
-                            incident = {
-                                'type': crime_type,
-                                'severity': crime_data['severity'],
-                                'lat': base_lat + lat_offset,
-                                'lng': base_lng + lng_offset,
-                                'time': (datetime.now() - timedelta(hours=random.randint(1, 24))).isoformat(),
-                                'description': crime_data['description'],
-                                'icon': crime_data['icon'],
-                                'color': crime_data['color'],
-                                'recommendation': crime_data['recommendation'],
-                                'hours_ago': random.randint(1, 24),
-                                'distance_from_route': round(offset_km * 1000)
-                            }
-                            route_3["crime_incidents"].append(incident)
-                
-                # Recalculate safety score to be clearly unsafe (< 60)
-                route_3["safety_score"] = max(25, min(55, 
-                    calculate_final_safety_score(
-                        route_3["hospital_count"],
-                        route_3["police_count"],
-                        route_3["street_light_score"],
-                        route_3["crime_score"],
-                        route_3.get("distance_meters", 10000) / 1000.0
-                    )
-                ))
-                
-                # Update warnings to reflect unsafe conditions
-                route_3["warnings"] = [
-                    "⚠️ Multiple high-risk incidents reported",
-                    "🏥 No hospitals on this route",
-                    "👮 No police stations nearby",
-                    "🌙 Very poor street lighting",
-                    "🌃 High risk - avoid this route if possible"
-                ]
-                
-                # Update summary
-                route_3["summary"] = "⚠️ UNSAFE ROUTE - High Risk Area"
-                route_3["area_type"] = "High Risk"
-                
-                print(f"🔴 Route 3 modified: Safety Score = {route_3['safety_score']} (UNSAFE - RED)")
-                print(f"   🏥 Hospitals: {route_3['hospital_count']}")
-                print(f"   👮 Police: {route_3['police_count']}")
-                print(f"   💡 Lighting: {route_3['street_light_score']}%")
-                print(f"   ⚠️ Crime Score: {route_3['crime_score']}")
-            else:
-                # Route 3 already has low score, but ensure it's clearly marked
-                if route_3.get("safety_score", 0) < 60:
-                    print(f"🔴 Route 3 already unsafe: Safety Score = {route_3['safety_score']} (RED)")
-                    # Ensure it has clear unsafe indicators
-                    if route_3.get("hospital_count", 0) > 0:
-                        route_3["hospital_count"] = 0
-                        route_3["hospital_locations"] = []
-                    if route_3.get("police_count", 0) > 0:
-                        route_3["police_count"] = 0
-                        route_3["police_locations"] = []
-                    route_3["summary"] = "⚠️ UNSAFE ROUTE - High Risk Area"
-        
-        # ✅ HACKATHON DEMO: Ensure clear color differentiation for judges
-        # Route 1 should be green (>= 75), Route 2 yellow (60-74), Route 3 red (< 60)
-        if len(routes_data) >= 3:
-            route_1_score = routes_data[0].get("safety_score", 0)
-            route_2_score = routes_data[1].get("safety_score", 0)
-            route_3_score = routes_data[2].get("safety_score", 0)
-            
-            print(f"📊 Final Route Safety Scores for Demo:")
-            print(f"   Route 1: {route_1_score} {'✅ GREEN' if route_1_score >= 75 else '⚠️ YELLOW' if route_1_score >= 60 else '🔴 RED'}")
-            print(f"   Route 2: {route_2_score} {'✅ GREEN' if route_2_score >= 75 else '⚠️ YELLOW' if route_2_score >= 60 else '🔴 RED'}")
-            print(f"   Route 3: {route_3_score} {'✅ GREEN' if route_3_score >= 75 else '⚠️ YELLOW' if route_3_score >= 60 else '🔴 RED'}")
+        routes_data = analyze_routes_concurrently(google_routes)
+        
+        log.info(f"✅ Processed {len(routes_data)} real routes from Google")
+        
+        routes_data = finalize_routes(routes_data)
         
-        return jsonify(routes_data)
+        with metrics.stage("serialization"):
+            return jsonify(routes_data)
     except Exception as e:
-        print(f"Server Error: {e}\n{traceback.format_exc()}")
+        log.exception(f"Server error: {e}")
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
 @app.route("/post-feedback", methods=["POST", "OPTIONS"])
@@ -1578,13 +2659,14 @@ def post_feedback():
         # Get current timestamp
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
        
-        conn = sqlite3.connect('saferoute.db')
-        c = conn.cursor()
-        c.execute("INSERT INTO route_feedback (lat, lng, type, description, route_polyline, timestamp, user_name) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                  (lat, lng, ftype, desc, polyline_str, current_time, user_name))
-        feedback_id = c.lastrowid
-        conn.commit()
-        conn.close()
+        with get_db() as conn:
+            c = conn.cursor()
+            c.execute("INSERT INTO route_feedback (lat, lng, type, description, route_polyline, timestamp, user_name) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                      (lat, lng, ftype, desc, polyline_str, current_time, user_name))
+            feedback_id = c.lastrowid
+            if FEEDBACK_RTREE_AVAILABLE:
+                c.execute("INSERT INTO route_feedback_rtree (id, min_lat, max_lat, min_lng, max_lng) VALUES (?, ?, ?, ?, ?)",
+                          (feedback_id, lat, lat, lng, lng))
        
         feedback_data = {
             'id': feedback_id,
@@ -1597,37 +2679,62 @@ def post_feedback():
         }
        
         # Emit to all map clients (for real-time map updates)
-        socketio.emit('new_feedback', feedback_data, room='global')
+        with metrics.stage("socketio_emit"):
+            socketio.emit('new_feedback', feedback_data, room='global')
+        metrics.SOCKETIO_EMITS.inc(event='new_feedback')
        
         # Emit to admin clients (for admin dashboard)
-        socketio.emit('new_community_feedback', feedback_data, room='admin')
+        emit_admin_event('new_community_feedback', feedback_data)
        
-        print(f"💬 Feedback #{feedback_id}: {ftype} at ({lat:.4f}, {lng:.4f}) - {desc[:50]}... at {current_time}")
+        log.info(f"💬 Feedback #{feedback_id}: {ftype} at ({lat:.4f}, {lng:.4f}) - {desc[:50]}... at {current_time}")
         return jsonify({
             "status": "success",
             "id": feedback_id,
             "timestamp": current_time
         }), 200
     except Exception as e:
-        print(f"Feedback Error: {e}")
-        traceback.print_exc()
+        log.exception(f"Feedback error: {e}")
         return jsonify({"error": str(e)}), 500
 
+# /get-feedback pages are keyset-paginated on (timestamp, id), newest first
+FEEDBACK_PAGE_LIMIT = 100
+FEEDBACK_MAX_PAGE_LIMIT = 500
+
 @app.route("/get-feedback", methods=["GET"])
 def get_feedback():
+    """
+    Community reports, newest first.
+    Optional filters: lat/lng/radius (meters) or route_polyline/route_buffer.
+    Paginate with ?cursor=<X-Next-Cursor of the previous page>&limit=N.
+    """
     try:
         lat = request.args.get('lat', type=float)
         lng = request.args.get('lng', type=float)
         radius = request.args.get('radius', 5000, type=int)
-       
-        conn = sqlite3.connect('saferoute.db')
-        c = conn.cursor()
-        c.execute("SELECT id, lat, lng, type, description, timestamp, user_name FROM route_feedback ORDER BY timestamp DESC LIMIT 100")
-        rows = c.fetchall()
-       
+        route_polyline = request.args.get('route_polyline')  # Optional: only reports near this route
+        route_buffer = request.args.get('route_buffer', 300, type=float)  # meters either side of the route
+        before_id = request.args.get('cursor', type=int)
+        limit = max(1, min(request.args.get('limit', FEEDBACK_PAGE_LIMIT, type=int), FEEDBACK_MAX_PAGE_LIMIT))
+        
+        # Bounding-box prefilter in SQL, exact distance refine in Python
+        bbox, is_match = None, None
+        if lat is not None and lng is not None:
+            bbox = geodesy.bbox_around(lat, lng, radius)
+            is_match = lambda row: geodesy.haversine_m(lat, lng, row[1], row[2]) <= radius
+        elif route_polyline:
+            geometry = geodesy.RouteGeometry(polyline.decode(route_polyline))
+            bbox = geometry.bounds(route_buffer)
+            is_match = lambda row: bool(geometry.within([(row[1], row[2])], route_buffer))
+        
         feedbacks = []
-        for row in rows:
-            if row[1] is not None and row[2] is not None:
+        has_more = False
+        with get_db() as conn:
+            for row in iter_feedback_rows(conn.cursor(), bbox, before_id):
+                if is_match is not None and not is_match(row):
+                    continue
+                if len(feedbacks) == limit:
+                    has_more = True
+                    break
                 feedbacks.append({
                     "id": row[0],
                     "lat": row[1],
@@ -1638,13 +2745,13 @@ def get_feedback():
                     "user_name": row[6] or "Anonymous User"  # Include user name
                 })
        
-        conn.close()
-       
-        print(f"💬 Retrieved {len(feedbacks)} feedback items")
-        return jsonify(feedbacks)
+        log.debug(f"💬 Retrieved {len(feedbacks)} feedback items")
+        response = jsonify(feedbacks)
+        if has_more:
+            response.headers['X-Next-Cursor'] = str(feedbacks[-1]["id"])
+        return response
     except Exception as e:
-        print(f"Feedback Fetch Error: {e}")
-        traceback.print_exc()
+        log.exception(f"Feedback fetch error: {e}")
         return jsonify({"error": str(e)}), 500
 
 @app.route("/clear-all-data", methods=["POST", "OPTIONS"])
@@ -1660,59 +2767,59 @@ def clear_all_data():
         data = request.get_json(force=True, silent=True)
         
         if data is None:
-            print("⚠️ No JSON data received")
+            log.warning("⚠️ No JSON data received")
             return jsonify({"error": "No data received"}), 400
         
         confirmation = data.get('confirmation')  # ✅ FIX: Use 'confirmation' to match frontend
-        print(f"🔐 Confirmation received: {confirmation}")
+        log.info(f"🔐 Confirmation received: {confirmation}")
         
         if confirmation != 'DELETE_ALL_DATA':
             return jsonify({"error": "Confirmation token required"}), 400
         
-        # Connect to database
-        conn = sqlite3.connect('saferoute.db')
-        c = conn.cursor()
+        # Borrow a pooled connection; the block commits when it exits cleanly
+        with get_db() as conn:
+            c = conn.cursor()
         
-        # Get counts before deletion
-        try:
-            c.execute("SELECT COUNT(*) FROM sos_alerts")
-            sos_count = c.fetchone()[0]
-        except:
-            sos_count = 0
+            # Get counts before deletion
+            try:
+                c.execute("SELECT COUNT(*) FROM sos_alerts")
+                sos_count = c.fetchone()[0]
+            except:
+                sos_count = 0
         
-        try:
-            c.execute("SELECT COUNT(*) FROM route_feedback")
-            feedback_count = c.fetchone()[0]
-        except:
-            feedback_count = 0
+            try:
+                c.execute("SELECT COUNT(*) FROM route_feedback")
+                feedback_count = c.fetchone()[0]
+            except:
+                feedback_count = 0
         
-        print(f"📊 Found {sos_count} SOS alerts and {feedback_count} feedback items to delete")
+            log.info(f"📊 Found {sos_count} SOS alerts and {feedback_count} feedback items to delete")
         
-        # Delete all data
-        try:
-            c.execute("DELETE FROM sos_alerts")
-            print("✅ SOS alerts deleted")
-        except Exception as e:
-            print(f"⚠️ Error deleting SOS alerts: {e}")
+            # Delete all data
+            try:
+                c.execute("DELETE FROM sos_alerts")
+                c.execute("DELETE FROM sos_enrichments")
+                log.info("✅ SOS alerts deleted")
+            except Exception as e:
+                log.warning(f"⚠️ Error deleting SOS alerts: {e}")
         
-        try:
-            c.execute("DELETE FROM route_feedback")
-            print("✅ Feedback deleted")
-        except Exception as e:
-            print(f"⚠️ Error deleting feedback: {e}")
+            try:
+                c.execute("DELETE FROM route_feedback")
+                if FEEDBACK_RTREE_AVAILABLE:
+                    c.execute("DELETE FROM route_feedback_rtree")
+                log.info("✅ Feedback deleted")
+            except Exception as e:
+                log.warning(f"⚠️ Error deleting feedback: {e}")
         
-        # Reset auto-increment counters (handle if they don't exist)
-        try:
-            c.execute("DELETE FROM sqlite_sequence WHERE name='sos_alerts'")
-            c.execute("DELETE FROM sqlite_sequence WHERE name='route_feedback'")
-            print("✅ Auto-increment counters reset")
-        except Exception as e:
-            print(f"⚠️ Could not reset counters (might not exist): {e}")
+            # Reset auto-increment counters (handle if they don't exist)
+            try:
+                c.execute("DELETE FROM sqlite_sequence WHERE name='sos_alerts'")
+                c.execute("DELETE FROM sqlite_sequence WHERE name='route_feedback'")
+                log.info("✅ Auto-increment counters reset")
+            except Exception as e:
+                log.warning(f"⚠️ Could not reset counters (might not exist): {e}")
         
-        # Commit changes
-        conn.commit()
-        conn.close()
-        print("✅ Database changes committed")
+        log.info("✅ Database changes committed")
         
         # Prepare response
         result = {
@@ -1723,21 +2830,21 @@ def clear_all_data():
             "timestamp": datetime.now().isoformat()
         }
         
-        print(f"🗑️ ALL DATA CLEARED: {sos_count} SOS alerts, {feedback_count} feedback items")
+        log.info(f"🗑️ ALL DATA CLEARED: {sos_count} SOS alerts, {feedback_count} feedback items")
         
         # Emit socket event in background (don't block response)
         def emit_clear_event():
             try:
                 # ✅ FIX: Add Flask app context and explicit namespace
                 with app.app_context():
-                    socketio.emit('data_cleared', {
+                    emit_admin_event('data_cleared', {
                         'sos_deleted': sos_count,
                         'feedback_deleted': feedback_count,
                         'timestamp': datetime.now().isoformat()
-                    }, namespace='/')
-                print("📡 Socket event emitted to all clients")
+                    }, room=None)
+                log.info("📡 Socket event emitted to all clients")
             except Exception as socket_err:
-                print(f"⚠️ Socket emit warning: {socket_err}")
+                log.warning(f"⚠️ Socket emit warning: {socket_err}")
         
         # Use eventlet to emit in background
         try:
@@ -1747,110 +2854,264 @@ def clear_all_data():
             try:
                 # ✅ FIX: Add Flask app context and explicit namespace
                 with app.app_context():
-                    socketio.emit('data_cleared', {
+                    emit_admin_event('data_cleared', {
                         'sos_deleted': sos_count,
                         'feedback_deleted': feedback_count,
                         'timestamp': datetime.now().isoformat()
-                    }, namespace='/')
-                print("📡 Direct socket event emitted")
+                    }, room=None)
+                log.info("📡 Direct socket event emitted")
             except Exception as e:
-                print(f"⚠️ Could not emit socket event: {e}")
+                log.warning(f"⚠️ Could not emit socket event: {e}")
         
         return jsonify(result), 200
         
     except sqlite3.Error as db_err:
-        print(f"❌ Database Error: {db_err}")
-        print(traceback.format_exc())
+        log.exception(f"❌ Database error: {db_err}")
         return jsonify({"error": f"Database error: {str(db_err)}"}), 500
         
     except ValueError as val_err:
-        print(f"❌ Value Error: {val_err}")
+        log.error(f"❌ Value Error: {val_err}")
         return jsonify({"error": f"Invalid request: {str(val_err)}"}), 400
         
     except Exception as e:
-        print(f"❌ Clear Data Error: {e}")
-        print(traceback.format_exc())
+        log.exception(f"❌ Clear data error: {e}")
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
 @app.route("/ai-status", methods=["GET"])
 def ai_status():
-    """Check current AI configuration status (Groq + Google Places)"""
+    """
+    AI provider configuration and health (Groq + Google Places). Served from
+    the background provider probe - this endpoint never calls Groq itself.
+    """
     try:
+        groq_status = providers.status("groq")
         status_info = {
             "groq_available": GROQ_AVAILABLE,
-            "groq_configured": groq_client is not None,
-            "groq_api_key_preview": f"{GROQ_API_KEY[:10]}...{GROQ_API_KEY[-4:]}" if GROQ_API_KEY else None,
+            "groq_configured": groq_status["configured"],
+            "groq_initialized": groq_status["initialized"],
+            "groq_model": GROQ_MODEL,
+            "groq_probe": {key: groq_status[key] for key in ("healthy", "checked_at", "latency_ms", "detail", "error")},
             "google_places_available": bool(API_KEY),
-            "primary_ai": "Google Places API (New)" if API_KEY else "Groq" if groq_client else "Generic Fallback"
+            "primary_ai": "Google Places API (New)" if API_KEY else "Groq" if groq_status["configured"] else "Generic Fallback"
         }
-        
-        # Test Groq if available
-        if GROQ_AVAILABLE and groq_client:
-            try:
-                test_response = groq_client.chat.completions.create(
-                    messages=[{"role": "user", "content": "Test"}],
-                    model="llama-3.1-8b-instant",
-                    max_tokens=5
-                )
-                status_info["groq_test_success"] = True
-                status_info["groq_test_response"] = test_response.choices[0].message.content
-            except Exception as e:
-                status_info["groq_test_success"] = False
-                status_info["groq_test_error"] = str(e)
+        if groq_status["init_error"]:
+            status_info["groq_init_error"] = groq_status["init_error"]
+        # Same keys as the old live test, now from the cached probe
+        if groq_status["healthy"] is not None:
+            status_info["groq_test_success"] = groq_status["healthy"]
+            if groq_status["error"]:
+                status_info["groq_test_error"] = groq_status["error"]
         
         return jsonify(status_info), 200
         
     except Exception as e:
         return jsonify({
             "error": str(e),
-            "groq_available": GROQ_AVAILABLE,
-            "groq_configured": groq_client is not None
+            "groq_available": GROQ_AVAILABLE
         }), 500
 
+@app.route("/cache-stats", methods=["GET"])
+def cache_stats():
+    """Hit/miss counters and memory usage of the upstream response caches"""
+    return jsonify({
+        "places": places_cache.stats(),
+        "places_store": places_store_stats,
+        "directions": directions_cache.stats(),
+        "route_analysis": route_analysis_cache.stats(),
+        "database": db_pool.stats(),
+        "http": http.stats(),
+        "async_upstream": upstream.stats(),
+        "single_flight": {flight.name: flight.stats() for flight in (
+            directions_flight, places_along_route_flight, places_tile_flight, nearby_places_flight)},
+        "sos_enrichment": dict(sos_enrich_stats, waiting=sos_enrich_queue.qsize()),
+        "sos_providers": {name: histogram.stats() for name, histogram in sos_provider_latency.items()},
+        "logging": logs.stats(),
+        "timestamp": datetime.now().isoformat()
+    })
+
+# Prometheus export. Stage and request timings are recorded as they happen
+# (see metrics.py); the counters the caches, HTTP client and pools already keep
+# are read at scrape time by collect_component_metrics.
+db_pool.observer = lambda stage, seconds: metrics.STAGE_SECONDS.observe(seconds, stage=stage)
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+def collect_component_metrics():
+    caches = [places_cache, directions_cache, route_analysis_cache]
+    cache_stats_by_name = [(cache.name, cache.stats()) for cache in caches]
+    endpoints = http.stats()["endpoints"]
+    flights = [(flight.name, flight.stats()) for flight in (
+        directions_flight, places_along_route_flight, places_tile_flight, nearby_places_flight)]
+    pool_stats = db_pool.stats()
+    _, readiness = health_monitor.readiness()
+    
+    def family(name, kind, help_text, label, rows, field):
+        return (name, kind, help_text, [({label: key}, stats[field]) for key, stats in rows])
+    
+    return [
+        family("saferoute_cache_hits_total", "counter", "Cache lookups served from memory", "cache", cache_stats_by_name, "hits"),
+        family("saferoute_cache_misses_total", "counter", "Cache lookups that missed", "cache", cache_stats_by_name, "misses"),
+        family("saferoute_cache_stale_hits_total", "counter", "Expired entries served while upstream was failing", "cache", cache_stats_by_name, "stale_hits"),
+        family("saferoute_cache_evictions_total", "counter", "Entries evicted to stay under the byte budget", "cache", cache_stats_by_name, "evictions"),
+        family("saferoute_cache_entries", "gauge", "Entries currently cached", "cache", cache_stats_by_name, "entries"),
+        family("saferoute_cache_bytes", "gauge", "Approximate bytes currently cached", "cache", cache_stats_by_name, "bytes"),
+        ("saferoute_places_store_total", "counter", "Places tile store (SQLite) activity",
+         [({"event": event}, count) for event, count in places_store_stats.items()]),
+        family("saferoute_upstream_calls_total", "counter", "Upstream calls by endpoint (retries excluded)", "endpoint", endpoints.items(), "calls"),
+        family("saferoute_upstream_retries_total", "counter", "Upstream retries by endpoint", "endpoint", endpoints.items(), "retries"),
+        family("saferoute_upstream_retries_denied_total", "counter", "Retries refused by the retry budget", "endpoint", endpoints.items(), "retries_denied"),
+        family("saferoute_upstream_errors_total", "counter", "Upstream calls that failed after retries", "endpoint", endpoints.items(), "failures"),
+        ("saferoute_circuit_state", "gauge", "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+         [({"endpoint": name}, BREAKER_STATES.get(stats["breaker"]["state"], -1)) for name, stats in endpoints.items()]),
+        ("saferoute_circuit_short_circuited_total", "counter", "Calls skipped because the circuit was open",
+         [({"endpoint": name}, stats["breaker"]["short_circuited"]) for name, stats in endpoints.items()]),
+        ("saferoute_async_upstream_in_flight", "gauge", "Async upstream calls currently in flight",
+         [({}, upstream.counts["in_flight"])]),
+        family("saferoute_single_flight_calls_total", "counter", "Calls through a request coalescer", "flight", flights, "calls"),
+        family("saferoute_single_flight_coalesced_total", "counter", "Calls that joined an identical in-flight call", "flight", flights, "coalesced"),
+        ("saferoute_db_pool_total", "counter", "SQLite connection pool events",
+         [({"event": event}, pool_stats[event]) for event in ("opened", "checkouts", "reused", "nested", "discarded", "timeouts")]),
+        ("saferoute_db_pool_idle", "gauge", "Idle pooled SQLite connections", [({}, pool_stats["idle"])]),
+        ("saferoute_sos_enrichment_total", "counter", "SOS enrichment jobs by outcome",
+         [({"outcome": outcome}, count) for outcome, count in sos_enrich_stats.items()]),
+        ("saferoute_sos_enrichment_waiting", "gauge", "SOS enrichment jobs waiting in the queue", [({}, sos_enrich_queue.qsize())]),
+        ("saferoute_route_streams_in_flight", "gauge", "Streaming /get-routes analyses still running", [({}, route_stream_pool.running())]),
+        ("saferoute_dependency_healthy", "gauge", "Last health probe result (1 healthy, 0 degraded or unhealthy)",
+         [({"dependency": name}, summary["status"] == "healthy")
+          for name, summary in readiness["dependencies"].items() if summary["status"] != "unknown"]),
+        ("saferoute_log_records_total", "counter", "Log records by outcome (dropped when the log queue is full)",
+         [({"outcome": outcome}, logs.stats().get(outcome, 0)) for outcome in ("emitted", "dropped", "sampled_out", "errors")]),
+        ("saferoute_ready", "gauge", "Whether every critical dependency is passing", [({}, readiness["ready"])]),
+    ]
+
+metrics_registry.register_collector(collect_component_metrics)
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Every stage histogram and component counter in Prometheus text format"""
+    return metrics_registry.render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+# Dependency probes for the health monitor (see health.py). SQLite is the only
+# critical dependency: without Google or Groq the app still answers from
+# caches and fallbacks, and taking instances out of rotation would not help.
+def probe_sqlite():
+    with get_db() as conn:
+        conn.execute("SELECT 1").fetchone()
+    stats = db_pool.stats()
+    return f"journal_mode={stats['journal_mode']}, idle connections {stats['idle']}/{stats['size']}"
+
+def probe_places():
+    """An empty nearbySearch: rejected as invalid (not billed), but proves reachability and the key"""
+    if not API_KEY:
+        raise RuntimeError("GOOGLE_MAPS_API_KEY not set")
+    response = http.session.post(PLACES_NEARBY_URL, json={}, timeout=HEALTH_PROBE_TIMEOUT_S,
+                                 headers={'X-Goog-Api-Key': API_KEY, 'X-Goog-FieldMask': 'places.id'})
+    if response.status_code in (401, 403) or response.status_code >= 500:
+        raise RuntimeError(f"Places API HTTP {response.status_code}")
+    return f"reachable (HTTP {response.status_code})"
+
+def probe_directions():
+    """A Directions request without a route: answers INVALID_REQUEST, or REQUEST_DENIED for a bad key"""
+    if not API_KEY:
+        raise RuntimeError("GOOGLE_MAPS_API_KEY not set")
+    try:
+        response = http.session.get(DIRECTIONS_URL, params={"key": API_KEY}, timeout=HEALTH_PROBE_TIMEOUT_S)
+    except requests.RequestException as e:
+        # The error text includes the request URL; keep the key out of /health
+        raise RuntimeError(str(e).replace(API_KEY, "***")) from None
+    if response.status_code >= 500:
+        raise RuntimeError(f"Directions API HTTP {response.status_code}")
+    status = response.json().get("status")
+    if status == "REQUEST_DENIED":
+        raise RuntimeError(response.json().get("error_message") or status)
+    return f"reachable ({status})"
+
+def probe_groq():
+    health = providers.probe("groq")
+    if not health["healthy"]:
+        raise RuntimeError(health["error"])
+    return health["detail"]
+
+health_monitor.register("sqlite", probe_sqlite, critical=True)
+health_monitor.register("google_places", probe_places, extra=lambda: {"breaker": http.endpoint("places").breaker.stats()})
+health_monitor.register("directions", probe_directions, extra=lambda: {"breaker": http.endpoint("directions").breaker.stats()})
+if providers.status("groq")["configured"]:
+    health_monitor.register("groq", probe_groq, interval_s=GROQ_PROBE_INTERVAL_S, timeout_s=HEALTH_PROBE_TIMEOUT_S + 10)
+
 @app.route("/health", methods=["GET"])
 def health_check():
-    return jsonify({"status": "healthy", "service": "SafeRoute API", "timestamp": datetime.now().isoformat()})
+    """Overall status and per-dependency probe stats, from cached state (always 200)"""
+    _, body = health_monitor.readiness()
+    body.update({"service": "SafeRoute API", "startup_seconds": STARTUP_SECONDS,
+                 "timestamp": datetime.now().isoformat()})
+    return jsonify(body)
+
+@app.route("/health/live", methods=["GET"])
+def health_live():
+    """Liveness: 503 only when the event loop has stalled and the instance should be restarted"""
+    live, body = health_monitor.liveness()
+    return jsonify(body), 200 if live else 503
+
+@app.route("/health/ready", methods=["GET"])
+def health_ready():
+    """Readiness: 503 until every critical dependency passes, so the instance gets no traffic"""
+    ready, body = health_monitor.readiness()
+    return jsonify(body), 200 if ready else 503
 
 # SocketIO Events
 @socketio.on('connect')
 def handle_connect():
-    print(f"\n{'🟢'*20}")
-    print(f"📌 NEW CLIENT CONNECTED")
-    print(f"   Client ID: {request.sid}")
-    print(f"   Status: ✅ Connected to SafeRoute server")
-    print(f"{'🟢'*20}\n")
+    log.info(f"🟢 Client {request.sid} connected", extra={"sid": request.sid})
     emit('status', {'msg': 'Connected to SafeRoute server'})
 
 @socketio.on('join_admin')
-def handle_join_admin():
+def handle_join_admin(data=None):
+    """
+    Join the admin room and bring the client's event stream up to date.
+    The client sends {"epoch", "last_seq"} from its previous session. If the
+    missed events are still buffered they are replayed to this client only;
+    otherwise it is told to reload a snapshot over HTTP.
+    """
     from flask_socketio import join_room
-    join_room('admin')
-    print(f"\n{'🔵'*20}")
-    print(f"👨‍💼 ADMIN CLIENT CONNECTED")
-    print(f"   Client ID: {request.sid}")
-    print(f"   Room: 'admin'")
-    print(f"   Status: ✅ Joined successfully")
-    print(f"{'🔵'*20}\n")
+    data = data if isinstance(data, dict) else {}
+    last_seq = data.get('last_seq')
+    
+    # Hold the stream lock so no event lands between the replay and live delivery
+    with admin_events_lock:
+        join_room('admin')
+        oldest_seq = admin_events[0][1]['seq'] if admin_events else admin_event_seq + 1
+        can_replay = (data.get('epoch') == ADMIN_STREAM_EPOCH and isinstance(last_seq, int)
+                      and oldest_seq <= last_seq + 1 <= admin_event_seq + 1)
+        missed = [(event, payload) for event, payload in admin_events if payload['seq'] > last_seq] if can_replay else []
+        emit('admin_sync', {
+            'mode': 'replay' if can_replay else 'snapshot',
+            'epoch': ADMIN_STREAM_EPOCH,
+            'seq': admin_event_seq,
+            'replayed': len(missed)
+        })
+        for event, payload in missed:
+            emit(event, payload)
+    
+    log.info(f"🔵 Admin client {request.sid} joined the 'admin' room "
+             f"({'replayed ' + str(len(missed)) + ' events' if can_replay else 'snapshot'}, seq {admin_event_seq})",
+             extra={"sid": request.sid, "sync": 'replay' if can_replay else 'snapshot', "seq": admin_event_seq})
     emit('status', {'msg': 'Joined admin room'})
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    print(f"\n{'🔴'*20}")
-    print(f"📌 CLIENT DISCONNECTED")
-    print(f"   Client ID: {request.sid}")
-    print(f"{'🔴'*20}\n")
+    log.info(f"🔴 Client {request.sid} disconnected", extra={"sid": request.sid})
+
+health_monitor.start()
+STARTUP_SECONDS = round(time.perf_counter() - IMPORT_STARTED_AT, 3)
+log.info(f"🚀 App initialized in {STARTUP_SECONDS:.2f}s")
 
 if __name__ == "__main__":
-    print("🛡️ SafeRoute Backend Starting...")
-    print("🚨 SOS Alert System: Active")
-    print("🌐 Google Places API (New): Primary Emergency Service Provider")
-    print("🤖 Groq AI: Backup Emergency Assistant")
+    log.info("🛡️ SafeRoute Backend Starting... (SOS alerts active, Google Places API (New) primary, Groq AI backup)")
     
     # Get port from environment variable (Render uses PORT env var)
     port = int(os.environ.get('PORT', 5000))
     host = '0.0.0.0'  # Bind to all interfaces for deployment
     
-    print(f"🌐 API Running on: http://{host}:{port}")
+    log.info(f"🌐 API Running on: http://{host}:{port}")
     
     # Use eventlet for production deployment
     socketio.run(app, host=host, port=port, debug=False)
\ No newline at end of file
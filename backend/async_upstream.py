@@ -0,0 +1,234 @@
+"""
+Async outbound I/O for the Google APIs and Groq (opt-in).
+
+With OUTBOUND_IO_MODE=async and eventlet running on its asyncio hub
+(EVENTLET_HUB=asyncio), upstream calls are made with httpx.AsyncClient and
+AsyncGroq on the hub's event loop instead of blocking one green thread per
+socket. Flask handlers stay synchronous: they hand a coroutine to run(), which
+parks only the calling green thread until it finishes. Killing that green
+thread (a hedged race loser, an eventlet.Timeout) cancels the coroutine.
+
+Each upstream has its own asyncio.Semaphore, so a burst of route fan-outs can
+keep hundreds of Places calls in flight without starving Directions or Groq.
+gather() runs a batch under one deadline and cancels whatever is still
+running when it expires; nothing it starts outlives the call.
+
+Retries, retry budgets and circuit breakers are shared with the blocking
+client in http_client.py, so both modes see the same breaker state.
+
+Nothing that can block may run on the hub's own loop: eventlet then raises
+"do not call blocking functions from the mainloop". So the httpx and AsyncGroq
+clients are built up front from a green thread rather than lazily on the loop, and httpcore's
+socket liveness check uses the unpatched select module (its poll(0) never
+blocks; the green select would trampoline). trio is kept out entirely.
+
+In the default (sync) mode nothing here is used and callers keep using
+http_client.http and the synchronous Groq client.
+"""
+import asyncio
+import os
+import sys
+
+import eventlet
+import eventlet.asyncio
+import eventlet.patcher
+import httpx
+import requests
+
+import http_client
+import logs
+
+try:
+    from groq import AsyncGroq
+except ImportError:
+    AsyncGroq = None
+
+log = logs.get_logger("async_upstream")
+
+# httpcore imports trio whenever it is installed. Under eventlet's green select
+# that import fails (no select.epoll), and on the hub loop it shells out; this
+# app never runs on trio, so make the import fail the way httpcore expects.
+sys.modules.setdefault('trio', None)
+
+OUTBOUND_IO_MODE = os.getenv('OUTBOUND_IO_MODE', 'sync').lower()
+ASYNC_MAX_CONNECTIONS = int(os.getenv('ASYNC_MAX_CONNECTIONS', '512'))
+ASYNC_MAX_KEEPALIVE = int(os.getenv('ASYNC_MAX_KEEPALIVE', '64'))
+ASYNC_UPSTREAM_CONCURRENCY = {
+    "places": int(os.getenv('ASYNC_PLACES_CONCURRENCY', '256')),
+    "directions": int(os.getenv('ASYNC_DIRECTIONS_CONCURRENCY', '64')),
+    "groq": int(os.getenv('ASYNC_GROQ_CONCURRENCY', '16')),
+}
+
+
+def asyncio_hub_running():
+    from eventlet.hubs import get_hub
+    from eventlet.hubs.asyncio import Hub as AsyncioHub
+    return isinstance(get_hub(), AsyncioHub)
+
+
+def unpatch_httpcore_select():
+    """Point httpcore's connection liveness check at the real select module"""
+    import httpcore._utils
+    httpcore._utils.select = eventlet.patcher.original('select')
+
+
+class AsyncUpstream:
+    """Shared httpx/AsyncGroq clients, per-upstream semaphores and the green-thread bridge"""
+
+    def __init__(self, mode=OUTBOUND_IO_MODE, transport=None):
+        self.enabled = False
+        self._client = None
+        self._groq = None
+        self._semaphores = {}
+        self.counts = {"calls": 0, "in_flight": 0, "peak_in_flight": 0, "cancelled": 0, "deadline_exceeded": 0}
+        if mode == 'async':
+            if asyncio_hub_running():
+                self.enabled = True
+                unpatch_httpcore_select()
+                self.use_transport(transport)
+                log.info(f"⚡ Async outbound I/O enabled (httpx, max {ASYNC_MAX_CONNECTIONS} connections)")
+            else:
+                log.warning("⚠️ OUTBOUND_IO_MODE=async needs EVENTLET_HUB=asyncio - using blocking requests")
+
+    def use_transport(self, transport=None):
+        """(Re)build the shared httpx client, optionally on a custom transport (e.g. httpx.MockTransport)"""
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS, max_keepalive_connections=ASYNC_MAX_KEEPALIVE),
+            transport=transport,
+        )
+        return self._client
+
+    def configure_groq(self, api_key):
+        """Build the AsyncGroq client now, sharing the httpx client, rather than on the hub loop later"""
+        if not self.enabled or AsyncGroq is None:
+            return
+        try:
+            self._groq = AsyncGroq(api_key=api_key, http_client=self._client)
+        except Exception as e:
+            log.warning(f"⚠️ AsyncGroq unavailable ({e}) - Groq calls will be skipped in async mode")
+
+    def semaphore(self, upstream):
+        if upstream not in self._semaphores:
+            self._semaphores[upstream] = asyncio.Semaphore(ASYNC_UPSTREAM_CONCURRENCY.get(upstream, 32))
+        return self._semaphores[upstream]
+
+    def run(self, awaitable):
+        """Run `awaitable` on the hub's event loop, blocking only the calling green thread"""
+        thread = eventlet.asyncio.spawn_for_awaitable(awaitable)
+        try:
+            return thread.wait()
+        except BaseException:
+            thread.kill()  # Cancels the underlying future
+            raise
+
+    async def request(self, endpoint_name, method, url, is_failure=None, **kwargs):
+        """
+        Async counterpart of http_client.HttpClient.request, sharing its
+        breakers and retry budgets. Transport errors are re-raised as the
+        matching requests exceptions so callers handle both modes alike.
+
+        Returns:
+            The final httpx.Response
+        """
+        endpoint = http_client.http.endpoint(endpoint_name)
+        if not endpoint.breaker.allow():
+            raise http_client.CircuitOpenError(f"{endpoint_name} circuit open - upstream call skipped")
+        endpoint.counts["calls"] += 1
+        endpoint.budget.deposit()
+        client = self._client
+
+        try:
+            async with self.semaphore(endpoint_name):
+                attempt = 0
+                while True:
+                    response, error, retryable = None, None, True
+                    self.counts["calls"] += 1
+                    self.counts["in_flight"] += 1
+                    self.counts["peak_in_flight"] = max(self.counts["peak_in_flight"], self.counts["in_flight"])
+                    try:
+                        response = await client.request(method, url, **kwargs)
+                        failed = response.status_code in http_client.RETRYABLE_STATUSES or (
+                            response.status_code == 200 and is_failure is not None and is_failure(response))
+                    except httpx.TimeoutException as e:
+                        error, failed = requests.Timeout(str(e) or "upstream timeout"), True
+                    except httpx.TransportError as e:
+                        error, failed = requests.ConnectionError(str(e) or type(e).__name__), True
+                    except Exception as e:
+                        error, failed, retryable = e, True, False
+                    finally:
+                        self.counts["in_flight"] -= 1
+
+                    if not failed:
+                        endpoint.breaker.record_success()
+                        return response
+                    if not retryable or attempt >= http_client.http.retry_attempts:
+                        break
+                    if not endpoint.budget.withdraw():
+                        endpoint.counts["retries_denied"] += 1
+                        break
+                    endpoint.counts["retries"] += 1
+                    await asyncio.sleep(http_client.http.backoff_s(attempt, response))
+                    attempt += 1
+        except BaseException:
+            endpoint.breaker.abandon()
+            raise
+
+        endpoint.counts["failures"] += 1
+        endpoint.breaker.record_failure()
+        if error is not None:
+            raise error
+        return response
+
+    async def chat_completion(self, **kwargs):
+        """One AsyncGroq chat completion, bounded by the Groq semaphore"""
+        if self._groq is None:
+            raise RuntimeError("AsyncGroq not configured")
+        async with self.semaphore("groq"):
+            self.counts["calls"] += 1
+            self.counts["in_flight"] += 1
+            self.counts["peak_in_flight"] = max(self.counts["peak_in_flight"], self.counts["in_flight"])
+            try:
+                return await self._groq.chat.completions.create(**kwargs)
+            finally:
+                self.counts["in_flight"] -= 1
+
+    async def gather(self, awaitables, deadline_s):
+        """
+        Run a batch concurrently under one deadline.
+
+        Returns:
+            One entry per awaitable, in order: its result, or the exception it
+            raised. Anything still running at the deadline is cancelled and
+            reported as asyncio.TimeoutError.
+        """
+        tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+        if not tasks:
+            return []
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=deadline_s)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        if pending:
+            self.counts["deadline_exceeded"] += 1
+            self.counts["cancelled"] += len(pending)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results = []
+        for task in tasks:
+            if task in pending:
+                results.append(asyncio.TimeoutError(f"deadline of {deadline_s}s exceeded"))
+            elif task.exception() is not None:
+                results.append(task.exception())
+            else:
+                results.append(task.result())
+        return results
+
+    def stats(self):
+        return dict(self.counts, enabled=self.enabled, concurrency=dict(ASYNC_UPSTREAM_CONCURRENCY))
+
+
+upstream = AsyncUpstream()
@@ -0,0 +1,163 @@
+"""
+SQLite access layer for SafeRoute.
+
+Handlers borrow a connection from a small bounded pool instead of opening a new
+one per request. Each connection is opened once with WAL journaling and tuned
+pragmas, so readers never block on a writer, commits do not fsync the whole
+database, and sqlite3's per-connection statement cache stays warm across
+requests.
+
+Usage:
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute(...)
+
+The block commits on success and rolls back on any exception. Nested
+get_db() blocks in the same green thread reuse the outer connection and leave
+the commit to the outermost block.
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import logs
+
+log = logs.get_logger("db")
+
+DB_PATH = os.getenv('SAFEROUTE_DB_PATH', 'saferoute.db')
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '8'))
+DB_POOL_TIMEOUT_S = float(os.getenv('DB_POOL_TIMEOUT_S', '5'))
+DB_BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', '5000'))
+DB_CACHE_SIZE_KB = int(os.getenv('DB_CACHE_SIZE_KB', '16384'))
+DB_MMAP_SIZE_MB = int(os.getenv('DB_MMAP_SIZE_MB', '128'))
+DB_STATEMENT_CACHE = int(os.getenv('DB_STATEMENT_CACHE', '256'))
+
+
+class ConnectionPool:
+    """Bounded pool of configured sqlite3 connections, one checked out per green thread"""
+
+    def __init__(self, path, size=DB_POOL_SIZE, timeout_s=DB_POOL_TIMEOUT_S):
+        self.path = path
+        self.size = size
+        self.timeout_s = timeout_s
+        self.journal_mode = None
+        self.observer = None  # Optional callable(stage, seconds), e.g. a metrics hook
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {"opened": 0, "checkouts": 0, "reused": 0, "nested": 0, "discarded": 0, "timeouts": 0}
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _open(self):
+        """Open one connection and apply the journal and performance pragmas"""
+        conn = sqlite3.connect(self.path,
+                               timeout=DB_BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False,
+                               cached_statements=DB_STATEMENT_CACHE)
+        journal_mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if journal_mode != self.journal_mode:
+            if journal_mode.lower() != 'wal':
+                log.warning(f"⚠️ SQLite WAL mode unavailable for {self.path}, using journal_mode={journal_mode}")
+            self.journal_mode = journal_mode
+        conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL: no fsync per commit
+        conn.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE_MB * 1024 * 1024}")
+        conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        self._count("opened")
+        return conn
+
+    def acquire(self):
+        """Take an idle connection (or open a new one) once a pool slot is free"""
+        if not self._slots.acquire(timeout=self.timeout_s):
+            self._count("timeouts")
+            raise sqlite3.OperationalError(f"No database connection free after {self.timeout_s}s")
+        try:
+            conn = self._idle.get_nowait()
+            self._count("reused")
+        except queue.Empty:
+            try:
+                conn = self._open()
+            except Exception:
+                self._slots.release()
+                raise
+        self._count("checkouts")
+        return conn
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, or close it if it is no longer usable"""
+        try:
+            if discard:
+                self._count("discarded")
+                conn.close()
+            else:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            # Nested use in the same green thread: the outer block owns the transaction
+            self._count("nested")
+            yield held
+            return
+
+        requested = time.perf_counter()
+        conn = self.acquire()
+        acquired = time.perf_counter()
+        self._local.conn = conn
+        discard = False
+        wrote = False
+        try:
+            yield conn
+            wrote = conn.in_transaction  # Only writes open a transaction
+            conn.commit()
+        except BaseException:
+            try:
+                wrote = conn.in_transaction
+                conn.rollback()
+            except sqlite3.Error:
+                discard = True
+            raise
+        finally:
+            self._local.conn = None
+            self.release(conn, discard)
+            if self.observer is not None:
+                self.observer("db_pool_wait", acquired - requested)
+                self.observer("db_write" if wrote else "db_read", time.perf_counter() - acquired)
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones close when released)"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({
+            "path": self.path,
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "journal_mode": self.journal_mode,
+        })
+        return stats
+
+
+pool = ConnectionPool(DB_PATH)
+
+
+def get_db():
+    """Context manager yielding a pooled connection to the SafeRoute database"""
+    return pool.connection()
@@ -0,0 +1,318 @@
+"""
+Vectorized geodesy helpers for SafeRoute route analysis.
+
+All distances use the haversine formula on a spherical Earth. When NumPy is
+installed every function works on whole arrays in one call; otherwise the same
+functions fall back to plain Python loops with identical results.
+
+Points are (lat, lng) tuples in decimal degrees, as returned by polyline.decode.
+"""
+from math import radians, cos, sin, asin, sqrt, floor, ceil
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+EARTH_RADIUS_M = 6371000  # Earth radius in meters
+METERS_PER_DEGREE_LAT = 111195.0  # EARTH_RADIUS_M * pi / 180
+
+# Rows per block when building distance matrices, caps memory at ~4MB per block
+_CHUNK_ROWS = 512
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Great circle distance between two points in meters"""
+    d_lat = radians(lat2 - lat1)
+    d_lng = radians(lng2 - lng1)
+    a = sin(d_lat / 2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(d_lng / 2)**2
+    return EARTH_RADIUS_M * 2 * asin(sqrt(min(1.0, a)))
+
+
+def bbox_around(lat, lng, radius_m):
+    """(min_lat, min_lng, max_lat, max_lng) of the box enclosing a circle of `radius_m`"""
+    pad_lat = radius_m / METERS_PER_DEGREE_LAT
+    pad_lng = radius_m / (METERS_PER_DEGREE_LAT * max(cos(radians(lat)), 1e-6))
+    return lat - pad_lat, lng - pad_lng, lat + pad_lat, lng + pad_lng
+
+
+def _to_array(points):
+    return np.asarray(points, dtype=float).reshape(-1, 2)
+
+
+def _haversine_matrix(a, b):
+    """NumPy haversine between every row of `a` and every row of `b` (both Nx2 arrays)"""
+    lat1 = np.radians(a[:, 0])[:, None]
+    lng1 = np.radians(a[:, 1])[:, None]
+    lat2 = np.radians(b[:, 0])[None, :]
+    lng2 = np.radians(b[:, 1])[None, :]
+    h = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2)**2
+    return EARTH_RADIUS_M * 2 * np.arcsin(np.sqrt(np.minimum(1.0, h)))
+
+
+def pairwise_distances_m(points_a, points_b):
+    """
+    Distance matrix in meters between two point lists.
+    Returns an ndarray of shape (len(a), len(b)) with NumPy, else a list of lists.
+    """
+    if HAS_NUMPY:
+        if len(points_a) == 0 or len(points_b) == 0:
+            return np.zeros((len(points_a), len(points_b)))
+        return _haversine_matrix(_to_array(points_a), _to_array(points_b))
+    return [[haversine_m(a[0], a[1], b[0], b[1]) for b in points_b] for a in points_a]
+
+
+def min_distances_m(points, targets):
+    """
+    For each point, the distance in meters to the nearest target point.
+    Use it for point-to-polyline distances by passing the polyline vertices as targets.
+    Returns a list of floats (inf for every point when `targets` is empty).
+    """
+    if len(points) == 0:
+        return []
+    if len(targets) == 0:
+        return [float('inf')] * len(points)
+
+    if HAS_NUMPY:
+        a = _to_array(points)
+        b = _to_array(targets)
+        result = np.empty(len(a))
+        for start in range(0, len(a), _CHUNK_ROWS):
+            result[start:start + _CHUNK_ROWS] = _haversine_matrix(a[start:start + _CHUNK_ROWS], b).min(axis=1)
+        return result.tolist()
+
+    return [min(haversine_m(p[0], p[1], t[0], t[1]) for t in targets) for p in points]
+
+
+def segment_lengths_m(polyline_points):
+    """Length in meters of each consecutive segment of a polyline"""
+    if len(polyline_points) < 2:
+        return []
+
+    if HAS_NUMPY:
+        pts = np.radians(_to_array(polyline_points))
+        lat1, lng1 = pts[:-1, 0], pts[:-1, 1]
+        lat2, lng2 = pts[1:, 0], pts[1:, 1]
+        h = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2)**2
+        return (EARTH_RADIUS_M * 2 * np.arcsin(np.sqrt(np.minimum(1.0, h)))).tolist()
+
+    return [
+        haversine_m(polyline_points[i][0], polyline_points[i][1], polyline_points[i + 1][0], polyline_points[i + 1][1])
+        for i in range(len(polyline_points) - 1)
+    ]
+
+
+def cumulative_lengths_km(polyline_points):
+    """
+    Cumulative distance in km from the start of the polyline at every vertex.
+    The first entry is 0.0 and the last is the total route length.
+    """
+    if len(polyline_points) == 0:
+        return []
+
+    if HAS_NUMPY:
+        lengths = np.asarray(segment_lengths_m(polyline_points)) / 1000.0
+        return np.concatenate(([0.0], np.cumsum(lengths))).tolist()
+
+    cumulative = [0.0]
+    for length_m in segment_lengths_m(polyline_points):
+        cumulative.append(cumulative[-1] + length_m / 1000.0)
+    return cumulative
+
+
+def greedy_spacing_filter(points, min_spacing_m, limit=None, existing=()):
+    """
+    Walk `points` in order and keep each one that is at least `min_spacing_m`
+    from every point kept so far and from every point in `existing`.
+    All distances are computed up front in one matrix.
+
+    Returns:
+        List of indices into `points` that were kept, in order
+    """
+    kept = []
+    if len(points) == 0 or (limit is not None and limit <= 0):
+        return kept
+
+    if len(existing) > 0:
+        blocked = [d < min_spacing_m for d in min_distances_m(points, existing)]
+    else:
+        blocked = [False] * len(points)
+    matrix = pairwise_distances_m(points, points)
+
+    for i in range(len(points)):
+        if blocked[i]:
+            continue
+        if HAS_NUMPY:
+            if kept and (matrix[i, kept] < min_spacing_m).any():
+                continue
+        elif any(matrix[i][j] < min_spacing_m for j in kept):
+            continue
+        kept.append(i)
+        if limit is not None and len(kept) >= limit:
+            break
+
+    return kept
+
+
+def _point_segment_distance(px, py, x1, y1, x2, y2):
+    """Planar distance from (px, py) to the segment (x1, y1)-(x2, y2)"""
+    dx, dy = x2 - x1, y2 - y1
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        t = 0.0
+    else:
+        t = max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / length_sq))
+    ex, ey = x1 + t * dx - px, y1 + t * dy - py
+    return sqrt(ex * ex + ey * ey)
+
+
+def _cells_on_segment(x1, y1, x2, y2, cell_size):
+    """Grid cells crossed by a segment (Amanatides-Woo traversal)"""
+    cx, cy = floor(x1 / cell_size), floor(y1 / cell_size)
+    end_cx, end_cy = floor(x2 / cell_size), floor(y2 / cell_size)
+    cells = [(cx, cy)]
+    dx, dy = x2 - x1, y2 - y1
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+    t_max_x = ((cx + (step_x > 0)) * cell_size - x1) / dx if dx else float('inf')
+    t_max_y = ((cy + (step_y > 0)) * cell_size - y1) / dy if dy else float('inf')
+    t_delta_x = cell_size / abs(dx) if dx else float('inf')
+    t_delta_y = cell_size / abs(dy) if dy else float('inf')
+
+    # Bounded by the Manhattan cell distance so rounding can never loop forever
+    for _ in range(abs(end_cx - cx) + abs(end_cy - cy)):
+        if t_max_x < t_max_y:
+            cx += step_x
+            t_max_x += t_delta_x
+        else:
+            cy += step_y
+            t_max_y += t_delta_y
+        cells.append((cx, cy))
+    if cells[-1] != (end_cx, end_cy):
+        cells.append((end_cx, end_cy))
+    return cells
+
+
+class RouteGeometry:
+    """
+    A decoded route polyline with a uniform grid index over its segments.
+
+    Build it once per polyline and reuse it for every "how far is this from the
+    route" question. Distances are exact point-to-segment projections in a local
+    equirectangular frame centred on the route, which is well under 0.1% off
+    haversine at city scale. Queries only look at the grid cells around the
+    point, so they cost roughly the same for a 50-point and a 5,000-point route.
+    """
+
+    def __init__(self, points, cell_size_m=250.0):
+        self.points = list(points)
+        self.cell_size_m = cell_size_m
+        self._grid = {}  # (cx, cy) -> [segment index, ...]
+        self._segments = []  # (x1, y1, x2, y2) in local meters
+
+        if not self.points:
+            self._kx = self._ky = 0.0
+            self._origin = (0.0, 0.0)
+            self._cell_bounds = (0, 0, 0, 0)
+            return
+
+        mean_lat = sum(p[0] for p in self.points) / len(self.points)
+        self._origin = self.points[0]
+        self._ky = METERS_PER_DEGREE_LAT
+        self._kx = METERS_PER_DEGREE_LAT * cos(radians(mean_lat))
+
+        xy = [self._project(lat, lng) for lat, lng in self.points]
+        if len(xy) == 1:
+            xy.append(xy[0])  # A single point is a zero-length segment
+        for i in range(len(xy) - 1):
+            (x1, y1), (x2, y2) = xy[i], xy[i + 1]
+            self._segments.append((x1, y1, x2, y2))
+            for cell in _cells_on_segment(x1, y1, x2, y2, cell_size_m):
+                self._grid.setdefault(cell, []).append(i)
+
+        xs = [c[0] for c in self._grid]
+        ys = [c[1] for c in self._grid]
+        self._cell_bounds = (min(xs), min(ys), max(xs), max(ys))
+
+    def bounds(self, buffer_m=0.0):
+        """(min_lat, min_lng, max_lat, max_lng) of the route, padded by `buffer_m`"""
+        if not self.points:
+            return None
+        pad_lat = buffer_m / self._ky
+        pad_lng = buffer_m / self._kx if self._kx else 0.0
+        lats = [p[0] for p in self.points]
+        lngs = [p[1] for p in self.points]
+        return min(lats) - pad_lat, min(lngs) - pad_lng, max(lats) + pad_lat, max(lngs) + pad_lng
+
+    def _project(self, lat, lng):
+        return (lng - self._origin[1]) * self._kx, (lat - self._origin[0]) * self._ky
+
+    def _segments_in_ring(self, cx, cy, ring):
+        """Segment indices registered in the square ring of cells at Chebyshev distance `ring`"""
+        if ring == 0:
+            return self._grid.get((cx, cy), [])
+        found = []
+        for x in range(cx - ring, cx + ring + 1):
+            found.extend(self._grid.get((x, cy - ring), []))
+            found.extend(self._grid.get((x, cy + ring), []))
+        for y in range(cy - ring + 1, cy + ring):
+            found.extend(self._grid.get((cx - ring, y), []))
+            found.extend(self._grid.get((cx + ring, y), []))
+        return found
+
+    def distance_to_m(self, lat, lng):
+        """Shortest distance in meters from a point to any segment of the route"""
+        if not self._segments:
+            return float('inf')
+        px, py = self._project(lat, lng)
+        cx, cy = floor(px / self.cell_size_m), floor(py / self.cell_size_m)
+        min_cx, min_cy, max_cx, max_cy = self._cell_bounds
+        max_ring = max(abs(cx - min_cx), abs(cx - max_cx), abs(cy - min_cy), abs(cy - max_cy)) + 1
+
+        best = float('inf')
+        checked = set()
+        for ring in range(max_ring + 1):
+            for seg_idx in self._segments_in_ring(cx, cy, ring):
+                if seg_idx in checked:
+                    continue
+                checked.add(seg_idx)
+                best = min(best, _point_segment_distance(px, py, *self._segments[seg_idx]))
+            # Segments not seen yet lie entirely outside this ring, so they are
+            # at least (ring - 1) cells away (one cell of slack for corner hits)
+            if best <= (ring - 1) * self.cell_size_m:
+                break
+        return best
+
+    def distances_to_m(self, points):
+        """distance_to_m for a list of (lat, lng) points"""
+        return [self.distance_to_m(lat, lng) for lat, lng in points]
+
+    def within(self, points, max_distance_m):
+        """
+        Indices of the points that lie within `max_distance_m` of the route.
+        Only the cells that can hold a segment that close are inspected.
+        """
+        if not self._segments:
+            return []
+        rings = int(ceil(max_distance_m / self.cell_size_m)) + 1
+        matches = []
+        for idx, (lat, lng) in enumerate(points):
+            px, py = self._project(lat, lng)
+            cx, cy = floor(px / self.cell_size_m), floor(py / self.cell_size_m)
+            checked = set()
+            hit = False
+            for ring in range(rings + 1):
+                for seg_idx in self._segments_in_ring(cx, cy, ring):
+                    if seg_idx in checked:
+                        continue
+                    checked.add(seg_idx)
+                    if _point_segment_distance(px, py, *self._segments[seg_idx]) <= max_distance_m:
+                        hit = True
+                        break
+                if hit:
+                    break
+            if hit:
+                matches.append(idx)
+        return matches
@@ -0,0 +1,198 @@
+"""
+Dependency health monitoring for SafeRoute.
+
+Each dependency (SQLite, Google Places, Directions, Groq) registers a probe: a
+cheap live check that returns a short detail string or raises. A background
+green thread runs every probe on its own interval, concurrently and under a
+timeout, and keeps the last HEALTH_WINDOW results per dependency. The
+summaries are rebuilt after each probe, so the health endpoints only read
+cached state and never wait on a dependency.
+
+Liveness and readiness are separate:
+- live: the process and its event loop are responsive (the monitor loop is
+  still ticking). A failure here means the instance should be restarted.
+- ready: every *critical* dependency is passing. A failure here means the
+  instance should stop getting traffic, not be restarted.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import eventlet
+
+import logs
+
+log = logs.get_logger("health")
+
+HEALTH_PROBE_INTERVAL_S = float(os.getenv('HEALTH_PROBE_INTERVAL_S', '30'))
+HEALTH_PROBE_TIMEOUT_S = float(os.getenv('HEALTH_PROBE_TIMEOUT_S', '5'))
+HEALTH_PROBE_DELAY_S = float(os.getenv('HEALTH_PROBE_DELAY_S', '0'))  # Before the first round
+HEALTH_WINDOW = int(os.getenv('HEALTH_WINDOW', '20'))  # Probe results kept per dependency
+HEALTH_FAILURE_THRESHOLD = int(os.getenv('HEALTH_FAILURE_THRESHOLD', '2'))  # Consecutive failures before unhealthy
+HEALTH_TICK_S = 1.0
+HEALTH_STALL_S = float(os.getenv('HEALTH_STALL_S', '15'))  # Monitor silent this long -> not live
+
+
+class DependencyHealth:
+    """Rolling probe results and the cached summary for one dependency"""
+
+    def __init__(self, name, probe, interval_s, timeout_s, critical, extra=None):
+        self.name = name
+        self.probe = probe
+        self.interval_s = interval_s
+        self.timeout_s = timeout_s
+        self.critical = critical
+        self.extra = extra
+        self.results = deque(maxlen=HEALTH_WINDOW)  # (ok, latency_ms)
+        self.next_due = 0.0
+        self.running = False
+        self.probes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.summary = {"status": "unknown", "critical": critical, "probes": 0}
+
+    def run(self):
+        started = time.perf_counter()
+        detail, error = None, None
+        try:
+            with eventlet.Timeout(self.timeout_s):
+                detail = self.probe()
+        except eventlet.Timeout:
+            error = f"probe timed out after {self.timeout_s}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        finally:
+            self.running = False
+        self.record(error is None, (time.perf_counter() - started) * 1000, detail, error)
+
+    def record(self, ok, latency_ms, detail=None, error=None):
+        self.results.append((ok, latency_ms))
+        self.probes += 1
+        if ok:
+            self.consecutive_failures = 0
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+
+        latencies = sorted(latency for _, latency in self.results)
+        passed = sum(1 for ok_, _ in self.results if ok_)
+        if ok:
+            status = "healthy"
+        elif self.consecutive_failures >= HEALTH_FAILURE_THRESHOLD:
+            status = "unhealthy"
+        else:
+            status = "degraded"
+        previous = self.summary["status"]
+        if status != previous and (previous != "unknown" or status != "healthy"):
+            log.log(logging.INFO if ok else logging.WARNING, f"{'✅' if ok else '⚠️'} Dependency {self.name} is {status}{': ' + error if error else ''}")
+        self.summary = {
+            "status": status,
+            "critical": self.critical,
+            "checked_at": datetime.now().isoformat(),
+            "latency_ms": round(latency_ms, 1),
+            "detail": detail,
+            "error": error,
+            "consecutive_failures": self.consecutive_failures,
+            "window": {
+                "probes": len(self.results),
+                "success_rate": round(passed / len(self.results), 3),
+                "latency_p50_ms": round(latencies[len(latencies) // 2], 1),
+                "latency_p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+                "latency_max_ms": round(latencies[-1], 1),
+            },
+            "probes": self.probes,
+            "failures": self.failures,
+        }
+
+    def snapshot(self):
+        if self.extra is None:
+            return self.summary
+        return dict(self.summary, **self.extra())
+
+
+class HealthMonitor:
+    """Registry of dependency probes plus the background loop that runs them"""
+
+    def __init__(self):
+        self.dependencies = {}
+        self.started_at = time.monotonic()
+        self.last_tick = None
+        self.loop_lag_ms = 0.0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def register(self, name, probe, interval_s=HEALTH_PROBE_INTERVAL_S, timeout_s=HEALTH_PROBE_TIMEOUT_S,
+                 critical=False, extra=None):
+        """
+        Args:
+            name: Dependency name, e.g. "sqlite"
+            probe: Zero-argument callable; returns a short detail or raises
+            interval_s: Seconds between probes of this dependency
+            timeout_s: Probe budget; a slower probe counts as a failure
+            critical: Whether readiness requires this dependency
+            extra: Optional callable returning live fields (e.g. breaker state)
+                to merge into the summary when it is read
+        """
+        self.dependencies[name] = DependencyHealth(name, probe, interval_s, timeout_s, critical, extra)
+
+    def run_due(self):
+        """Start every probe that is due; each runs in its own green thread"""
+        now = time.monotonic()
+        for dependency in list(self.dependencies.values()):
+            with self._lock:
+                if dependency.running or now < dependency.next_due:
+                    continue
+                dependency.running = True
+                dependency.next_due = now + dependency.interval_s
+            eventlet.spawn(dependency.run)
+
+    def loop(self):
+        eventlet.sleep(HEALTH_PROBE_DELAY_S)
+        while True:
+            try:
+                self.run_due()
+            except Exception as e:
+                log.warning(f"⚠️ Health monitor error: {e}")
+            self.last_tick = time.monotonic()
+            eventlet.sleep(HEALTH_TICK_S)
+            # How late the hub woke us up: a wedged event loop shows up here first
+            self.loop_lag_ms = max(0.0, (time.monotonic() - self.last_tick - HEALTH_TICK_S) * 1000)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = eventlet.spawn(self.loop)
+
+    def liveness(self):
+        """(is_live, body)"""
+        now = time.monotonic()
+        if self.last_tick is None:
+            # Not ticked yet: fine while still inside the startup grace period
+            live = now - self.started_at < HEALTH_PROBE_DELAY_S + HEALTH_STALL_S
+        else:
+            live = now - self.last_tick < HEALTH_STALL_S
+        return live, {
+            "status": "alive" if live else "stalled",
+            "uptime_seconds": round(now - self.started_at, 1),
+            "event_loop_lag_ms": round(self.loop_lag_ms, 1),
+        }
+
+    def readiness(self):
+        """(is_ready, body): ready once every critical dependency has passed and is not unhealthy"""
+        dependencies = {name: dependency.snapshot() for name, dependency in self.dependencies.items()}
+        blocking = [
+            name for name, summary in dependencies.items()
+            if summary["critical"] and summary["status"] in ("unknown", "unhealthy")
+        ]
+        if blocking:
+            overall = "unhealthy" if any(dependencies[name]["status"] == "unhealthy" for name in blocking) else "starting"
+        elif any(summary["status"] in ("degraded", "unhealthy") for summary in dependencies.values()):
+            overall = "degraded"
+        else:
+            overall = "healthy"
+        return not blocking, {"status": overall, "ready": not blocking, "blocking": blocking, "dependencies": dependencies}
+
+
+monitor = HealthMonitor()
@@ -0,0 +1,261 @@
+"""
+Outbound HTTP layer for the Google APIs.
+
+Every upstream call goes through one shared requests.Session, so TLS
+connections to each Google host are kept alive and reused instead of being
+re-negotiated per call. Each host gets its own urllib3 pool sized for the
+number of calls we run against it concurrently.
+
+Calls are grouped by endpoint name ("places", "directions"). Each endpoint has:
+
+- a retry policy: 429, 5xx and connection errors are retried with full-jitter
+  exponential backoff (honouring Retry-After), but only while the endpoint's
+  retry budget has tokens, so retries can never multiply load on an upstream
+  that is already struggling;
+- a circuit breaker: after HTTP_BREAKER_FAILURES consecutive failed calls the
+  endpoint is short-circuited for HTTP_BREAKER_COOLDOWN_S, during which calls
+  raise CircuitOpenError immediately and callers serve cached or fallback data.
+  One trial call is then let through to decide whether to close it again.
+
+Usage:
+    response = http.request("places", "POST", url, json=..., timeout=5)
+"""
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import logs
+
+log = logs.get_logger("http")
+
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '4'))  # Hosts kept in the default adapter
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '10'))  # Kept-alive connections per host by default
+HTTP_RETRY_ATTEMPTS = int(os.getenv('HTTP_RETRY_ATTEMPTS', '2'))  # Retries after the first try
+HTTP_RETRY_BASE_S = float(os.getenv('HTTP_RETRY_BASE_S', '0.2'))
+HTTP_RETRY_MAX_S = float(os.getenv('HTTP_RETRY_MAX_S', '2'))
+HTTP_RETRY_BUDGET_RATIO = float(os.getenv('HTTP_RETRY_BUDGET_RATIO', '0.2'))  # Retry tokens earned per call
+HTTP_RETRY_BUDGET_MAX = float(os.getenv('HTTP_RETRY_BUDGET_MAX', '10'))
+HTTP_BREAKER_FAILURES = int(os.getenv('HTTP_BREAKER_FAILURES', '5'))
+HTTP_BREAKER_COOLDOWN_S = float(os.getenv('HTTP_BREAKER_COOLDOWN_S', '30'))
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling an endpoint whose circuit breaker is open"""
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of recent traffic. Every call
+    deposits `ratio` tokens (up to `max_tokens`) and every retry spends one.
+    """
+
+    def __init__(self, ratio=HTTP_RETRY_BUDGET_RATIO, max_tokens=HTTP_RETRY_BUDGET_MAX):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self):
+        """Spend one token; False when the budget is exhausted"""
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a cooldown and a single half-open trial call"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name, failure_threshold=HTTP_BREAKER_FAILURES, cooldown_s=HTTP_BREAKER_COOLDOWN_S):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_s = cooldown_s
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.times_opened = 0
+        self.short_circuited = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go upstream now"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown_s:
+                self.state = self.HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                log.info(f"✅ Circuit for {self.name} closed again")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.trial_in_flight = False
+                self.times_opened += 1
+                log.warning(f"⚠️ Circuit for {self.name} opened after {self.failures} failures - "
+                            f"serving cached/fallback data for {self.cooldown_s:.0f}s")
+
+    def abandon(self):
+        """The call was cancelled before it finished: let another one be the half-open trial"""
+        with self._lock:
+            self.trial_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened,
+                "short_circuited": self.short_circuited,
+            }
+
+
+class Endpoint:
+    """Breaker, retry budget and counters for one named upstream endpoint"""
+
+    def __init__(self, name):
+        self.name = name
+        self.breaker = CircuitBreaker(name)
+        self.budget = RetryBudget()
+        self.counts = {"calls": 0, "retries": 0, "retries_denied": 0, "failures": 0}
+
+
+class HttpClient:
+    """Shared keep-alive session with per-endpoint retries and circuit breakers"""
+
+    def __init__(self, retry_attempts=HTTP_RETRY_ATTEMPTS):
+        self.retry_attempts = retry_attempts
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE))
+        self.pool_sizes = {}
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def mount_host(self, base_url, pool_size):
+        """Give one host its own connection pool of `pool_size` kept-alive connections"""
+        # Several APIs can share a host (e.g. one local stand-in): keep the largest pool
+        pool_size = max(pool_size, self.pool_sizes.get(base_url, 0))
+        self.session.mount(base_url, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.pool_sizes[base_url] = pool_size
+
+    def endpoint(self, name):
+        with self._lock:
+            if name not in self._endpoints:
+                self._endpoints[name] = Endpoint(name)
+            return self._endpoints[name]
+
+    def backoff_s(self, attempt, response=None):
+        """Full-jitter exponential backoff, or the server's Retry-After when it sent one"""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(HTTP_RETRY_MAX_S, max(0.0, float(retry_after)))
+            except ValueError:
+                pass  # HTTP-date form: fall back to our own backoff
+        return random.uniform(0, min(HTTP_RETRY_MAX_S, HTTP_RETRY_BASE_S * (2 ** attempt)))
+
+    def request(self, endpoint_name, method, url, is_failure=None, **kwargs):
+        """
+        Send one request through the shared session.
+
+        Args:
+            endpoint_name: Breaker/budget group, e.g. "places"
+            method, url, **kwargs: As for requests.Session.request
+            is_failure: Optional check for responses that are HTTP 200 but
+                still an upstream failure worth retrying (e.g. UNKNOWN_ERROR)
+
+        Returns:
+            The final requests.Response. Non-retryable error statuses are
+            returned as-is for the caller to handle.
+
+        Raises:
+            CircuitOpenError when the endpoint is short-circuited, or the last
+            requests exception once retries are used up.
+        """
+        endpoint = self.endpoint(endpoint_name)
+        if not endpoint.breaker.allow():
+            raise CircuitOpenError(f"{endpoint_name} circuit open - upstream call skipped")
+        endpoint.counts["calls"] += 1
+        endpoint.budget.deposit()
+
+        try:
+            attempt = 0
+            while True:
+                response, error, retryable = None, None, True
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                    failed = response.status_code in RETRYABLE_STATUSES or (
+                        response.status_code == 200 and is_failure is not None and is_failure(response))
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error, failed = e, True
+                except Exception as e:
+                    # Malformed request or response: retrying will not help, but the
+                    # failure still counts (and ends a half-open trial)
+                    error, failed, retryable = e, True, False
+
+                if not failed:
+                    endpoint.breaker.record_success()
+                    return response
+                if not retryable or attempt >= self.retry_attempts:
+                    break
+                if not endpoint.budget.withdraw():
+                    endpoint.counts["retries_denied"] += 1
+                    break
+                endpoint.counts["retries"] += 1
+                time.sleep(self.backoff_s(attempt, response))
+                attempt += 1
+        except BaseException:
+            # Green thread killed (deadline, hedged race loser) mid-call
+            endpoint.breaker.abandon()
+            raise
+
+        endpoint.counts["failures"] += 1
+        endpoint.breaker.record_failure()
+        if error is not None:
+            raise error
+        return response
+
+    def stats(self):
+        with self._lock:
+            endpoints = list(self._endpoints.values())
+        return {
+            "pool_sizes": dict(self.pool_sizes),
+            "endpoints": {
+                endpoint.name: dict(endpoint.counts,
+                                    retry_tokens=round(endpoint.budget.tokens, 2),
+                                    breaker=endpoint.breaker.stats())
+                for endpoint in endpoints
+            },
+        }
+
+
+http = HttpClient()
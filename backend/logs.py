@@ -0,0 +1,231 @@
+"""
+Structured, non-blocking logging for SafeRoute.
+
+A log call formats its record as one JSON line and puts it on a bounded
+in-memory queue; nothing else happens on the caller's green thread. A native
+OS thread (not a green thread) drains the queue every LOG_FLUSH_INTERVAL_S
+and writes to stdout in batches, so a slow or blocked stdout - a full pipe, a stalled log shipper -
+never stalls the eventlet hub. If the queue is full the record is dropped and
+counted instead of waiting.
+
+Every record carries the current request id. HTTP requests take it from an
+incoming X-Request-ID header or get a fresh one, and SOS enrichment jobs carry
+the id of the alert request that queued them, so one id follows a route or
+SOS flow end to end. Green threads start with an empty context, so work
+handed to a pool is wrapped with bind() to keep the caller's id.
+
+High-volume lines (one per place parsed) are tagged with
+extra={"sample": key}; only one record in LOG_SAMPLE_EVERY per key is kept,
+and kept records report sample_every so counts can be scaled back up.
+Failures worth acting on (upstream errors, stale data served) are never sampled.
+
+Usage:
+    log = logs.get_logger("app")
+    log.info(f"✅ Alert {alert_id} updated", extra={"alert_id": alert_id})
+    log.debug("Parsed %s", name, extra={"sample": "places_parse"})
+"""
+import atexit
+import contextvars
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+
+from eventlet import patcher
+
+# Unpatched modules: the writer must be a real thread blocking on a real queue
+native_threading = patcher.original('threading')
+native_queue = patcher.original('queue')
+native_sleep = patcher.original('time').sleep
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()  # json | text
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_SAMPLE_EVERY = int(os.getenv('LOG_SAMPLE_EVERY', '100'))
+LOG_FLUSH_INTERVAL_S = float(os.getenv('LOG_FLUSH_INTERVAL_S', '0.05'))
+
+request_id_var = contextvars.ContextVar('request_id', default=None)
+
+# Attributes every LogRecord has; anything else on a record came from extra=
+RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id', 'sample'}
+
+
+def get_logger(name):
+    return logging.getLogger(f"saferoute.{name}")
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:16]
+
+
+def get_request_id():
+    return request_id_var.get()
+
+
+def set_request_id(request_id):
+    """Set the current request id; returns a token for reset_request_id()"""
+    return request_id_var.set(request_id)
+
+
+def reset_request_id(token):
+    request_id_var.reset(token)
+
+
+def bind(func):
+    """Wrap `func` so it runs with the caller's request id, e.g. pool.spawn(bind(work), ...)"""
+    request_id = request_id_var.get()
+    if request_id is None:
+        return func
+
+    def run(*args, **kwargs):
+        request_id_var.set(request_id)
+        return func(*args, **kwargs)
+    return run
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, request_id, extra fields, exc"""
+    encoder = json.JSONEncoder(default=str, ensure_ascii=False)
+
+    def __init__(self):
+        super().__init__()
+        self._second = None
+        self._second_prefix = ""
+
+    def timestamp(self, created):
+        second = int(created)
+        if second != self._second:
+            self._second, self._second_prefix = second, time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        return f"{self._second_prefix}.{int((created - second) * 1000):03d}Z"
+
+    def format(self, record):
+        entry = {
+            "ts": self.timestamp(record.created),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.request_id is not None:
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return self.encoder.encode(entry)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development (LOG_FORMAT=text)"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(request_id_label)s%(message)s', '%H:%M:%S')
+
+    def format(self, record):
+        record.request_id_label = f"[{record.request_id}] " if record.request_id else ""
+        return super().format(record)
+
+
+class QueueHandler(logging.Handler):
+    """
+    Formats records on the calling thread and hands the lines to a native
+    writer thread. Never blocks: a full queue drops the record.
+    """
+
+    def __init__(self, stream=None, maxsize=LOG_QUEUE_SIZE, sample_every=LOG_SAMPLE_EVERY):
+        super().__init__()
+        self.stream = stream
+        self.queue = native_queue.Queue(maxsize)
+        self.sample_every = sample_every
+        self.sample_counts = {}
+        self.counts = {"emitted": 0, "dropped": 0, "sampled_out": 0, "errors": 0}
+        self._writer = native_threading.Thread(target=self._drain, name='log-writer', daemon=True)
+        self._writer.start()
+
+    def handle(self, record):
+        # Overridden to skip Handler.handle's lock: emit() only touches a thread-safe queue
+        sample = getattr(record, 'sample', None)
+        if sample is not None:
+            seen = self.sample_counts.get(sample, 0)
+            self.sample_counts[sample] = seen + 1
+            if seen % self.sample_every:
+                self.counts["sampled_out"] += 1
+                return False
+            record.sample_every = self.sample_every
+        record.request_id = request_id_var.get()
+        self.emit(record)
+        return True
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.counts["errors"] += 1
+            return
+        try:
+            self.queue.put_nowait(line)
+            self.counts["emitted"] += 1
+        except native_queue.Full:
+            self.counts["dropped"] += 1
+
+    def _drain(self):
+        while True:
+            lines = [self.queue.get()]
+            # Let a batch build up: waking this thread per record would pull
+            # the GIL away from the hub thread on every log call
+            native_sleep(LOG_FLUSH_INTERVAL_S)
+            while True:
+                try:
+                    lines.append(self.queue.get_nowait())
+                except native_queue.Empty:
+                    break
+            stop = None in lines
+            stream = self.stream or sys.stdout
+            try:
+                stream.write("\n".join(line for line in lines if line is not None) + "\n")
+                stream.flush()
+            except Exception:
+                self.counts["errors"] += 1
+            if stop:
+                return
+
+    def close(self):
+        """Flush what is queued and stop the writer (called at exit)"""
+        if self._writer.is_alive():
+            try:
+                self.queue.put(None, timeout=1)
+            except native_queue.Full:
+                pass
+            self._writer.join(timeout=2)
+        super().close()
+
+    def stats(self):
+        return dict(self.counts, queued=self.queue.qsize(), capacity=self.queue.maxsize)
+
+
+handler = None
+
+
+def configure(level=None, fmt=None, stream=None):
+    """Install the queue handler on the "saferoute" logger (idempotent)"""
+    global handler
+    if handler is not None:
+        return handler
+    # Not in our output, and under eventlet the thread lookup alone costs more than the rest of a record
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    handler = QueueHandler(stream)
+    handler.setFormatter(TextFormatter() if (fmt or LOG_FORMAT) == 'text' else JsonFormatter())
+    root = logging.getLogger('saferoute')
+    root.setLevel(level or LOG_LEVEL)
+    root.addHandler(handler)
+    root.propagate = False
+    atexit.register(handler.close)
+    return handler
+
+
+def stats():
+    return handler.stats() if handler is not None else {}
@@ -0,0 +1,249 @@
+"""
+In-process metrics for SafeRoute, exported in Prometheus text format.
+
+Recording is a perf_counter() pair, a bisect and a few integer adds under an
+uncontended lock, so it is cheap enough to leave on in production. Rendering
+happens only when /metrics is scraped.
+
+Usage:
+    with metrics.stage("directions_fetch"):
+        ...
+    metrics.REQUESTS.inc(endpoint="get_routes", status="200")
+
+Values that other modules already count (cache hits, breaker state, pool
+usage) are not duplicated here: register_collector() adds a callback that
+turns them into samples at scrape time.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram with fixed buckets (seconds) and outcome counts"""
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+    def __init__(self, buckets=None):
+        if buckets is not None:
+            self.BUCKETS = tuple(buckets)
+        self.lock = threading.Lock()
+        self.counts = [0] * (len(self.BUCKETS) + 1)  # last slot is +Inf
+        self.total = 0
+        self.sum_s = 0.0
+        self.outcomes = {}
+
+    def observe(self, seconds, outcome="ok"):
+        with self.lock:
+            self.counts[bisect_left(self.BUCKETS, seconds)] += 1
+            self.total += 1
+            self.sum_s += seconds
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (None if empty or beyond the last bucket)"""
+        with self.lock:
+            if not self.total:
+                return None
+            rank = q * self.total
+            seen = 0
+            for bound, count in zip(self.BUCKETS, self.counts):
+                seen += count
+                if seen >= rank:
+                    return bound
+            return None
+
+    def stats(self):
+        with self.lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(self.BUCKETS, self.counts):
+                cumulative += count
+                buckets[f"le_{bound:g}"] = cumulative
+            buckets["le_inf"] = self.total
+            summary = {
+                "count": self.total,
+                "sum_s": round(self.sum_s, 3),
+                "mean_s": round(self.sum_s / self.total, 3) if self.total else None,
+                "buckets": buckets,
+                "outcomes": dict(self.outcomes)
+            }
+        summary.update({"p50_s": self.quantile(0.5), "p95_s": self.quantile(0.95), "p99_s": self.quantile(0.99)})
+        return summary
+
+
+# Fine-grained buckets for in-process stages (sub-millisecond decode up to slow upstreams)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (f'{key}="{escape_label(value)}"' for key, value in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_value(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+class Timer:
+    """Times one block into a LatencyHistogram (a class, not @contextmanager, to keep it cheap)"""
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            outcome = "ok"
+        elif issubclass(exc_type, Exception):
+            outcome = "error"
+        else:
+            outcome = "cancelled"  # Green thread killed by a deadline
+        self.histogram.observe(time.perf_counter() - self.started, outcome)
+        return False
+
+
+class Counter:
+    """Monotonic counter family with labels"""
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = list(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in values:
+            lines.append(f"{self.name}{format_labels(dict(zip(self.labelnames, key)))} {format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Histogram family with labels; each label set is a LatencyHistogram"""
+
+    def __init__(self, name, help_text, labelnames=(), buckets=STAGE_BUCKETS, outcomes_name=None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.outcomes_name = outcomes_name  # Also export per-outcome counts under this name
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, LatencyHistogram(self.buckets))
+        return child
+
+    def observe(self, seconds, outcome="ok", **labels):
+        self.labels(**labels).observe(seconds, outcome)
+
+    def time(self, **labels):
+        """Context manager observing the block's duration; outcome is ok, error or cancelled"""
+        return Timer(self.labels(**labels))
+
+    def render(self):
+        with self._lock:
+            children = list(self._children.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        outcome_lines = []
+        for key, child in children:
+            labels = dict(zip(self.labelnames, key))
+            with child.lock:
+                counts, total, sum_s, outcomes = list(child.counts), child.total, child.sum_s, dict(child.outcomes)
+            cumulative = 0
+            for bound, count in zip(child.BUCKETS, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(dict(labels, le=f'{bound:g}'))} {cumulative}")
+            lines.append(f"{self.name}_bucket{format_labels(dict(labels, le='+Inf'))} {total}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {sum_s:.6f}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {total}")
+            for outcome, count in outcomes.items():
+                outcome_lines.append(f"{self.outcomes_name}{format_labels(dict(labels, outcome=outcome))} {count}")
+        if self.outcomes_name:
+            lines += [f"# HELP {self.outcomes_name} {self.help} (count per outcome)",
+                      f"# TYPE {self.outcomes_name} counter"] + outcome_lines
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help_text, labelnames=()):
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labelnames=(), buckets=STAGE_BUCKETS, outcomes_name=None):
+        metric = Histogram(name, help_text, labelnames, buckets, outcomes_name)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collect):
+        """
+        `collect()` is called at scrape time and returns a list of
+        (name, type, help, [(labels_dict, value), ...]) families.
+        """
+        self._collectors.append(collect)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for collect in self._collectors:
+            try:
+                families = collect()
+            except Exception as e:
+                lines.append(f"# collector {getattr(collect, '__name__', collect)} failed: {e}")
+                continue
+            for name, kind, help_text, samples in families:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                lines += [f"{name}{format_labels(labels)} {format_value(value)}" for labels, value in samples]
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "saferoute_stage_seconds", "Time spent in one stage of request handling", ("stage",))
+REQUEST_SECONDS = registry.histogram(
+    "saferoute_request_seconds", "HTTP request latency by endpoint", ("endpoint",))
+REQUESTS = registry.counter(
+    "saferoute_requests_total", "HTTP requests by endpoint and status code", ("endpoint", "status"))
+PLACES_SEARCH_SECONDS = registry.histogram(
+    "saferoute_places_search_seconds", "One cached Places search (memory, SQLite or upstream) by place type", ("place_type",))
+PLACES_SEARCH_ERRORS = registry.counter(
+    "saferoute_places_search_errors_total", "Places searches that failed upstream, by what was served instead", ("outcome",))
+SOCKETIO_EMITS = registry.counter(
+    "saferoute_socketio_emits_total", "Socket.IO events emitted", ("event",))
+
+
+def stage(name):
+    """Context manager timing one named stage into saferoute_stage_seconds"""
+    return STAGE_SECONDS.time(stage=name)
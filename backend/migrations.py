@@ -0,0 +1,195 @@
+"""
+Versioned schema migrations for the SafeRoute SQLite database.
+
+The schema version lives in SQLite's own `PRAGMA user_version`. At startup
+migrate() applies every migration newer than that version, in order, each one
+in its own IMMEDIATE transaction together with the version bump, so a crash
+or a second worker starting at the same time can never leave a half-applied
+step behind.
+
+To change the schema, append a new function decorated with @migration(N, ...)
+where N is one more than the current highest version. Never edit a migration
+that has already shipped.
+"""
+import sqlite3
+
+import logs
+
+log = logs.get_logger("migrations")
+
+MIGRATIONS = []  # (version, description, function), kept sorted by version
+
+
+def migration(version, description):
+    """Register `func(cursor)` as the step that brings the schema to `version`"""
+    def register(func):
+        if any(v == version for v, _, _ in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+    return register
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def column_names(c, table):
+    return {row[1] for row in c.execute(f"PRAGMA table_info({table})")}
+
+
+@migration(1, "base sos_alerts and route_feedback tables")
+def create_base_tables(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS sos_alerts
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  lat REAL NOT NULL,
+                  lng REAL NOT NULL,
+                  timestamp DATETIME NOT NULL,
+                  status TEXT DEFAULT 'PENDING',
+                  user_name TEXT DEFAULT 'Anonymous')''')
+    c.execute('''CREATE TABLE IF NOT EXISTS route_feedback
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  lat REAL,
+                  lng REAL,
+                  type TEXT,
+                  description TEXT,
+                  timestamp DATETIME NOT NULL,
+                  route_polyline TEXT,
+                  user_name TEXT DEFAULT 'Anonymous')''')
+
+    # Databases created before user names were recorded lack the column
+    for table in ("sos_alerts", "route_feedback"):
+        if "user_name" not in column_names(c, table):
+            c.execute(f"ALTER TABLE {table} ADD COLUMN user_name TEXT DEFAULT 'Anonymous'")
+
+
+@migration(2, "spatial index for community feedback")
+def create_feedback_spatial_index(c):
+    # An R*Tree when SQLite supports it, otherwise a plain (lat, lng) index
+    # for the bounding-box prefilter
+    try:
+        c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS route_feedback_rtree
+                     USING rtree(id, min_lat, max_lat, min_lng, max_lng)''')
+        c.execute('''INSERT INTO route_feedback_rtree (id, min_lat, max_lat, min_lng, max_lng)
+                     SELECT id, lat, lat, lng, lng FROM route_feedback
+                     WHERE lat IS NOT NULL AND lng IS NOT NULL
+                       AND id NOT IN (SELECT id FROM route_feedback_rtree)''')
+    except sqlite3.OperationalError:
+        log.warning("⚠️ SQLite R*Tree module not available - using (lat, lng) index for feedback lookups")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_route_feedback_lat_lng ON route_feedback (lat, lng)")
+
+
+@migration(3, "persistent Places cache")
+def create_places_cache(c):
+    # One row per place type / geohash tile / radius bucket
+    c.execute('''CREATE TABLE IF NOT EXISTS places_cache
+                 (place_type TEXT NOT NULL,
+                  tile TEXT NOT NULL,
+                  radius_bucket REAL NOT NULL,
+                  payload TEXT NOT NULL,
+                  fetched_at REAL NOT NULL,
+                  min_lat REAL,
+                  min_lng REAL,
+                  max_lat REAL,
+                  max_lng REAL,
+                  hit_count INTEGER DEFAULT 0,
+                  PRIMARY KEY (place_type, tile, radius_bucket))''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_places_cache_fetched_at ON places_cache (fetched_at)")
+
+
+@migration(4, "indexes for alert and feedback listings")
+def create_listing_indexes(c):
+    # Admin panel: filter by status, newest first
+    c.execute("CREATE INDEX IF NOT EXISTS idx_sos_alerts_status_timestamp ON sos_alerts (status, timestamp)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_sos_alerts_timestamp ON sos_alerts (timestamp)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_route_feedback_timestamp ON route_feedback (timestamp)")
+
+
+@migration(5, "updated_at change tracking for SOS alerts")
+def add_alert_updated_at(c):
+    # Set on insert and on every status change, so admins can fetch deltas
+    if "updated_at" not in column_names(c, "sos_alerts"):
+        c.execute("ALTER TABLE sos_alerts ADD COLUMN updated_at TEXT")
+    c.execute("UPDATE sos_alerts SET updated_at = timestamp WHERE updated_at IS NULL")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_sos_alerts_updated_at ON sos_alerts (updated_at)")
+
+
+@migration(6, "background enrichment results for SOS alerts")
+def create_sos_enrichments(c):
+    # One row per alert: the nearby emergency services found after the alert
+    # was acknowledged, or why the lookup failed
+    c.execute('''CREATE TABLE IF NOT EXISTS sos_enrichments
+                 (alert_id INTEGER PRIMARY KEY,
+                  status TEXT NOT NULL DEFAULT 'PENDING',
+                  source TEXT,
+                  suggestions TEXT,
+                  error TEXT,
+                  created_at TEXT NOT NULL,
+                  updated_at TEXT NOT NULL)''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_sos_enrichments_status ON sos_enrichments (status, updated_at)")
+
+
+def migrate(conn):
+    """
+    Bring the database up to the newest schema version.
+
+    Args:
+        conn: sqlite3 connection with no open transaction
+
+    Returns:
+        (version_before, version_after)
+    """
+    start_version = schema_version(conn)
+    for version, description, func in MIGRATIONS:
+        if version <= start_version:
+            continue
+        # Take the write lock first, then re-check: another worker may have
+        # applied this step while we were waiting
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            func(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        log.info(f"🗄️ Schema migration {version} applied: {description}")
+    return start_version, schema_version(conn)
+
+
+def full_scans(conn, sql, params=(), allow_sort=False):
+    """
+    EXPLAIN QUERY PLAN `sql` and return the plan lines that read a whole table
+    (or, unless `allow_sort`, sort the result in a temporary B-tree).
+    """
+    problems = []
+    for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+        detail = row[-1]
+        if detail.startswith("SCAN ") and "USING" not in detail and "VIRTUAL TABLE" not in detail:
+            problems.append(detail)
+        elif not allow_sort and "USE TEMP B-TREE" in detail:
+            problems.append(detail)
+    return problems
+
+
+def check_query_plans(conn, queries):
+    """
+    Verify that each hot query is served by an index.
+
+    Args:
+        conn: sqlite3 connection
+        queries: list of (name, sql, params, allow_sort)
+
+    Returns:
+        {name: [offending plan lines]} for every query that regressed
+    """
+    regressions = {}
+    for name, sql, params, allow_sort in queries:
+        problems = full_scans(conn, sql, params, allow_sort)
+        if problems:
+            regressions[name] = problems
+    return regressions
@@ -0,0 +1,126 @@
+"""
+Lazy registry for the external AI/data providers.
+
+Nothing here touches the network at import time. A provider's client is
+built the first time a request asks for it. probe() makes one cheap live call
+and caches the result; the health monitor (health.py) runs it in the
+background, so /ai-status and the SOS path read state instead of making live
+calls.
+
+Usage:
+    providers.register("groq", configured=bool(KEY), factory=lambda: Groq(api_key=KEY),
+                       probe=lambda client: client.models.retrieve(MODEL).id)
+    client = providers.get("groq")   # None if unconfigured or construction failed
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+import eventlet
+
+import logs
+
+log = logs.get_logger("providers")
+
+PROVIDER_PROBE_TIMEOUT_S = float(os.getenv('PROVIDER_PROBE_TIMEOUT_S', '10'))
+PROVIDER_RETRY_S = float(os.getenv('PROVIDER_RETRY_S', '60'))  # Before rebuilding a client that failed to construct
+
+
+class Provider:
+    def __init__(self, name, configured, factory, probe=None):
+        self.name = name
+        self.configured = configured
+        self.factory = factory
+        self.probe = probe
+        self.client = None
+        self.init_error = None
+        self.init_failed_at = 0.0
+        self.health = {"healthy": None, "checked_at": None, "latency_ms": None, "detail": None, "error": None}
+
+
+class ProviderRegistry:
+    """Providers by name, with clients created on first use and cached probe results"""
+
+    def __init__(self):
+        self._providers = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, configured, factory, probe=None):
+        """
+        Args:
+            name: Provider name, e.g. "groq"
+            configured: Whether the library and credentials are present
+            factory: Zero-argument callable building the client (no network calls)
+            probe: Optional callable(client) making one cheap live call; its
+                return value is reported as the probe detail
+        """
+        self._providers[name] = Provider(name, configured, factory, probe)
+
+    def get(self, name):
+        """The provider's client, built on first use; None when unconfigured or construction failed"""
+        provider = self._providers.get(name)
+        if provider is None or not provider.configured:
+            return None
+        if provider.client is not None:
+            return provider.client
+        with self._lock:
+            if provider.client is None:
+                if provider.init_error and time.time() - provider.init_failed_at < PROVIDER_RETRY_S:
+                    return None
+                try:
+                    provider.client = provider.factory()
+                    provider.init_error = None
+                    log.info(f"✅ {name} client initialized")
+                except Exception as e:
+                    provider.init_error = str(e)
+                    provider.init_failed_at = time.time()
+                    log.error(f"❌ {name} client initialization failed: {e}")
+            return provider.client
+
+    def is_usable(self, name):
+        """Configured, constructible, and not known to be failing its probe"""
+        provider = self._providers.get(name)
+        if provider is None or self.get(name) is None:
+            return False
+        return provider.health["healthy"] is not False
+
+    def probe(self, name):
+        """Run one provider's probe now and cache the result"""
+        provider = self._providers[name]
+        client = self.get(name)
+        health = {"healthy": None, "checked_at": datetime.now().isoformat(), "latency_ms": None, "detail": None, "error": None}
+        if client is None:
+            health.update(healthy=False, error=provider.init_error or "not configured")
+        elif provider.probe is None:
+            health.update(healthy=True, detail="no probe")
+        else:
+            started = time.perf_counter()
+            try:
+                with eventlet.Timeout(PROVIDER_PROBE_TIMEOUT_S):
+                    health["detail"] = provider.probe(client)
+                health["healthy"] = True
+            except eventlet.Timeout:
+                health.update(healthy=False, error=f"probe timed out after {PROVIDER_PROBE_TIMEOUT_S}s")
+            except Exception as e:
+                health.update(healthy=False, error=str(e))
+            health["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        if health["healthy"] != provider.health["healthy"]:
+            log.log(logging.INFO if health['healthy'] else logging.WARNING,
+                    f"{'✅' if health['healthy'] else '⚠️'} {name} probe: {'healthy' if health['healthy'] else health['error']}")
+        provider.health = health
+        return health
+
+    def status(self, name):
+        """Cached state of one provider; never makes a live call"""
+        provider = self._providers[name]
+        return {
+            "configured": provider.configured,
+            "initialized": provider.client is not None,
+            "init_error": provider.init_error,
+            **provider.health,
+        }
+
+
+providers = ProviderRegistry()
@@ -0,0 +1,90 @@
+"""
+Shared fixtures for the backend tests.
+
+The backend's modules import each other flat (import logs, import db), so
+backend/ goes on sys.path. `app_module` imports backend/app.py in-process,
+once per session, against a throwaway database. benchmarks/ supplies the local stand-ins for
+Google and Groq (fake_upstreams.py) and the helpers that start them and the
+backend as subprocesses; nothing here touches the network.
+
+Run from the repository root:
+    python -m pytest backend/tests
+"""
+import argparse
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(TESTS_DIR)
+BENCHMARKS_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'benchmarks')
+sys.path[:0] = [BACKEND_DIR, BENCHMARKS_DIR]
+
+import api_bench
+import fake_upstreams
+
+
+def upstream_args(**overrides):
+    """The namespace api_bench's start helpers expect: fast, error-free fakes by default"""
+    parser = argparse.ArgumentParser()
+    fake_upstreams.add_arguments(parser)
+    args = parser.parse_args(['--latency-ms', '5', '--jitter-ms', '0'])
+    args.seed = 1
+    args.async_io = False
+    args.log_level = 'WARNING'
+    vars(args).update(overrides)
+    return args
+
+
+@pytest.fixture(scope="session")
+def fake_upstream_port():
+    """Port of one fake_upstreams.py process shared by the whole session"""
+    process, port = api_bench.start_fake_upstreams(upstream_args())
+    yield port
+    process.terminate()
+    process.wait(timeout=10)
+
+
+@pytest.fixture
+def start_backend(fake_upstream_port, tmp_path):
+    """Start backend/app.py as a subprocess against the fakes; returns (base_url, log_path)"""
+    processes = []
+
+    def start(extra_env=None, **overrides):
+        process, base, log_path = api_bench.start_backend(upstream_args(**overrides), fake_upstream_port,
+                                                          str(tmp_path), extra_env)
+        processes.append(process)
+        return base, log_path
+
+    yield start
+    for process in processes:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+@pytest.fixture(scope="session")
+def app_module(fake_upstream_port, tmp_path_factory):
+    """backend/app.py imported in-process against the fakes and a throwaway database"""
+    fake = f"http://127.0.0.1:{fake_upstream_port}"
+    os.environ.update(SAFEROUTE_DB_PATH=str(tmp_path_factory.mktemp("db") / "saferoute.db"),
+                      GOOGLE_MAPS_API_KEY='test-key',
+                      PLACES_API_BASE_URL=fake,
+                      DIRECTIONS_API_BASE_URL=fake,
+                      GROQ_BASE_URL=fake,
+                      HEALTH_PROBE_DELAY_S='3600',  # No background probes while the tests run
+                      LOG_LEVEL='WARNING')
+    import app
+    return app
+
+
+@pytest.fixture
+def clean_db(app_module):
+    """app_module with the alert and feedback tables emptied"""
+    tables = ["sos_enrichments", "sos_alerts", "route_feedback"]
+    if app_module.FEEDBACK_RTREE_AVAILABLE:
+        tables.append("route_feedback_rtree")
+    with app_module.get_db() as conn:
+        for table in tables:
+            conn.execute(f"DELETE FROM {table}")
+    return app_module
@@ -0,0 +1,83 @@
+"""/get-all-alerts listing and delta sync"""
+import pytest
+
+
+@pytest.fixture
+def client(clean_db):
+    return clean_db.app.test_client()
+
+
+def insert_alerts(app_module, rows):
+    """Insert (timestamp, status) alerts whose updated_at all tie; returns their ids"""
+    ids = []
+    with app_module.get_db() as conn:
+        for timestamp, status in rows:
+            c = conn.execute("""INSERT INTO sos_alerts (lat, lng, timestamp, status, user_name, updated_at)
+                                VALUES (17.4, 78.4, ?, ?, 'Test User', '2024-01-01 09:00:00')""", (timestamp, status))
+            ids.append(c.lastrowid)
+    return ids
+
+
+def fetch_pages(client, query):
+    """Follow X-Next-Cursor listing pages; returns the ids in the order served"""
+    ids, cursor = [], None
+    while True:
+        response = client.get(f"/get-all-alerts?{query}" + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200
+        ids += [alert["id"] for alert in response.get_json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("query", [
+    "since_ts=garbage",
+    "since_ts=2024-01-01T10:00:00",
+    "since_ts=2024-01-01 10:00:00&since_ts_id=-1",
+    "cursor=-1",
+    "cursor=abc",
+    "since_id=-1",
+    "limit=ten",
+])
+def test_malformed_cursor_is_rejected(client, query):
+    response = client.get(f"/get-all-alerts?{query}")
+    assert response.status_code == 400
+    assert "Invalid request" in response.get_json()["error"]
+
+
+def test_well_formed_sync_cursor_is_accepted(client):
+    response = client.get("/get-all-alerts?since_ts=2024-01-01 10:00:00.123&since_ts_id=7")
+    assert response.status_code == 200
+
+
+def test_listing_pages_through_tied_timestamps(clean_db, client):
+    rows = [("2024-01-01 10:00:00", "PENDING"), ("2024-01-01 10:00:01", "RESOLVED"),
+            ("2024-01-01 10:00:00", "PENDING"), ("2024-01-01 09:59:59", "PENDING"),
+            ("2024-01-01 10:00:01", "PENDING"), ("2024-01-01 10:00:00", "RESOLVED"),
+            ("2024-01-01 09:59:59", "PENDING")]
+    ids = insert_alerts(clean_db, rows)
+    newest_first = [i for _, i in sorted(zip((ts for ts, _ in rows), ids), reverse=True)]
+    assert fetch_pages(client, "limit=3") == newest_first
+
+    pending = {i for i, (_, status) in zip(ids, rows) if status == "PENDING"}
+    assert fetch_pages(client, "status=PENDING&limit=2") == [i for i in newest_first if i in pending]
+
+
+def test_delta_pages_through_tied_updated_at(clean_db, client):
+    ids = insert_alerts(clean_db, [("2024-01-01 09:00:00", "PENDING")] * 5)
+    seen, since_ts, since_ts_id = [], "2024-01-01 00:00:00", 0
+    while True:
+        response = client.get(f"/get-all-alerts?since_ts={since_ts}&since_ts_id={since_ts_id}&limit=2")
+        assert response.status_code == 200
+        seen += [alert["id"] for alert in response.get_json()]
+        since_ts, since_ts_id = response.headers["X-Sync-Cursor"], response.headers["X-Sync-Cursor-Id"]
+        if "X-Next-Cursor" not in response.headers:
+            break
+    assert seen == ids
+
+    # Caught up: nothing new until an alert changes
+    response = client.get(f"/get-all-alerts?since_ts={since_ts}&since_ts_id={since_ts_id}")
+    assert response.get_json() == []
+    assert client.put(f"/update-alert/{ids[2]}", json={"status": "RESOLVED"}).status_code == 200
+    response = client.get(f"/get-all-alerts?since_ts={since_ts}&since_ts_id={since_ts_id}")
+    assert [(alert["id"], alert["status"]) for alert in response.get_json()] == [(ids[2], "RESOLVED")]
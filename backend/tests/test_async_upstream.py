@@ -0,0 +1,60 @@
+"""OUTBOUND_IO_MODE=async against real sockets (benchmarks/fake_upstreams.py)"""
+import threading
+import time
+
+import api_bench
+import requests
+
+from conftest import upstream_args
+
+
+def test_async_mode_serves_routes_and_sos_over_real_connections(start_backend):
+    base, log_path = start_backend(async_io=True)
+
+    # New origins each time: fresh Directions and Places calls over pooled, reused connections
+    for i in range(3):
+        response = requests.post(f"{base}/get-routes", json={"source": f"17.38{i},78.48", "destination": "17.44,78.34"},
+                                 timeout=60)
+        assert response.status_code == 200, response.text
+        assert len(response.json()) > 0
+
+    alert = requests.post(f"{base}/send-alert", json={"lat": 17.385, "lng": 78.486, "user_name": "test"}, timeout=30).json()
+    deadline = time.time() + 30
+    enrichment = {"status": "PENDING"}
+    while enrichment["status"] == "PENDING" and time.time() < deadline:
+        time.sleep(0.2)
+        enrichment = requests.get(f"{base}{alert['enrichment_url']}", timeout=10).json()
+    assert enrichment["status"] == "DONE"
+    assert enrichment["source"] == "google_places"
+
+    stats = requests.get(f"{base}/cache-stats", timeout=10).json()["async_upstream"]
+    assert stats["enabled"]
+    assert stats["calls"] > 0
+    with open(log_path) as f:
+        assert "do not call blocking functions from the mainloop" not in f.read()
+
+
+def test_async_tile_fetches_are_coalesced_across_requests(tmp_path):
+    # Slow Places so two routes' fetches overlap. Origins 10m apart: different
+    # routes to the route-level coalescer, mostly the same Places tiles.
+    upstreams, port = api_bench.start_fake_upstreams(upstream_args(places_latency_ms=300))
+    backend = None
+    try:
+        backend, base, _ = api_bench.start_backend(upstream_args(async_io=True), port, str(tmp_path))
+        statuses = []
+        threads = [threading.Thread(target=lambda source=source: statuses.append(requests.post(
+            f"{base}/get-routes", json={"source": source, "destination": "17.44,78.34"}, timeout=60).status_code))
+            for source in ("17.38000,78.48000", "17.38009,78.48000")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert statuses == [200, 200]
+
+        tile_flight = requests.get(f"{base}/cache-stats", timeout=10).json()["single_flight"]["places_tile"]
+        assert tile_flight["coalesced"] > 0
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.wait(timeout=10)
+        upstreams.terminate()
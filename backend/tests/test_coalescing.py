@@ -0,0 +1,55 @@
+"""SingleFlight request coalescing and the keys it is used with"""
+import eventlet
+
+
+def run_concurrently(func, calls):
+    threads = [eventlet.spawn(func, *args) for args in calls]
+    return [thread.wait() for thread in threads]
+
+
+def test_nearby_lookups_coalesce_per_deadline(app_module, monkeypatch):
+    searched = []
+
+    def fake_search(lat, lng, deadline_s):
+        searched.append(deadline_s)
+        eventlet.sleep(0.05)
+        return {"deadline_s": deadline_s}
+
+    monkeypatch.setattr(app_module, "search_nearby_emergency_places", fake_search)
+    results = run_concurrently(app_module.get_nearby_places_with_google_api,
+                               [(12.9716, 77.5946, 1.0), (12.9716, 77.5946, 1.0), (12.9716, 77.5946, 2.0)])
+    # A caller with a longer budget never gets the result of a shorter one
+    assert sorted(searched) == [1.0, 2.0]
+    assert [result["deadline_s"] for result in results] == [1.0, 1.0, 2.0]
+
+
+def test_route_searches_coalesce_per_deadline(app_module, monkeypatch):
+    searched = []
+
+    def fake_search(route_points, type_limits, deadline_s, geometry):
+        searched.append(deadline_s)
+        eventlet.sleep(0.05)
+        return {"hospital": [], "deadline_s": deadline_s}, True
+
+    monkeypatch.setattr(app_module, "search_places_along_route", fake_search)
+    route = [(12.9716, 77.5946), (12.9750, 77.6000)]
+    results = run_concurrently(app_module.get_places_along_route_multi,
+                               [(route, {"hospital": 5}, 1.0), (route, {"hospital": 5}, 1.0), (route, {"hospital": 5}, 2.0)])
+    assert sorted(searched) == [1.0, 2.0]
+    assert [places["deadline_s"] for places, _ in results] == [1.0, 1.0, 2.0]
+
+
+def test_killed_waiter_is_not_left_counted(app_module):
+    flight = app_module.SingleFlight("test")
+    release = eventlet.Event()
+    leader = eventlet.spawn(flight.do, "key", release.wait)
+    eventlet.sleep(0)
+    waiter = eventlet.spawn(flight.do, "key", release.wait)
+    eventlet.sleep(0)
+    assert flight._waiters["key"] == 1
+
+    waiter.kill()
+    assert flight._waiters["key"] == 0
+    release.send("done")
+    assert leader.wait() == "done"
+    assert flight.stats()["coalesced"] == 1
@@ -0,0 +1,69 @@
+"""/get-feedback listing, paging and the spatial index"""
+import pytest
+
+import geodesy
+
+LAT, LNG = 17.385044, 78.486671
+
+
+@pytest.fixture
+def client(clean_db):
+    return clean_db.app.test_client()
+
+
+def insert_feedback(app_module, rows):
+    """Insert (timestamp, lat, lng) reports the way /post-feedback does; returns their ids"""
+    ids = []
+    with app_module.get_db() as conn:
+        for timestamp, lat, lng in rows:
+            c = conn.execute("""INSERT INTO route_feedback (lat, lng, type, description, timestamp, user_name)
+                                VALUES (?, ?, 'pothole', '', ?, 'Test User')""", (lat, lng, timestamp))
+            if app_module.FEEDBACK_RTREE_AVAILABLE:
+                conn.execute("INSERT INTO route_feedback_rtree (id, min_lat, max_lat, min_lng, max_lng) VALUES (?, ?, ?, ?, ?)",
+                             (c.lastrowid, lat, lat, lng, lng))
+            ids.append(c.lastrowid)
+    return ids
+
+
+def fetch_pages(client, query):
+    """Follow X-Next-Cursor pages; returns the ids in the order served"""
+    ids, cursor = [], None
+    while True:
+        response = client.get(f"/get-feedback?{query}" + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200
+        ids += [report["id"] for report in response.get_json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+
+
+def test_listing_pages_newest_first_through_tied_timestamps(clean_db, client):
+    # Ids out of timestamp order, as after a clock step or a bulk import
+    timestamps = ["2024-01-01 10:00:00", "2024-01-01 10:00:05", "2024-01-01 10:00:00",
+                  "2024-01-01 09:00:00", "2024-01-01 10:00:05", "2024-01-01 10:00:00", "2024-01-01 11:00:00"]
+    ids = insert_feedback(clean_db, [(ts, LAT, LNG) for ts in timestamps])
+    newest_first = [i for _, i in sorted(zip(timestamps, ids), reverse=True)]
+    assert fetch_pages(client, "limit=3") == newest_first
+    assert fetch_pages(client, f"lat={LAT}&lng={LNG}&radius=100&limit=2") == newest_first
+
+
+def test_radius_query_keeps_only_reports_inside_the_circle(clean_db, client):
+    near, far = insert_feedback(clean_db, [("2024-01-01 10:00:00", LAT, LNG),
+                                           ("2024-01-01 10:00:01", LAT + 0.001, LNG + 0.001)])
+    assert geodesy.haversine_m(LAT, LNG, LAT + 0.001, LNG + 0.001) > 100
+    assert fetch_pages(client, f"lat={LAT}&lng={LNG}&radius=100") == [near]
+    assert fetch_pages(client, f"lat={LAT}&lng={LNG}&radius=1000") == [far, near]
+
+
+def test_spatial_index_matches_a_report_on_the_box_edge(clean_db):
+    # Full-precision coordinates the R*Tree can only store rounded outwards
+    lat, lng = 17.123456789123, 78.987654321987
+    report_id, = insert_feedback(clean_db, [("2024-01-01 10:00:00", lat, lng)])
+    with clean_db.get_db() as conn:
+        if clean_db.FEEDBACK_RTREE_AVAILABLE:
+            min_lat, max_lat = conn.execute("SELECT min_lat, max_lat FROM route_feedback_rtree WHERE id = ?",
+                                            (report_id,)).fetchone()
+            # Stored box is wider than the point, so a containment test would miss it
+            assert min_lat < lat or max_lat > lat
+        rows = list(clean_db.iter_feedback_rows(conn.cursor(), (lat, lng, lat, lng)))
+    assert [row[0] for row in rows] == [report_id]
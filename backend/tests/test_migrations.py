@@ -0,0 +1,39 @@
+"""Versioned schema migrations (migrations.py)"""
+import sqlite3
+
+import migrations
+
+LATEST = migrations.MIGRATIONS[-1][0]
+
+
+def table_names(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_fresh_database_reaches_latest_version(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "fresh.db"))
+    assert LATEST >= 6
+    assert migrations.migrate(conn) == (0, LATEST)
+    assert {"sos_alerts", "route_feedback", "places_cache", "sos_enrichments"} <= table_names(conn)
+    # Nothing left to apply on the next start
+    assert migrations.migrate(conn) == (LATEST, LATEST)
+
+
+def test_legacy_database_is_upgraded_in_place(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "legacy.db"))
+    # The schema from before migrations: no user names, no version stamp
+    conn.execute('''CREATE TABLE sos_alerts (id INTEGER PRIMARY KEY AUTOINCREMENT, lat REAL NOT NULL,
+                    lng REAL NOT NULL, timestamp DATETIME NOT NULL, status TEXT DEFAULT 'PENDING')''')
+    conn.execute('''CREATE TABLE route_feedback (id INTEGER PRIMARY KEY AUTOINCREMENT, lat REAL, lng REAL, type TEXT,
+                    description TEXT, timestamp DATETIME NOT NULL, route_polyline TEXT)''')
+    conn.execute("INSERT INTO sos_alerts (lat, lng, timestamp) VALUES (17.4, 78.4, '2024-01-01 10:00:00')")
+    conn.execute("INSERT INTO route_feedback (lat, lng, type, timestamp) VALUES (17.4, 78.4, 'pothole', '2024-01-01 10:00:00')")
+    conn.commit()
+
+    assert migrations.migrate(conn) == (0, LATEST)
+    assert "user_name" in migrations.column_names(conn, "sos_alerts")
+    assert "user_name" in migrations.column_names(conn, "route_feedback")
+    # Existing alerts get a change-tracking position
+    assert conn.execute("SELECT updated_at FROM sos_alerts").fetchone()[0] == '2024-01-01 10:00:00'
+    if "route_feedback_rtree" in table_names(conn):
+        assert conn.execute("SELECT COUNT(*) FROM route_feedback_rtree").fetchone()[0] == 1
@@ -0,0 +1,29 @@
+"""Concurrent Places fan-out (fan_out_places_searches)"""
+import time
+
+import eventlet
+
+
+def test_results_come_back_in_search_order(app_module):
+    # Coordinates no other test uses, so every search reaches the upstream
+    searches = [(13.0500 + i * 0.01, 80.2500, place_type, 2000, 3)
+                for i, place_type in enumerate(["hospital", "police", "gas_station", "lodging", "hospital", "police"])]
+    results = app_module.fan_out_places_searches(searches, deadline_s=10.0, concurrency=4)
+    assert len(results) == len(searches)
+    for (_, _, place_type, _, max_count), places in zip(searches, results):
+        assert places and len(places) <= max_count
+        assert all(place_type in place["types"] for place in places)
+
+
+def test_deadline_drops_slow_searches(app_module, monkeypatch):
+    def slow_search(lat, lng, place_type, radius, max_count):
+        eventlet.sleep(5 if place_type == "police" else 0)
+        return [{"types": [place_type]}]
+
+    monkeypatch.setattr(app_module, "cached_places_nearby", slow_search)
+    searches = [(13.2, 80.3, "hospital", 1000, 1), (13.2, 80.3, "police", 1000, 1), (13.2, 80.3, "lodging", 1000, 1)]
+    started = time.monotonic()
+    results = app_module.fan_out_places_searches(searches, deadline_s=0.2)
+    assert time.monotonic() - started < 2
+    # Searches that finished behind the straggler are kept
+    assert results == [[{"types": ["hospital"]}], None, [{"types": ["lodging"]}]]
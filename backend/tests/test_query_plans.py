@@ -0,0 +1,31 @@
+"""EXPLAIN QUERY PLAN regression check for the per-request queries (hot_queries)"""
+import sqlite3
+
+import migrations
+
+
+def migrated_db(path):
+    conn = sqlite3.connect(str(path))
+    migrations.migrate(conn)
+    return conn
+
+
+def test_hot_queries_are_served_by_indexes(app_module, tmp_path):
+    conn = migrated_db(tmp_path / "plans.db")
+    try:
+        names = {name for name, _, _, _ in app_module.hot_queries()}
+        assert {"get_feedback", "get_all_alerts?since_ts", "get_all_alerts?status"} <= names
+        assert migrations.check_query_plans(conn, app_module.hot_queries()) == {}
+    finally:
+        conn.close()
+
+
+def test_missing_index_is_reported(app_module, tmp_path):
+    conn = migrated_db(tmp_path / "plans.db")
+    try:
+        conn.execute("DROP INDEX idx_route_feedback_timestamp")
+        conn.execute("DROP INDEX idx_sos_alerts_updated_at")
+        regressions = migrations.check_query_plans(conn, app_module.hot_queries())
+        assert {"get_feedback", "get_all_alerts?since_ts"} <= set(regressions)
+    finally:
+        conn.close()
@@ -0,0 +1,29 @@
+"""Streamed /get-routes: geometry first, each analysed route, then the ranking"""
+import eventlet
+
+
+def test_stream_emits_geometry_then_each_route_then_ranking(app_module):
+    socket_client = app_module.socketio.test_client(app_module.app)
+    sid = app_module.socketio.server.manager.sid_from_eio_sid(socket_client.eio_sid, "/")
+    try:
+        response = app_module.app.test_client().post("/get-routes", json={
+            "source": "12.9716,77.5946", "destination": "12.9352,77.6245",
+            "stream": True, "socket_id": sid, "stream_id": "test-stream"})
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body["status"] == "STREAMING" and body["stream_id"] == "test-stream"
+
+        events = []
+        with eventlet.Timeout(30):
+            while not events or events[-1]["name"] not in ("routes_ranked", "routes_error"):
+                events += [packet for packet in socket_client.get_received()
+                           if packet["args"] and packet["args"][0].get("stream_id") == "test-stream"]
+                eventlet.sleep(0.05)
+    finally:
+        socket_client.disconnect()
+
+    route_count = body["route_count"]
+    assert route_count > 0
+    assert [event["name"] for event in events] == ["route_geometry"] + ["route_enriched"] * route_count + ["routes_ranked"]
+    assert len(events[0]["args"][0]["routes"]) == route_count
+    assert len(events[-1]["args"][0]["routes"]) == route_count
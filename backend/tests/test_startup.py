@@ -0,0 +1,26 @@
+"""Importing the app must not wait on Groq, or on any other network call"""
+import json
+import subprocess
+import sys
+import time
+
+import startup_time
+
+PROBE = ("import json, app; from providers import providers; "
+         "print('STATUS', json.dumps(providers.status('groq')))")
+
+
+def test_import_finishes_in_budget_with_groq_unreachable(tmp_path):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=startup_time.BACKEND,
+                            env=startup_time.startup_env(str(tmp_path), 0),
+                            capture_output=True, text=True, timeout=120)
+    wall_s = time.perf_counter() - started
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert wall_s < startup_time.MAX_SECONDS
+
+    status = next(json.loads(line.split(' ', 1)[1]) for line in result.stdout.splitlines() if line.startswith('STATUS'))
+    # providers.get("groq") has not run: no client built, no probe made
+    assert status["initialized"] is False
+    assert status["init_error"] is None
+    assert status["checked_at"] is None
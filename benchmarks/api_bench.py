@@ -0,0 +1,316 @@
+"""
+Offline API benchmark: throughput and latency percentiles for the main
+endpoints, with Google Directions, Places and Groq replaced by local fakes.
+
+Starts benchmarks/fake_upstreams.py and the backend (backend/app.py, against
+an empty temporary database), then drives each endpoint in turn from
+--concurrency client threads for --duration seconds:
+
+    get-routes         a new origin per request: Directions + Places fan-out
+    get-routes-stream  the same with "stream": true - answered after Directions
+    get-routes-cached  the demo trip every time: served from the caches
+    send-alert         SOS insert + admin broadcast (enrichment runs behind)
+    post-feedback      feedback insert + broadcast
+    get-feedback       spatial feedback query
+
+Results go to a JSON file (default benchmarks/results/api-<commit>.json)
+with the commit, settings and per-endpoint stats. --compare prints the
+change against an earlier results file. Nothing touches the network.
+
+Run from the repository root:
+    python benchmarks/api_bench.py [--duration 10] [--concurrency 16]
+        [--endpoints get-routes,send-alert] [--latency-ms 80] [--error-rate 0.01]
+        [--compare benchmarks/results/api-<older commit>.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+import fake_upstreams
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+BACKEND = os.path.join(ROOT, 'backend')
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+DEMO_SOURCE = "17.3850,78.4867"
+DEMO_DESTINATION = "17.4401,78.3489"
+FEEDBACK_TYPES = ["accident", "construction", "pothole", "flood", "traffic", "danger", "harassment", "theft", "other"]
+
+
+def near_hyderabad(rnd, spread=0.05):
+    return 17.40 + rnd.uniform(-spread, spread), 78.45 + rnd.uniform(-spread, spread)
+
+
+def get_routes(session, base, rnd):
+    lat, lng = near_hyderabad(rnd)
+    return session.post(f"{base}/get-routes", json={"source": f"{lat:.5f},{lng:.5f}", "destination": DEMO_DESTINATION}, timeout=60)
+
+
+def get_routes_stream(session, base, rnd):
+    # Time to first paint: the events go to a socket id nobody holds, the analysis still runs
+    lat, lng = near_hyderabad(rnd)
+    return session.post(f"{base}/get-routes", json={"source": f"{lat:.5f},{lng:.5f}", "destination": DEMO_DESTINATION,
+                                                     "stream": True, "socket_id": "bench-no-listener"}, timeout=60)
+
+
+def get_routes_cached(session, base, rnd):
+    return session.post(f"{base}/get-routes", json={"source": DEMO_SOURCE, "destination": DEMO_DESTINATION}, timeout=60)
+
+
+def send_alert(session, base, rnd):
+    lat, lng = near_hyderabad(rnd)
+    return session.post(f"{base}/send-alert", json={"lat": lat, "lng": lng, "user_name": "bench"}, timeout=60)
+
+
+def post_feedback(session, base, rnd):
+    lat, lng = near_hyderabad(rnd)
+    return session.post(f"{base}/post-feedback", json={
+        "lat": lat, "lng": lng, "type": rnd.choice(FEEDBACK_TYPES),
+        "description": "Benchmark report", "user_name": "bench"}, timeout=60)
+
+
+def get_feedback(session, base, rnd):
+    lat, lng = near_hyderabad(rnd)
+    return session.get(f"{base}/get-feedback", params={"lat": lat, "lng": lng, "radius": 5000}, timeout=60)
+
+
+SCENARIOS = {
+    "get-routes": get_routes,
+    "get-routes-stream": get_routes_stream,
+    "get-routes-cached": get_routes_cached,
+    "send-alert": send_alert,
+    "post-feedback": post_feedback,
+    "get-feedback": get_feedback,
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_fake_upstreams(args):
+    command = [sys.executable, os.path.join(ROOT, 'benchmarks', 'fake_upstreams.py'), '--port', '0',
+               '--latency-ms', str(args.latency_ms), '--jitter-ms', str(args.jitter_ms),
+               '--error-rate', str(args.error_rate), '--seed', str(args.seed)]
+    for name in fake_upstreams.UPSTREAMS:
+        for option in ('latency_ms', 'error_rate'):
+            value = getattr(args, f'{name}_{option}')
+            if value is not None:
+                command += [f"--{name}-{option.replace('_', '-')}", str(value)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith('READY'):
+        process.kill()
+        raise SystemExit("fake upstreams failed to start")
+    return process, int(line.split()[1])
+
+
+def start_backend(args, upstream_port, tmpdir, extra_env=None):
+    port = free_port()
+    fake = f"http://127.0.0.1:{upstream_port}"
+    env = dict(os.environ,
+               PORT=str(port),
+               SAFEROUTE_DB_PATH=os.path.join(tmpdir, 'bench.db'),
+               GOOGLE_MAPS_API_KEY='bench-key',
+               GROQ_API_KEY='bench-key',
+               PLACES_API_BASE_URL=fake,
+               DIRECTIONS_API_BASE_URL=fake,
+               GROQ_BASE_URL=fake,
+               LOG_LEVEL=args.log_level)
+    if args.async_io:
+        env.update(OUTBOUND_IO_MODE='async', EVENTLET_HUB='asyncio')
+    env.update(extra_env or {})
+    log_path = os.path.join(tmpdir, 'backend.log')
+    log_file = open(log_path, 'w')
+    process = subprocess.Popen([sys.executable, 'app.py'], cwd=BACKEND, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            if requests.get(f"{base}/health/live", timeout=1).status_code == 200:
+                return process, base, log_path
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    with open(log_path) as f:
+        print(f.read()[-3000:])
+    raise SystemExit("backend failed to start")
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def run_scenario(name, base, args):
+    """Drive one endpoint from --concurrency threads for --duration seconds"""
+    scenario = SCENARIOS[name]
+    latencies, statuses, errors = [], {}, []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + args.duration
+
+    def worker(worker_idx):
+        rnd = random.Random(f"{args.seed}-{name}-{worker_idx}")
+        session = requests.Session()
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                status = scenario(session, base, rnd).status_code
+            except requests.RequestException as e:
+                status, error = 'exception', type(e).__name__
+            else:
+                error = None
+            elapsed = time.perf_counter() - started
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(elapsed)
+                elif error:
+                    errors.append(error)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_s = time.perf_counter() - started
+
+    latencies.sort()
+    total = sum(statuses.values())
+    ms = lambda value: round(value * 1000, 2) if value is not None else None
+    return {
+        "requests": total,
+        "ok": len(latencies),
+        "error_rate": round(1 - len(latencies) / total, 4) if total else None,
+        "statuses": {str(status): count for status, count in statuses.items()},
+        "client_errors": sorted(set(errors)),
+        "throughput_rps": round(len(latencies) / wall_s, 2),
+        "latency_ms": {
+            "mean": ms(sum(latencies) / len(latencies)) if latencies else None,
+            "p50": ms(percentile(latencies, 0.50)),
+            "p95": ms(percentile(latencies, 0.95)),
+            "p99": ms(percentile(latencies, 0.99)),
+            "max": ms(latencies[-1] if latencies else None),
+        },
+    }
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit or None, dirty
+    except OSError:
+        return None, None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline_path} (commit {baseline.get('commit')}):")
+    print(f"{'endpoint':<18} {'rps':>16} {'p50 ms':>18} {'p95 ms':>18} {'p99 ms':>18}")
+
+    def delta(new, old):
+        if new is None or not old:
+            return f"{'-':>18}"
+        return f"{new:>9.1f} ({(new - old) / old * 100:+5.1f}%)"
+    for name, stats in results["endpoints"].items():
+        old = baseline.get("endpoints", {}).get(name)
+        if old is None:
+            continue
+        print(f"{name:<18} {delta(stats['throughput_rps'], old['throughput_rps']):>16} "
+              f"{delta(stats['latency_ms']['p50'], old['latency_ms']['p50'])} "
+              f"{delta(stats['latency_ms']['p95'], old['latency_ms']['p95'])} "
+              f"{delta(stats['latency_ms']['p99'], old['latency_ms']['p99'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoints', default=','.join(SCENARIOS), help='Comma-separated scenarios to run, in order')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per scenario')
+    parser.add_argument('--concurrency', type=int, default=16, help='Client threads per scenario')
+    parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per scenario before measuring')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--async-io', action='store_true', help='Run the backend with OUTBOUND_IO_MODE=async')
+    parser.add_argument('--log-level', default='WARNING', help='Backend LOG_LEVEL (its log is kept in the temp dir)')
+    parser.add_argument('--output', help='Results file (default benchmarks/results/api-<commit>.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    fake_upstreams.add_arguments(parser)
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.endpoints.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"unknown endpoints {unknown}; choose from {list(SCENARIOS)}")
+
+    commit, dirty = git_commit()
+    latency_ms, error_rate = fake_upstreams.upstream_settings(args)
+    results = {
+        "schema": 1,
+        "benchmark": "api",
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {"duration_s": args.duration, "concurrency": args.concurrency, "warmup": args.warmup,
+                   "seed": args.seed, "async_io": args.async_io, "log_level": args.log_level,
+                   "upstream_latency_ms": latency_ms, "upstream_jitter_ms": args.jitter_ms,
+                   "upstream_error_rate": error_rate},
+        "endpoints": {},
+    }
+
+    upstreams, upstream_port = start_fake_upstreams(args)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backend = None
+        try:
+            backend, base, log_path = start_backend(args, upstream_port, tmpdir)
+            print(f"backend {base}, fake upstreams :{upstream_port}, {args.concurrency} clients x {args.duration:g}s per endpoint\n")
+            print(f"{'endpoint':<18} {'requests':>8} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+            session = requests.Session()
+            for name in names:
+                rnd = random.Random(f"warmup-{name}")
+                for _ in range(args.warmup):
+                    SCENARIOS[name](session, base, rnd)
+                stats = run_scenario(name, base, args)
+                results["endpoints"][name] = stats
+                latency = stats["latency_ms"]
+                print(f"{name:<18} {stats['requests']:>8} {stats['throughput_rps']:>8.1f} {latency['p50'] or 0:>8.1f} "
+                      f"{latency['p95'] or 0:>8.1f} {latency['p99'] or 0:>8.1f} {stats['error_rate'] or 0:>7.1%}")
+            results["upstream_calls"] = requests.get(f"http://127.0.0.1:{upstream_port}/__stats", timeout=5).json()
+            results["backend_stats"] = requests.get(f"{base}/cache-stats", timeout=5).json()
+        finally:
+            if backend is not None:
+                backend.terminate()
+                backend.wait(timeout=10)
+            upstreams.terminate()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"api-{commit or 'unknown'}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nresults written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
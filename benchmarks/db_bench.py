@@ -0,0 +1,130 @@
+"""
+Concurrent SOS insert benchmark: connect-per-request with the default rollback
+journal (how the handlers used to work) vs the pooled WAL connections in db.py.
+
+Each run spawns --writers green threads that insert --inserts alerts each, the
+way send_alert does under an SOS spike, while --readers green threads keep
+listing alerts like the admin panel. Both runs use a fresh temporary database.
+
+Run from the repository root:
+    python benchmarks/db_bench.py [--writers 50] [--inserts 40] [--readers 5]
+"""
+import eventlet
+eventlet.monkey_patch()
+
+import argparse  # noqa: E402
+import os  # noqa: E402
+import sqlite3  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+import time  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+import db  # noqa: E402
+
+SCHEMA = '''CREATE TABLE IF NOT EXISTS sos_alerts
+            (id INTEGER PRIMARY KEY AUTOINCREMENT,
+             lat REAL NOT NULL,
+             lng REAL NOT NULL,
+             timestamp DATETIME NOT NULL,
+             status TEXT DEFAULT 'PENDING',
+             user_name TEXT DEFAULT 'Anonymous')'''
+INSERT = "INSERT INTO sos_alerts (lat, lng, timestamp, status, user_name) VALUES (?, ?, ?, 'PENDING', ?)"
+SELECT = "SELECT id, lat, lng, timestamp, status, user_name FROM sos_alerts ORDER BY id DESC LIMIT 100"
+
+
+def insert_direct(path, i):
+    conn = sqlite3.connect(path)
+    c = conn.cursor()
+    c.execute(INSERT, (17.385 + i * 1e-5, 78.486, '2024-01-01 00:00:00', f'user-{i}'))
+    conn.commit()
+    conn.close()
+
+
+def read_direct(path):
+    conn = sqlite3.connect(path)
+    conn.execute(SELECT).fetchall()
+    conn.close()
+
+
+def make_pooled(path):
+    pool = db.ConnectionPool(path)
+
+    def insert_pooled(_, i):
+        with pool.connection() as conn:
+            conn.execute(INSERT, (17.385 + i * 1e-5, 78.486, '2024-01-01 00:00:00', f'user-{i}'))
+
+    def read_pooled(_):
+        with pool.connection() as conn:
+            conn.execute(SELECT).fetchall()
+
+    return pool, insert_pooled, read_pooled
+
+
+def run(label, path, insert, read, args):
+    latencies = []
+    done = []
+
+    def writer(w):
+        for n in range(args.inserts):
+            started = time.perf_counter()
+            insert(path, w * args.inserts + n)
+            latencies.append(time.perf_counter() - started)
+            eventlet.sleep(0)  # let other requests interleave, as the server would
+        done.append(w)
+
+    reads = [0]
+
+    def reader():
+        while len(done) < args.writers:
+            read(path)
+            reads[0] += 1
+            eventlet.sleep(0)
+
+    pool = eventlet.GreenPool(args.writers + args.readers)
+    started = time.perf_counter()
+    for _ in range(args.readers):
+        pool.spawn(reader)
+    for w in range(args.writers):
+        pool.spawn(writer, w)
+    pool.waitall()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = len(latencies)
+    p50 = latencies[total // 2] * 1000
+    p99 = latencies[min(total - 1, int(total * 0.99))] * 1000
+    print(f"{label:<28} {total:>6} inserts  {total / elapsed:>9.0f}/s  "
+          f"p50 {p50:>6.2f}ms  p99 {p99:>6.2f}ms  reads {reads[0]:>6}")
+    return elapsed
+
+
+def fresh_db(tmpdir, name):
+    path = os.path.join(tmpdir, name)
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=50)
+    parser.add_argument('--inserts', type=int, default=40)
+    parser.add_argument('--readers', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        direct_s = run("connect-per-request/DELETE", fresh_db(tmpdir, 'direct.db'), insert_direct, read_direct, args)
+
+        pool, insert_pooled, read_pooled = make_pooled(fresh_db(tmpdir, 'pooled.db'))
+        pooled_s = run(f"pooled/{pool.journal_mode or 'WAL'}", pool.path, insert_pooled, read_pooled, args)
+        pool.close_all()
+
+    print(f"\nspeedup: {direct_s / pooled_s:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
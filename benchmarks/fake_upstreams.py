@@ -0,0 +1,226 @@
+"""
+Local stand-ins for Google Directions, Google Places (New) and Groq.
+
+One HTTP server answers all three APIs from the recorded payloads in
+benchmarks/fixtures, after a configurable latency, and fails a configurable
+share of calls with HTTP 503. Point the backend at it with:
+
+    PLACES_API_BASE_URL=http://127.0.0.1:<port>
+    DIRECTIONS_API_BASE_URL=http://127.0.0.1:<port>
+    GROQ_BASE_URL=http://127.0.0.1:<port>
+
+Responses follow the request so caches behave as they would live:
+- Directions: the recorded routes are shifted to start at the requested
+  origin (when it is "lat,lng"), so every new origin is a new geometry.
+- Places: the recorded places are stored as offsets and placed around the
+  requested centre, filtered to the requested type, radius and count.
+- Groq: the recorded chat completion; model lookups (the health probe) succeed.
+
+GET /__stats returns per-API call and injected-error counts.
+
+Run standalone (api_bench.py starts it for you):
+    python benchmarks/fake_upstreams.py [--port 8900] [--latency-ms 80] [--error-rate 0.01]
+        [--directions-latency-ms 250] [--groq-error-rate 0.1]
+"""
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import polyline
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+UPSTREAMS = ('directions', 'places', 'groq')
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def shift_coordinates(node, dlat, dlng):
+    """Copy of a Directions payload with every coordinate and polyline moved by (dlat, dlng)"""
+    if isinstance(node, list):
+        return [shift_coordinates(item, dlat, dlng) for item in node]
+    if not isinstance(node, dict):
+        return node
+    shifted = {}
+    for key, value in node.items():
+        if key == 'lat' and isinstance(value, (int, float)):
+            shifted[key] = round(value + dlat, 6)
+        elif key == 'lng' and isinstance(value, (int, float)):
+            shifted[key] = round(value + dlng, 6)
+        elif key == 'points' and isinstance(value, str):
+            shifted[key] = polyline.encode([(lat + dlat, lng + dlng) for lat, lng in polyline.decode(value)])
+        else:
+            shifted[key] = shift_coordinates(value, dlat, dlng)
+    return shifted
+
+
+def parse_lat_lng(value):
+    try:
+        lat, lng = (float(part) for part in value.split(','))
+        return lat, lng
+    except (AttributeError, ValueError):
+        return None
+
+
+class FakeUpstreams:
+    def __init__(self, latency_ms, jitter_ms, error_rate, seed=None):
+        self.directions = load_fixture('directions.json')
+        self.places = {key: value for key, value in load_fixture('places_nearby.json').items() if not key.startswith('_')}
+        self.chat_completion = json.dumps(load_fixture('groq_chat_completion.json')).encode()
+        leg = self.directions['routes'][0]['legs'][0]
+        self.directions_origin = (leg['start_location']['lat'], leg['start_location']['lng'])
+        self.latency_ms = dict(latency_ms)
+        self.jitter_ms = jitter_ms
+        self.error_rate = dict(error_rate)
+        self.random = random.Random(seed)
+        self.counts = {name: {"calls": 0, "errors_injected": 0} for name in UPSTREAMS}
+        self.lock = threading.Lock()
+        self._shifted = {}
+
+    def delay_and_maybe_fail(self, upstream):
+        """Sleep for the upstream's latency; True if this call should fail"""
+        with self.lock:
+            self.counts[upstream]["calls"] += 1
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = self.random.random() < self.error_rate[upstream]
+            if fail:
+                self.counts[upstream]["errors_injected"] += 1
+        time.sleep(max(0.0, self.latency_ms[upstream] + jitter) / 1000)
+        return fail
+
+    def directions_response(self, origin):
+        start = parse_lat_lng(origin)
+        if start is None:
+            return self.directions
+        dlat, dlng = round(start[0] - self.directions_origin[0], 5), round(start[1] - self.directions_origin[1], 5)
+        key = (dlat, dlng)
+        shifted = self._shifted.get(key)
+        if shifted is None:
+            shifted = shift_coordinates(self.directions, dlat, dlng)
+            if len(self._shifted) < 10000:
+                self._shifted[key] = shifted
+        return shifted
+
+    def places_response(self, body):
+        place_type = (body.get('includedTypes') or [''])[0]
+        circle = body.get('locationRestriction', {}).get('circle', {})
+        center = circle.get('center', {})
+        lat, lng = center.get('latitude', 0.0), center.get('longitude', 0.0)
+        radius = circle.get('radius', 5000.0)
+        max_count = body.get('maxResultCount', 20)
+        lng_scale = 111320 * max(0.01, math.cos(math.radians(lat)))
+        places = []
+        for place in self.places.get(place_type, []):
+            offset = place['location']
+            if math.hypot(offset['latitude'] * 111320, offset['longitude'] * lng_scale) > radius:
+                continue
+            places.append(dict(place, location={"latitude": lat + offset['latitude'], "longitude": lng + offset['longitude']}))
+            if len(places) >= max_count:
+                break
+        return {"places": places} if places else {}
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive, like the real APIs
+
+        def log_message(self, *args):
+            pass
+
+        def send_json(self, status, payload):
+            body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def read_json(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(length) or b'{}')
+
+        def upstream_error(self):
+            self.send_json(503, {"error": {"code": 503, "message": "Injected upstream failure", "status": "UNAVAILABLE"}})
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/maps/api/directions/json':
+                query = parse_qs(url.query)
+                if fake.delay_and_maybe_fail('directions'):
+                    return self.upstream_error()
+                if 'origin' not in query:
+                    return self.send_json(200, {"status": "INVALID_REQUEST", "routes": []})
+                return self.send_json(200, fake.directions_response(query['origin'][0]))
+            if url.path.startswith('/openai/v1/models/'):
+                if fake.delay_and_maybe_fail('groq'):
+                    return self.upstream_error()
+                model = url.path.rsplit('/', 1)[-1]
+                return self.send_json(200, {"id": model, "object": "model", "created": 1718000000, "owned_by": "Fake", "active": True})
+            if url.path == '/__stats':
+                with fake.lock:
+                    return self.send_json(200, {name: dict(counts) for name, counts in fake.counts.items()})
+            self.send_json(404, {"error": f"no fake for GET {url.path}"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            body = self.read_json()
+            if url.path == '/v1/places:searchNearby':
+                if fake.delay_and_maybe_fail('places'):
+                    return self.upstream_error()
+                return self.send_json(200, fake.places_response(body))
+            if url.path == '/openai/v1/chat/completions':
+                if fake.delay_and_maybe_fail('groq'):
+                    return self.upstream_error()
+                return self.send_json(200, fake.chat_completion)
+            self.send_json(404, {"error": f"no fake for POST {url.path}"})
+
+    return Handler
+
+
+def add_arguments(parser):
+    """Latency and error flags, shared with api_bench.py"""
+    parser.add_argument('--latency-ms', type=float, default=80.0, help='Base latency of every fake API')
+    parser.add_argument('--jitter-ms', type=float, default=20.0, help='Uniform +/- jitter on each call')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of calls answered with HTTP 503')
+    for name in UPSTREAMS:
+        parser.add_argument(f'--{name}-latency-ms', type=float, help=f'Override --latency-ms for {name}')
+        parser.add_argument(f'--{name}-error-rate', type=float, help=f'Override --error-rate for {name}')
+
+
+def upstream_settings(args):
+    latency = {name: getattr(args, f'{name}_latency_ms') for name in UPSTREAMS}
+    errors = {name: getattr(args, f'{name}_error_rate') for name in UPSTREAMS}
+    return ({name: args.latency_ms if value is None else value for name, value in latency.items()},
+            {name: args.error_rate if value is None else value for name, value in errors.items()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0, help='0 picks a free port')
+    parser.add_argument('--seed', type=int, default=None)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    latency_ms, error_rate = upstream_settings(args)
+    fake = FakeUpstreams(latency_ms, args.jitter_ms, error_rate, args.seed)
+    ThreadingHTTPServer.request_queue_size = 1024
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(fake))
+    server.daemon_threads = True
+    print(f"READY {server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Micro-benchmark: scalar haversine loops vs the vectorized geodesy module.
+
+Run from the repository root:
+    python benchmarks/geodesy_bench.py [--points 1000] [--places 200] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+import geodesy  # noqa: E402
+
+
+def make_polyline(n_points, seed=7):
+    """A wiggly ~30km route starting in Hyderabad"""
+    rnd = random.Random(seed)
+    lat, lng = 17.3850, 78.4867
+    points = []
+    for _ in range(n_points):
+        lat += 0.00027 + rnd.uniform(-0.0001, 0.0001)
+        lng -= 0.00006 + rnd.uniform(-0.0001, 0.0001)
+        points.append((lat, lng))
+    return points
+
+
+def scatter(points, n, spread_deg, seed=11):
+    rnd = random.Random(seed)
+    return [
+        (p[0] + rnd.uniform(-spread_deg, spread_deg), p[1] + rnd.uniform(-spread_deg, spread_deg))
+        for p in (rnd.choice(points) for _ in range(n))
+    ]
+
+
+# Scalar baselines, written the way app.py did it before the geodesy module
+def scalar_cumulative_km(points):
+    cumulative = [0.0]
+    for i in range(len(points) - 1):
+        cumulative.append(cumulative[-1] + geodesy.haversine_m(points[i][0], points[i][1], points[i + 1][0], points[i + 1][1]) / 1000.0)
+    return cumulative
+
+
+def scalar_min_distances(points, targets):
+    return [min(geodesy.haversine_m(p[0], p[1], t[0], t[1]) for t in targets) for p in points]
+
+
+def scalar_spacing_filter(points, min_spacing_m):
+    kept = []
+    for p in points:
+        if all(geodesy.haversine_m(p[0], p[1], k[0], k[1]) >= min_spacing_m for k in kept):
+            kept.append(p)
+    return kept
+
+
+def best_ms(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--points', type=int, default=1000, help='polyline vertices')
+    parser.add_argument('--places', type=int, default=200, help='places to measure against the route')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    route = make_polyline(args.points)
+    places = scatter(route, args.places, 0.01)
+    candidates = scatter(route, 40, 0.02, seed=3)
+
+    cases = [
+        ("cumulative route length", lambda: scalar_cumulative_km(route), lambda: geodesy.cumulative_lengths_km(route)),
+        (f"{args.places} places -> route distance", lambda: scalar_min_distances(places, route), lambda: geodesy.min_distances_m(places, route)),
+        ("40 candidates 500m dedup", lambda: scalar_spacing_filter(candidates, 500.0), lambda: geodesy.greedy_spacing_filter(candidates, 500.0)),
+    ]
+
+    has_numpy = geodesy.HAS_NUMPY
+    print(f"Polyline: {args.points} points | NumPy available: {has_numpy}")
+    print(f"{'case':<34}{'scalar ms':>12}{'fallback ms':>14}{'numpy ms':>12}{'speedup':>10}")
+    for name, scalar, vectorized in cases:
+        scalar_ms = best_ms(scalar, args.repeat)
+        geodesy.HAS_NUMPY = False
+        fallback_ms = best_ms(vectorized, args.repeat)
+        geodesy.HAS_NUMPY = has_numpy
+        if has_numpy:
+            numpy_ms = best_ms(vectorized, args.repeat)
+            print(f"{name:<34}{scalar_ms:>12.2f}{fallback_ms:>14.2f}{numpy_ms:>12.2f}{scalar_ms / numpy_ms:>9.1f}x")
+        else:
+            print(f"{name:<34}{scalar_ms:>12.2f}{fallback_ms:>14.2f}{'n/a':>12}{'n/a':>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,534 @@
+"""
+Offline load test for sizing the backend: map users, admin dashboards and
+SOS spikes at the same time, against the fake upstreams.
+
+A scenario file (benchmarks/scenarios/*.json) scripts the load:
+
+    {
+      "description": "...",
+      "admins": 20,                 Socket.IO dashboards joined to the 'admin' room
+      "map_users": 20,              client threads looping over "mix"
+      "think_time_s": 1.0,          mean pause between one map user's requests
+      "mix": {"get-routes": 2, "post-feedback": 1},      weights; names from api_bench.py
+      "upstreams": {"latency_ms": 80, "error_rate": 0.01},    fake_upstreams.py settings
+      "backend_env": {"SOS_ENRICH_WORKERS": "4"},             extra backend environment
+      "phases": [
+        {"name": "baseline", "duration_s": 20, "sos": {"rate_per_s": 0.5}},
+        {"name": "spike", "duration_s": 10, "map_users": 40, "sos": {"burst": 100, "every_s": 5}}
+      ]
+    }
+
+A phase may override "map_users" and "think_time_s". "sos" sends alerts at a
+Poisson "rate_per_s", and/or fires "burst" concurrent alerts at the start of
+the phase and again every "every_s" seconds.
+
+Per phase it reports:
+- HTTP latency percentiles and error rates per endpoint
+- SOS delivery latency: from the start of the /send-alert POST to each admin
+  receiving the matching new_sos_alert (alerts are matched by user_name), the
+  share of alert x admin deliveries that arrived and sequence gaps seen
+- backend CPU (100% = one core) and resident memory, from psutil or /proc
+- the load generator's own CPU, to tell when the client is the bottleneck
+
+--scale multiplies admins, map users and SOS rates and bursts to find the
+breaking point; --server-cpus pins the backend to N cores to mimic a smaller
+instance. Admin clients use WebSocket when websocket-client is installed
+(pip install "python-socketio[client]") and long-polling otherwise; the
+transport is recorded with the results.
+
+Results go to benchmarks/results/load-<scenario>-<commit>.json. Nothing
+touches the network unless --base-url points at a running server.
+
+Run from the repository root:
+    python benchmarks/load_test.py benchmarks/scenarios/sos_spike.json
+        [--scale 2] [--server-cpus 1] [--transport polling]
+        [--base-url http://127.0.0.1:5000 --server-pid 1234]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import engineio.payload
+import requests
+import socketio
+
+import api_bench
+import fake_upstreams
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import websocket  # noqa: F401 - websocket-client, lets the Socket.IO client use WebSocket
+    DEFAULT_TRANSPORT = 'websocket'
+except ImportError:
+    DEFAULT_TRANSPORT = 'polling'
+
+# A long-polling client decodes every event queued since its last poll in one
+# payload, and python-engineio refuses payloads of more than 16 packets (a
+# guard for servers). A burst queues more than that; browsers have no such cap.
+engineio.payload.Payload.max_decode_packets = 100000
+
+MAP_ACTIONS = {name: api_bench.SCENARIOS[name] for name in ('get-routes', 'get-routes-cached', 'post-feedback', 'get-feedback')}
+
+
+def ms(value):
+    return round(value * 1000, 2) if value is not None else None
+
+
+def latency_summary(values):
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "mean": ms(sum(values) / len(values)) if values else None,
+        "p50": ms(api_bench.percentile(values, 0.50)),
+        "p95": ms(api_bench.percentile(values, 0.95)),
+        "p99": ms(api_bench.percentile(values, 0.99)),
+        "max": ms(values[-1] if values else None),
+    }
+
+
+def load_scenario(path, scale):
+    with open(path) as f:
+        scenario = json.load(f)
+    scenario.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+    scenario.setdefault('admins', 0)
+    scenario.setdefault('map_users', 0)
+    scenario.setdefault('think_time_s', 1.0)
+    scenario.setdefault('mix', {"get-routes": 1, "post-feedback": 1})
+    unknown = [name for name in scenario['mix'] if name not in MAP_ACTIONS]
+    if unknown:
+        raise SystemExit(f"unknown mix entries {unknown}; choose from {list(MAP_ACTIONS)}")
+    if not scenario.get('phases'):
+        raise SystemExit(f"{path} has no phases")
+
+    # Apply --scale once here so the results record the load that actually ran
+    scenario['admins'] = int(round(scenario['admins'] * scale))
+    scenario['map_users'] = int(round(scenario['map_users'] * scale))
+    for index, phase in enumerate(scenario['phases']):
+        phase.setdefault('name', f"phase-{index + 1}")
+        if not phase.get('duration_s', 0) > 0:
+            raise SystemExit(f"phase {phase['name']} needs a positive duration_s")
+        phase['map_users'] = int(round(phase.get('map_users', scenario['map_users']) * (scale if 'map_users' in phase else 1)))
+        phase.setdefault('think_time_s', scenario['think_time_s'])
+        sos = phase.setdefault('sos', {})
+        sos['rate_per_s'] = sos.get('rate_per_s', 0) * scale
+        sos['burst'] = int(round(sos.get('burst', 0) * scale))
+    return scenario
+
+
+def upstream_args(scenario, seed):
+    """The namespace api_bench.start_fake_upstreams() expects, from the scenario's "upstreams" block"""
+    settings = scenario.get('upstreams', {})
+    args = SimpleNamespace(latency_ms=settings.get('latency_ms', 80.0), jitter_ms=settings.get('jitter_ms', 20.0),
+                           error_rate=settings.get('error_rate', 0.0), seed=seed)
+    for name in fake_upstreams.UPSTREAMS:
+        setattr(args, f'{name}_latency_ms', settings.get(f'{name}_latency_ms'))
+        setattr(args, f'{name}_error_rate', settings.get(f'{name}_error_rate'))
+    return args
+
+
+class Recorder:
+    """Everything the clients saw, tagged with the phase it started in"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}  # phase -> endpoint -> {"latencies": [...], "statuses": {...}}
+        self.alerts = {}    # user_name -> {"phase", "sent_at", "accepted", "receipts"}
+        self.events = {}    # event name -> count across all admins
+        self.seq_gaps = 0
+
+    def request(self, phase, endpoint, status, seconds):
+        with self.lock:
+            stats = self.requests.setdefault(phase, {}).setdefault(endpoint, {"latencies": [], "statuses": {}})
+            stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+            if status == 200:
+                stats["latencies"].append(seconds)
+
+    def alert_sent(self, key, phase, sent_at):
+        with self.lock:
+            self.alerts[key] = {"phase": phase, "sent_at": sent_at, "accepted": None, "receipts": []}
+
+    def alert_answered(self, key, accepted):
+        with self.lock:
+            self.alerts[key]["accepted"] = accepted
+
+    def event(self, event, data, received_at, gap):
+        with self.lock:
+            self.events[event] = self.events.get(event, 0) + 1
+            self.seq_gaps += gap
+            if event == 'new_sos_alert':
+                alert = self.alerts.get(data.get('user_name'))
+                if alert is not None:
+                    alert["receipts"].append(received_at)
+
+
+class AdminDashboard:
+    """One admin panel: a Socket.IO client in the 'admin' room"""
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.sio = socketio.Client(reconnection=False)
+        self.last_seq = None
+        self.joined = threading.Event()
+        self.disconnected = False
+        self.sio.on('admin_sync', self.on_sync)
+        self.sio.on('disconnect', self.on_disconnect)
+        self.sio.on('*', self.on_event)
+
+    def connect(self, base, transport):
+        try:
+            self.sio.connect(base, transports=[transport], wait_timeout=15)
+            self.sio.emit('join_admin', {})
+        except socketio.exceptions.ConnectionError:
+            return False
+        return self.joined.wait(15)
+
+    def on_sync(self, data):
+        self.last_seq = data.get('seq')
+        self.joined.set()
+
+    def on_disconnect(self, *args):
+        self.disconnected = True
+
+    def on_event(self, event, data=None):
+        received_at = time.perf_counter()
+        gap = 0
+        seq = data.get('seq') if isinstance(data, dict) else None
+        if isinstance(seq, int):
+            if self.last_seq is not None and seq > self.last_seq + 1:
+                gap = seq - self.last_seq - 1
+            self.last_seq = seq
+        self.recorder.event(event, data if isinstance(data, dict) else {}, received_at, gap)
+
+    def close(self):
+        if self.sio.connected:
+            self.sio.disconnect()
+
+
+class ProcessSampler:
+    """Samples a process's CPU share and resident memory every `interval` seconds"""
+    CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []  # (perf_counter, cpu_percent, rss_bytes)
+        self.stop = threading.Event()
+        self.process = psutil.Process(pid) if psutil is not None else None
+        self.thread = threading.Thread(target=self.run, name='process-sampler', daemon=True)
+
+    def read(self):
+        """(cpu seconds, rss bytes) so far, or None when unavailable"""
+        try:
+            if self.process is not None:
+                times = self.process.cpu_times()
+                return times.user + times.system, self.process.memory_info().rss
+            with open(f'/proc/{self.pid}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            cpu = (int(fields[11]) + int(fields[12])) / self.CLOCK_TICKS  # utime, stime
+            with open(f'/proc/{self.pid}/status') as f:
+                rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith('VmRSS:'))
+            return cpu, rss
+        except Exception:
+            return None
+
+    def run(self):
+        previous, previous_at = self.read(), time.perf_counter()
+        while previous is not None and not self.stop.wait(self.interval):
+            current, now = self.read(), time.perf_counter()
+            if current is None:
+                break
+            self.samples.append((now, (current[0] - previous[0]) / (now - previous_at) * 100, current[1]))
+            previous, previous_at = current, now
+
+    def summary(self, started, ended):
+        window = [(cpu, rss) for at, cpu, rss in self.samples if started <= at <= ended + self.interval]
+        if not window:
+            return None
+        return {
+            "cpu_percent_mean": round(sum(cpu for cpu, _ in window) / len(window), 1),
+            "cpu_percent_max": round(max(cpu for cpu, _ in window), 1),
+            "rss_mb_max": round(max(rss for _, rss in window) / 2**20, 1),
+        }
+
+
+def pin_cpus(pid, count):
+    """Restrict every thread of `pid` to the first `count` CPUs (Linux), like a smaller instance"""
+    cpus = set(sorted(os.sched_getaffinity(0))[:count])
+    for tid in os.listdir(f'/proc/{pid}/task'):
+        os.sched_setaffinity(int(tid), cpus)
+    return sorted(cpus)
+
+
+class LoadRun:
+    def __init__(self, scenario, base, args):
+        self.scenario = scenario
+        self.base = base
+        self.args = args
+        self.recorder = Recorder()
+        self.stop = threading.Event()
+        self.phase = None
+        self.active_map_users = 0
+        self.think_time_s = scenario['think_time_s']
+        self.run_id = f"{int(time.time()) % 100000}"
+        self.sos_seq = itertools.count(1)
+        self.local = threading.local()
+
+    def session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = requests.Session()
+        return session
+
+    def map_user(self, index):
+        rnd = random.Random(f"{self.args.seed}-map-{index}")
+        names, weights = zip(*self.scenario['mix'].items())
+        session = requests.Session()
+        while not self.stop.is_set():
+            if index >= self.active_map_users:
+                self.stop.wait(0.1)
+                continue
+            name = rnd.choices(names, weights)[0]
+            phase, started = self.phase, time.perf_counter()
+            try:
+                status = MAP_ACTIONS[name](session, self.base, rnd).status_code
+            except requests.RequestException:
+                status = 'exception'
+            self.recorder.request(phase, name, status, time.perf_counter() - started)
+            if self.think_time_s > 0:
+                self.stop.wait(rnd.expovariate(1 / self.think_time_s))
+
+    def send_sos(self):
+        key = f"load-{self.run_id}-{next(self.sos_seq)}"
+        lat, lng = api_bench.near_hyderabad(random.Random(key))
+        phase, started = self.phase, time.perf_counter()
+        self.recorder.alert_sent(key, phase, started)
+        try:
+            status = self.session().post(f"{self.base}/send-alert", json={"lat": lat, "lng": lng, "user_name": key},
+                                         timeout=60).status_code
+        except requests.RequestException:
+            status = 'exception'
+        self.recorder.request(phase, 'send-alert', status, time.perf_counter() - started)
+        self.recorder.alert_answered(key, status == 200)
+
+    def run_phase(self, phase, sos_pool):
+        """Drive one phase's SOS schedule on this thread; map users follow self.phase"""
+        rnd = random.Random(f"{self.args.seed}-sos-{phase['name']}")
+        sos = phase['sos']
+        self.phase, self.active_map_users, self.think_time_s = phase['name'], phase['map_users'], phase['think_time_s']
+        started = time.perf_counter()
+        ends = started + phase['duration_s']
+        next_burst = started if sos['burst'] else None
+        next_single = started + rnd.expovariate(sos['rate_per_s']) if sos['rate_per_s'] > 0 else None
+        while True:
+            now = time.perf_counter()
+            if now >= ends:
+                break
+            if next_burst is not None and now >= next_burst:
+                for _ in range(sos['burst']):
+                    sos_pool.submit(self.send_sos)
+                next_burst = next_burst + sos['every_s'] if sos.get('every_s') else None
+            if next_single is not None and now >= next_single:
+                sos_pool.submit(self.send_sos)
+                next_single += rnd.expovariate(sos['rate_per_s'])
+            upcoming = min(t for t in (ends, next_burst, next_single) if t is not None)
+            time.sleep(max(0.0, min(upcoming - now, 0.05)))
+        return started, time.perf_counter()
+
+    def delivery_summary(self, phase, admins):
+        with self.recorder.lock:
+            alerts = [alert for alert in self.recorder.alerts.values()
+                      if alert["accepted"] and (phase is None or alert["phase"] == phase)]
+            latencies = [received - alert["sent_at"] for alert in alerts for received in alert["receipts"]]
+            complete = [max(alert["receipts"]) - alert["sent_at"] for alert in alerts if len(alert["receipts"]) >= admins]
+        expected = len(alerts) * admins
+        return {
+            "alerts": len(alerts),
+            "expected_deliveries": expected,
+            "deliveries": len(latencies),
+            "delivered_ratio": round(len(latencies) / expected, 4) if expected else None,
+            "latency_ms": latency_summary(latencies),
+            "all_admins_latency_ms": latency_summary(complete),
+        }
+
+    def http_summary(self, phase, wall_s):
+        with self.recorder.lock:
+            endpoints = {name: {"latencies": list(stats["latencies"]), "statuses": dict(stats["statuses"])}
+                         for name, stats in self.recorder.requests.get(phase, {}).items()}
+        summary = {}
+        for name, stats in sorted(endpoints.items()):
+            total = sum(stats["statuses"].values())
+            summary[name] = {
+                "requests": total,
+                "ok": len(stats["latencies"]),
+                "error_rate": round(1 - len(stats["latencies"]) / total, 4) if total else None,
+                "statuses": {str(status): count for status, count in stats["statuses"].items()},
+                "throughput_rps": round(len(stats["latencies"]) / wall_s, 2),
+                "latency_ms": latency_summary(stats["latencies"]),
+            }
+        return summary
+
+
+def connect_admins(run, count, transport):
+    admins = [AdminDashboard(run.recorder) for _ in range(count)]
+    with ThreadPoolExecutor(max_workers=min(32, count or 1)) as pool:
+        joined = list(pool.map(lambda admin: admin.connect(run.base, transport), admins))
+    return [admin for admin, ok in zip(admins, joined) if ok], joined.count(False)
+
+
+def print_phase(name, phase, stats):
+    server, client = stats.get("server"), stats["client_cpu_percent"]
+    resources = (f"server cpu {server['cpu_percent_mean']:.0f}% mean / {server['cpu_percent_max']:.0f}% max, "
+                 f"rss {server['rss_mb_max']:.0f} MB" if server else "server resources not sampled")
+    sos = phase['sos'] if phase else {}
+    print(f"\n{name}: {stats['wall_s']:.0f}s, {phase['map_users'] if phase else '-'} map users, "
+          f"SOS {sos.get('rate_per_s', 0):g}/s + bursts of {sos.get('burst', 0)} | {resources} | client cpu {client:.0f}%")
+    print(f"  {'endpoint':<18} {'requests':>8} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for endpoint, http in stats["http"].items():
+        latency = http["latency_ms"]
+        print(f"  {endpoint:<18} {http['requests']:>8} {http['throughput_rps']:>8.1f} {latency['p50'] or 0:>8.1f} "
+              f"{latency['p95'] or 0:>8.1f} {latency['p99'] or 0:>8.1f} {http['error_rate'] or 0:>7.1%}")
+    delivery = stats["sos_delivery"]
+    if delivery["alerts"]:
+        latency = delivery["latency_ms"]
+        print(f"  {'SOS -> admin':<18} {delivery['deliveries']:>8} {'':>8} {latency['p50'] or 0:>8.1f} "
+              f"{latency['p95'] or 0:>8.1f} {latency['p99'] or 0:>8.1f} {1 - (delivery['delivered_ratio'] or 0):>7.1%}"
+              f"  ({delivery['alerts']} alerts x admins, max {latency['max'] or 0:.0f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('scenario', help='Scenario file, e.g. benchmarks/scenarios/sos_spike.json')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply admins, map users and SOS load')
+    parser.add_argument('--transport', choices=('websocket', 'polling'), default=DEFAULT_TRANSPORT,
+                        help=f'Admin Socket.IO transport (default here: {DEFAULT_TRANSPORT})')
+    parser.add_argument('--server-cpus', type=int, help='Pin the backend to this many CPUs (Linux)')
+    parser.add_argument('--sos-concurrency', type=int, default=128, help='Most /send-alert calls in flight at once')
+    parser.add_argument('--drain-s', type=float, default=5.0, help='Wait this long after the last phase for deliveries')
+    parser.add_argument('--base-url', help='Load an already running backend instead of starting one with the fakes')
+    parser.add_argument('--server-pid', type=int, help='With --base-url: the backend process to sample')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--async-io', action='store_true', help='Run the backend with OUTBOUND_IO_MODE=async')
+    parser.add_argument('--log-level', default='WARNING', help='Backend LOG_LEVEL (its log is kept in the temp dir)')
+    parser.add_argument('--output', help='Results file (default benchmarks/results/load-<scenario>-<commit>.json)')
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario, args.scale)
+    commit, dirty = api_bench.git_commit()
+    results = {
+        "schema": 1,
+        "benchmark": "load",
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {"scale": args.scale, "transport": args.transport, "server_cpus": args.server_cpus,
+                   "sos_concurrency": args.sos_concurrency, "seed": args.seed, "async_io": args.async_io,
+                   "external_server": bool(args.base_url)},
+        "scenario": scenario,
+        "phases": {},
+    }
+
+    upstreams = backend = None
+    with tempfile.TemporaryDirectory() as tmpdir:
+        try:
+            if args.base_url:
+                base, pid = args.base_url.rstrip('/'), args.server_pid
+            else:
+                upstreams, upstream_port = api_bench.start_fake_upstreams(upstream_args(scenario, args.seed))
+                backend, base, _ = api_bench.start_backend(args, upstream_port, tmpdir,
+                                                           {key: str(value) for key, value in scenario.get('backend_env', {}).items()})
+                pid = backend.pid
+            if args.server_cpus:
+                results["config"]["server_cpu_set"] = pin_cpus(pid, args.server_cpus)
+
+            run = LoadRun(scenario, base, args)
+            admins, failed = connect_admins(run, scenario['admins'], args.transport)
+            print(f"backend {base}: {len(admins)} admins joined over {args.transport}"
+                  f"{f', {failed} failed to join' if failed else ''}; scenario {scenario['name']}")
+
+            sampler = ProcessSampler(pid) if pid else None
+            if sampler is not None:
+                sampler.thread.start()
+            map_users = [threading.Thread(target=run.map_user, args=(i,), daemon=True)
+                         for i in range(max([phase['map_users'] for phase in scenario['phases']] + [0]))]
+            for thread in map_users:
+                thread.start()
+
+            windows = []
+            with ThreadPoolExecutor(max_workers=args.sos_concurrency) as sos_pool:
+                for phase in scenario['phases']:
+                    client_before = os.times()
+                    started, ended = run.run_phase(phase, sos_pool)
+                    client_after = os.times()
+                    windows.append((phase, started, ended, client_before, client_after))
+                run.active_map_users = 0
+            run.stop.set()
+            for thread in map_users:
+                thread.join(timeout=60)
+            time.sleep(args.drain_s)  # Let the last alerts reach every admin
+
+            for phase, started, ended, client_before, client_after in windows:
+                wall_s = ended - started
+                client_cpu = (client_after.user + client_after.system - client_before.user - client_before.system)
+                stats = {
+                    "wall_s": round(wall_s, 2),
+                    "http": run.http_summary(phase['name'], wall_s),
+                    "sos_delivery": run.delivery_summary(phase['name'], len(admins)),
+                    "server": sampler.summary(started, ended) if sampler else None,
+                    "client_cpu_percent": round(client_cpu / wall_s * 100, 1),
+                }
+                results["phases"][phase['name']] = stats
+                print_phase(phase['name'], phase, stats)
+
+            results["sos_delivery"] = run.delivery_summary(None, len(admins))
+            results["admins"] = {
+                "joined": len(admins),
+                "failed_to_join": failed,
+                "disconnected": sum(admin.disconnected for admin in admins),
+                "seq_gaps": run.recorder.seq_gaps,
+                "events": dict(run.recorder.events),
+            }
+            if sampler is not None:
+                sampler.stop.set()
+                results["server_peak_rss_mb"] = round(max((rss for _, _, rss in sampler.samples), default=0) / 2**20, 1)
+            for admin in admins:
+                admin.close()
+            if upstreams is not None:
+                results["upstream_calls"] = requests.get(f"http://127.0.0.1:{upstream_port}/__stats", timeout=5).json()
+            results["backend_stats"] = requests.get(f"{base}/cache-stats", timeout=5).json()
+        finally:
+            if backend is not None:
+                backend.terminate()
+                backend.wait(timeout=10)
+            if upstreams is not None:
+                upstreams.terminate()
+
+    delivery = results["sos_delivery"]
+    print(f"\nSOS delivery overall: {delivery['deliveries']}/{delivery['expected_deliveries']} "
+          f"p50 {delivery['latency_ms']['p50']} ms, p99 {delivery['latency_ms']['p99']} ms, "
+          f"sequence gaps {results['admins']['seq_gaps']}, admin disconnects {results['admins']['disconnected']}"
+          + (f"; server peak rss {results['server_peak_rss_mb']} MB" if 'server_peak_rss_mb' in results else ""))
+
+    output = args.output or os.path.join(api_bench.RESULTS_DIR,
+                                         f"load-{scenario['name']}-{commit or 'unknown'}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
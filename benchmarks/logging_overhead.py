@@ -0,0 +1,104 @@
+"""
+Per-request logging overhead: synchronous print() banners vs the queued
+JSON logger in backend/logs.py.
+
+A child process emits the log lines of one simulated request, N times over,
+with its stdout piped back to this process:
+- "print": the old profile, LINES_PER_REQUEST synchronous print() calls
+- "logs":  the new profile, the same request logged through logs.get_logger()
+  (one structured line per event, hot-path detail at DEBUG)
+
+The parent drains the pipe either as fast as it can ("fast" sink) or slowly
+("slow" sink: a log shipper that cannot keep up). With a slow sink the pipe
+fills up and print() blocks the caller - under eventlet that stalls the whole
+hub - while the queued logger keeps going and drops what it cannot buffer.
+
+Run from the repository root:
+    python benchmarks/logging_overhead.py [--requests 2000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+# Roughly what one /get-routes request used to print (banners, per-route and per-type lines)
+LINES_PER_REQUEST = 40
+
+CHILD = r'''
+import eventlet
+eventlet.monkey_patch()
+import json, sys, time
+mode, requests_n, lines_n = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+if mode == "logs":
+    import logs
+    logs.configure()
+    log = logs.get_logger("bench")
+    logs.set_request_id("bench-request")
+
+def one_request_print(i):
+    for line in range(lines_n):
+        print(f"   📊 Route {line % 3 + 1}: Searching for hospital at (17.3850, 78.4867) - request {i} line {line}")
+
+def one_request_logs(i):
+    # What the same request logs now: a handful of INFO events plus DEBUG detail
+    for line in range(lines_n):
+        if line % 8 == 0:
+            log.info(f"🔍 Route {line % 3 + 1}: searching along route", extra={"route": line % 3 + 1, "request": i})
+        else:
+            log.debug(f"📊 Route {line % 3 + 1}: hospital at (17.3850, 78.4867)", extra={"line": line})
+
+one_request = one_request_logs if mode == "logs" else one_request_print
+timings = []
+for i in range(requests_n):
+    started = time.perf_counter()
+    one_request(i)
+    timings.append(time.perf_counter() - started)
+timings.sort()
+result = {"mean_us": sum(timings) / len(timings) * 1e6,
+          "p50_us": timings[len(timings) // 2] * 1e6,
+          "p99_us": timings[int(len(timings) * 0.99)] * 1e6,
+          "max_us": timings[-1] * 1e6}
+if mode == "logs":
+    result["dropped"] = logs.stats()["dropped"]
+sys.stderr.write("RESULT " + json.dumps(result) + "\n")
+'''
+
+
+def run(mode, sink, requests_n):
+    env = dict(os.environ, LOG_QUEUE_SIZE='10000', PYTHONUNBUFFERED='1')
+    child = subprocess.Popen([sys.executable, '-c', CHILD, mode, str(requests_n), str(LINES_PER_REQUEST)],
+                             cwd=BACKEND, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    while True:
+        chunk = child.stdout.read(4096)
+        if not chunk:
+            break
+        if sink == 'slow':
+            time.sleep(0.002)  # ~2 MB/s: a log shipper that cannot keep up
+    stderr = child.stderr.read().decode()
+    child.wait()
+    line = next((line for line in stderr.splitlines() if line.startswith('RESULT ')), None)
+    if line is None:
+        raise SystemExit(f"{mode}/{sink} run failed:\n{stderr[-2000:]}")
+    return json.loads(line[len('RESULT '):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{args.requests} simulated requests, {LINES_PER_REQUEST} log calls each\n")
+    print(f"{'mode':<7} {'sink':<5} {'mean µs':>9} {'p50 µs':>9} {'p99 µs':>9} {'max µs':>10} {'dropped':>8}")
+    for sink in ('fast', 'slow'):
+        for mode in ('print', 'logs'):
+            r = run(mode, sink, args.requests)
+            print(f"{mode:<7} {sink:<5} {r['mean_us']:9.1f} {r['p50_us']:9.1f} {r['p99_us']:9.1f} {r['max_us']:10.1f} "
+                  f"{r.get('dropped', '-'):>8}")
+
+
+if __name__ == '__main__':
+    main()
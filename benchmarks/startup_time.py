@@ -0,0 +1,69 @@
+"""
+Cold-start check: time how long `import app` takes in a fresh interpreter.
+
+Each run imports the backend in a new process against an empty temporary
+database, with a dummy GROQ_API_KEY and Groq pointed at an unroutable address.
+Any network call left on the import path would stall the run, so this guards
+against reintroducing one. Exits non-zero when the median exceeds --max-seconds.
+
+Run from the repository root:
+    python benchmarks/startup_time.py [--runs 5] [--max-seconds 3]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+PROBE = "import app; print('STARTUP', app.STARTUP_SECONDS)"
+MAX_SECONDS = float(os.getenv('STARTUP_MAX_SECONDS', '3'))  # Also the budget in backend/tests/test_startup.py
+
+
+def startup_env(tmpdir, run):
+    """Environment for one cold import: empty database, Groq configured but unreachable"""
+    return dict(os.environ,
+                SAFEROUTE_DB_PATH=os.path.join(tmpdir, f'startup-{run}.db'),
+                GROQ_API_KEY='gsk_startup_check',
+                GROQ_BASE_URL='http://10.255.255.1',  # Blackhole: a live call here would hang
+                HEALTH_PROBE_DELAY_S='3600')
+
+
+def one_run(tmpdir, run):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=BACKEND, env=startup_env(tmpdir, run),
+                            capture_output=True, text=True, timeout=120)
+    wall_s = time.perf_counter() - started
+    if result.returncode != 0:
+        print(result.stdout[-2000:], result.stderr[-2000:])
+        raise SystemExit(f"import app failed (exit {result.returncode})")
+    reported = next((float(line.split()[1]) for line in result.stdout.splitlines() if line.startswith('STARTUP')), None)
+    return wall_s, reported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=MAX_SECONDS, help='Budget for the median process wall time')
+    args = parser.parse_args()
+
+    walls, reported = [], []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for run in range(args.runs):
+            wall_s, app_s = one_run(tmpdir, run)
+            walls.append(wall_s)
+            reported.append(app_s)
+            print(f"run {run + 1}: process {wall_s:6.2f}s   app-reported {app_s:6.2f}s")
+
+    median = statistics.median(walls)
+    print(f"\nmedian process start: {median:.2f}s (budget {args.max_seconds:.2f}s)")
+    if median > args.max_seconds:
+        raise SystemExit(f"FAIL: startup {median:.2f}s exceeds {args.max_seconds:.2f}s")
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
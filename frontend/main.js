@@ -4,6 +4,8 @@ let rendererArray = [], currentRoutes = [], lastDirectionsResult = null;
 let userMarker = null, crimeMarkers = [], feedbackMarkers = [];
 let hospitalMarkers = [], policeMarkers = []; // Markers for hospitals and police stations
 let allFeedbacks = [];
+let selectedRouteIndex = 0, activeRouteStream = null;
+const ROUTE_STREAM_TIMEOUT_MS = 30000; // Fall back to the one-shot request after this
 const socket = io(window.BACKEND_URL);
 
 /* --- Secure Google Maps API Loader --- */
@@ -210,6 +212,16 @@ window.findRoutes = function () {
 function sendToBackendForAnalysis(source, destination) {
   console.log(`🔍 Sending route request to backend: ${source} → ${destination}`);
   
+  // Without a live socket there is nowhere to stream to
+  if (socket.connected) {
+    streamRoutes(source, destination);
+  } else {
+    fetchRoutesAtOnce(source, destination);
+  }
+}
+
+// One request, one answer: every route fully analysed and ranked
+function fetchRoutesAtOnce(source, destination) {
   fetch(`${window.BACKEND_URL}/get-routes`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
@@ -225,26 +237,142 @@ function sendToBackendForAnalysis(source, destination) {
         return;
       }
 
-      console.log(`📊 Backend returned ${data.length} routes:`);
-      data.forEach((route, index) => {
-        console.log(`   Route ${index + 1}: ${route.summary || 'Unknown'} - Safety: ${route.safety_score}`);
-      });
+      showRankedRoutes(data);
+    })
+    .catch((err) => {
+      stopLoadingAnimation();
+      console.error(err);
+      alert(`Cannot connect to backend (${window.BACKEND_URL}). Ensure backend server is running.`);
+    });
+}
 
-      if (Array.isArray(data) && data.length > 0) {
-        currentRoutes = data;
-        displayRouteCards(data);
-        selectRoute(0);
-      } else {
-        alert("No route analysis data returned.");
+// Progressive results over Socket.IO: the routes are drawn as soon as the
+// server has their geometry ('route_geometry'), each card fills in as its
+// safety analysis lands ('route_enriched'), and the final ranking replaces
+// them ('routes_ranked'). A stalled or dropped stream falls back to the
+// one-shot request.
+function streamRoutes(source, destination) {
+  if (activeRouteStream) activeRouteStream.cancel();
+
+  const streamId = `${socket.id}-${Date.now()}`;
+  const stream = {};
+  let fallbackTimer = null;
+
+  const isMine = (data) => activeRouteStream === stream && data && data.stream_id === streamId;
+  const finish = () => {
+    clearTimeout(fallbackTimer);
+    socket.off("route_geometry", onGeometry);
+    socket.off("route_enriched", onEnriched);
+    socket.off("routes_ranked", onRanked);
+    socket.off("routes_error", onError);
+    socket.off("disconnect", onDisconnect);
+    if (activeRouteStream === stream) activeRouteStream = null;
+  };
+  const fallBack = (reason) => {
+    if (activeRouteStream !== stream) return;
+    console.warn(`⚠️ Route stream ${reason} - fetching the full result instead`);
+    finish();
+    fetchRoutesAtOnce(source, destination);
+  };
+
+  const onGeometry = (data) => {
+    if (!isMine(data)) return;
+    stopLoadingAnimation();
+    console.log(`🗺️ ${data.routes.length} routes drawn, safety analysis in progress`);
+    currentRoutes = data.routes.map((route) => ({ ...route, pending: true }));
+    selectedRouteIndex = 0;
+    refreshRouteView();
+  };
+  const onEnriched = (data) => {
+    if (!isMine(data)) return;
+    const position = currentRoutes.findIndex((route) => route.index === data.route.index);
+    if (position === -1) return;
+    console.log(`📊 Route ${position + 1} analysed - Safety: ${data.route.safety_score}`);
+    currentRoutes[position] = data.route;
+    refreshRouteView();
+  };
+  const onRanked = (data) => {
+    if (!isMine(data)) return;
+    finish();
+    stopLoadingAnimation();
+    showRankedRoutes(data.routes);
+  };
+  const onError = (data) => {
+    if (!isMine(data)) return;
+    finish();
+    stopLoadingAnimation();
+    console.error("Backend Error:", data.error);
+    alert("Server Error: " + data.error);
+  };
+  const onDisconnect = () => fallBack("lost its socket");
+
+  stream.cancel = finish;
+  activeRouteStream = stream;
+  socket.on("route_geometry", onGeometry);
+  socket.on("route_enriched", onEnriched);
+  socket.on("routes_ranked", onRanked);
+  socket.on("routes_error", onError);
+  socket.on("disconnect", onDisconnect);
+  fallbackTimer = setTimeout(() => fallBack("timed out"), ROUTE_STREAM_TIMEOUT_MS);
+
+  fetch(`${window.BACKEND_URL}/get-routes`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ source, destination, stream: true, socket_id: socket.id, stream_id: streamId })
+  })
+    .then((res) => res.json())
+    .then((data) => {
+      if (activeRouteStream !== stream) return;
+      if (data.error) {
+        finish();
+        stopLoadingAnimation();
+        console.error("Backend Error:", data.error);
+        alert("Server Error: " + data.error);
+      } else if (Array.isArray(data)) {
+        // A server without streaming answers with the full list
+        finish();
+        stopLoadingAnimation();
+        showRankedRoutes(data);
       }
     })
     .catch((err) => {
+      if (activeRouteStream !== stream) return;
+      finish();
       stopLoadingAnimation();
       console.error(err);
       alert(`Cannot connect to backend (${window.BACKEND_URL}). Ensure backend server is running.`);
     });
 }
 
+function showRankedRoutes(routes) {
+  console.log(`📊 Backend returned ${routes.length} routes:`);
+  routes.forEach((route, index) => {
+    console.log(`   Route ${index + 1}: ${route.summary || 'Unknown'} - Safety: ${route.safety_score}`);
+  });
+
+  if (Array.isArray(routes) && routes.length > 0) {
+    currentRoutes = routes;
+    displayRouteCards(routes);
+    selectRoute(0);
+  } else {
+    alert("No route analysis data returned.");
+  }
+}
+
+// Redraw cards, map and markers for the current selection while results stream in
+function refreshRouteView() {
+  displayRouteCards(currentRoutes);
+  document.querySelectorAll(".route-card").forEach((c, i) => {
+    c.classList.toggle("selected", i === selectedRouteIndex);
+  });
+  renderAllRoutes(selectedRouteIndex);
+  const route = currentRoutes[selectedRouteIndex];
+  if (route) {
+    showCrimeIncidents(route.crime_incidents);
+    showHospitalsAndPolice(route);
+  }
+}
+
 /* --- 3. ✅ UPDATED: UI Display with Safety Colors --- */
 function displayRouteCards(routes) {
   const container = document.getElementById("routes-list");
@@ -254,10 +382,10 @@ function displayRouteCards(routes) {
   console.log(`📊 Displaying ${routes.length} route cards with safety colors:`);
 
   routes.forEach((route, index) => {
-    const score = route.safety_score || 0;
+    const score = route.pending ? "…" : route.safety_score || 0;
     
-    // ✅ Get safety-based color and label
-    const safetyInfo = getSafetyLabel(score);
+    // ✅ Get safety-based color and label (gray while the analysis is still running)
+    const safetyInfo = route.pending ? { text: "ANALYSING", color: "#94a3b8" } : getSafetyLabel(score);
     const scoreColor = safetyInfo.color;
     const scoreText = safetyInfo.text;
     
@@ -279,9 +407,9 @@ function displayRouteCards(routes) {
           <span><i class="fa-solid fa-ruler"></i> ${route.distance}</span>
         </div>
         <div class="route-badges">
-          <span class="badge"><i class="fa-solid fa-hospital"></i> ${route.hospital_count || 0} Hospitals</span>
-          <span class="badge"><i class="fa-solid fa-user-shield"></i> ${route.police_count || 0} Police Stn</span>
-          <span class="badge"><i class="fa-solid fa-lightbulb"></i> ${route.street_light_score || 0}% Lights</span>
+          <span class="badge"><i class="fa-solid fa-hospital"></i> ${route.pending ? "…" : route.hospital_count || 0} Hospitals</span>
+          <span class="badge"><i class="fa-solid fa-user-shield"></i> ${route.pending ? "…" : route.police_count || 0} Police Stn</span>
+          <span class="badge"><i class="fa-solid fa-lightbulb"></i> ${route.pending ? "…" : route.street_light_score || 0}% Lights</span>
         </div>
       </div>
     `;
@@ -292,6 +420,7 @@ function displayRouteCards(routes) {
 }
 
 window.selectRoute = function (index) {
+  selectedRouteIndex = index;
   document.querySelectorAll(".route-card").forEach((c, i) => {
     if (i === index) c.classList.add("selected");
     else c.classList.remove("selected");
@@ -336,7 +465,7 @@ function renderAllRoutes(selectedIndex) {
     // ✅ Get safety-based color for ALL routes (not just selected)
     let routeColor = "#94a3b8"; // Default gray fallback
     
-    if (hasRouteData && currentRoutes[index]) {
+    if (hasRouteData && currentRoutes[index] && !currentRoutes[index].pending) {
       const safetyScore = currentRoutes[index].safety_score || 0;
       routeColor = getSafetyColor(safetyScore);
       
@@ -495,7 +624,8 @@ window.sendEmergencyAlert = function() {
                         lat: lat, 
                         lng: lng, 
                         accuracy: accuracy,
-                        user_name: getUserName() // Include user name
+                        user_name: getUserName(), // Include user name
+                        socket_id: socket.id // Nearby services are pushed here when ready
                     }),
                     signal: controller.signal
                 });
@@ -520,10 +650,22 @@ window.sendEmergencyAlert = function() {
                     // Show simple success alert
                     alert(`🚨 SOS Alert Sent!\nAlert ID: ${data.alert_id}\nEmergency services notified`);
                     
+                    // The alert is already with the admins; nearby services follow
+                    modal.querySelector('.modal-body').innerHTML = `
+                        <div style="text-align:center; padding:40px;">
+                            <i class="fa-solid fa-robot fa-spin" style="font-size:3rem; color:var(--primary);"></i>
+                            <h3 style="margin-top:20px;">SOS Sent - Finding Emergency Services...</h3>
+                            <p style="color:#666;">Alert ID: ${data.alert_id}. Looking up nearby hospitals, police, and safe places...</p>
+                        </div>
+                    `;
+                    const enrichment = data.enrichment_status === 'FAILED'
+                        ? {status: 'FAILED'}
+                        : await waitForSosEnrichment(data.alert_id);
+                    console.log('📦 SOS enrichment:', enrichment);
+                    
                     // Enhanced check for emergency suggestions
-                    if (!data.emergency_suggestions) {
-                        console.error('⚠️ WARNING: No emergency_suggestions in response!');
-                        console.error('📦 Full response structure:', Object.keys(data));
+                    if (enrichment.status !== 'DONE' || !enrichment.emergency_suggestions) {
+                        console.error(`⚠️ WARNING: No emergency suggestions (enrichment ${enrichment.status})`);
                         
                         modal.querySelector('.modal-body').innerHTML = `
                             <div style="text-align:center; padding:20px;">
@@ -543,12 +685,12 @@ window.sendEmergencyAlert = function() {
                     }
                     
                     console.log("📋 About to call displayEmergencySuggestions...");
-                    console.log("📊 Emergency suggestions structure:", Object.keys(data.emergency_suggestions));
-                    console.log("📊 Hospitals count:", data.emergency_suggestions.hospitals?.length || 0);
-                    console.log("📊 Police count:", data.emergency_suggestions.police_stations?.length || 0);
+                    console.log("📊 Emergency suggestions structure:", Object.keys(enrichment.emergency_suggestions));
+                    console.log("📊 Hospitals count:", enrichment.emergency_suggestions.hospitals?.length || 0);
+                    console.log("📊 Police count:", enrichment.emergency_suggestions.police_stations?.length || 0);
                     
                     try {
-                        displayEmergencySuggestions(data.emergency_suggestions, data.alert_id, lat, lng, data.timestamp);
+                        displayEmergencySuggestions(enrichment.emergency_suggestions, data.alert_id, lat, lng, data.timestamp);
                         console.log("✅ displayEmergencySuggestions called successfully");
                     } catch (displayError) {
                         console.error("❌ Error in displayEmergencySuggestions:", displayError);
@@ -605,6 +747,44 @@ window.sendEmergencyAlert = function() {
     );
 };
 
+// Resolves with the nearby emergency services for an SOS alert. The server
+// pushes them as 'sos_enriched' when ready; polling covers a dropped socket.
+function waitForSosEnrichment(alertId, timeoutMs = 45000, pollMs = 3000) {
+    return new Promise((resolve) => {
+        let done = false;
+        let pollTimer = null;
+        let deadlineTimer = null;
+        
+        const finish = (result) => {
+            if (done) return;
+            done = true;
+            clearTimeout(pollTimer);
+            clearTimeout(deadlineTimer);
+            socket.off('sos_enriched', onPush);
+            resolve(result);
+        };
+        const onPush = (data) => {
+            if (data && data.alert_id === alertId) finish(data);
+        };
+        const poll = async () => {
+            try {
+                const res = await fetch(`${window.BACKEND_URL}/get-alert-enrichment/${alertId}`);
+                if (res.ok) {
+                    const data = await res.json();
+                    if (data.status !== 'PENDING') return finish(data);
+                }
+            } catch (e) {
+                console.warn('⚠️ Enrichment poll failed:', e);
+            }
+            if (!done) pollTimer = setTimeout(poll, pollMs);
+        };
+        
+        socket.on('sos_enriched', onPush);
+        pollTimer = setTimeout(poll, pollMs);
+        deadlineTimer = setTimeout(() => finish({alert_id: alertId, status: 'TIMEOUT'}), timeoutMs);
+    });
+}
+
 function displayEmergencySuggestions(suggestions, alertId, lat, lng, timestamp) {
     console.log('🚀 displayEmergencySuggestions CALLED');
     console.log('📦 Suggestions:', suggestions);